@@ -1,135 +1,2588 @@
 import os
+import asyncio
+import codecs
+import contextlib
+import contextvars
+import csv
+import glob
+import hashlib
+import mmap
+import numpy as np
 import pandas as pd
 import platform
+import re
+import struct
 import subprocess
-import shlex
-from io import StringIO
+import threading
+import time
+import weakref
+from io import RawIOBase, StringIO
+from pandas.tseries.api import guess_datetime_format
+from stat import S_ISREG
+from collections import OrderedDict, deque, namedtuple
+from multiprocessing import get_all_start_methods, get_context, resource_tracker, shared_memory
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 
 __all__ = [
     "read_csv_head",
     "read_csv_tail",
     "read_csv_headtail",
     "read_csv_line_range",
+    "read_csv_head_many",
+    "read_csv_tail_many",
+    "read_csv_headtail_many",
+    "read_csv_line_range_many",
+    "aread_csv_head",
+    "aread_csv_tail",
+    "aread_csv_headtail",
+    "aread_csv_line_range",
+    "aread_csv_many",
+    "iter_csv_tails",
+    "set_async_concurrency",
+    "build_line_index",
+    "set_metadata_cache_size",
+    "metadata_cache_info",
+    "clear_metadata_cache",
+    "configure_executor",
+    "executor_info",
+    "CsvFile",
 ]
 
+# Block size used when scanning a file for line boundaries.
+_BLOCK_SIZE = 1 << 16
+
+# Byte range handled by one worker when counting lines, and the block size it reads with.
+_COUNT_CHUNK_SIZE = 1 << 26
+_COUNT_BLOCK_SIZE = 1 << 22
+
+# Sidecar line index: file suffix, default spacing between indexed records, the fixed header
+# (magic, step, total records, flags, then the file signature) written before the offsets,
+# and the flags, whose second byte holds the separator the quotes were scanned with.
+_INDEX_SUFFIX = '.rctidx'
+_INDEX_STEP = 1024
+_INDEX_MAGIC = b'RCTIDX04'
+_INDEX_HEADER = struct.Struct('<8sQQQQQQQQ')
+_INDEX_QUOTED_NEWLINES = 1
+_INDEX_ENDS_IN_QUOTES = 2
+_INDEX_SEP_SHIFT = 8
+
+# Number of bytes hashed at the start and at the end of a file to fingerprint it.
+_FINGERPRINT_SIZE = 4096
+
+# Number of files whose metadata is kept by the in-process metadata cache.
+_METADATA_CACHE_SIZE = 128
+
+# Reads of more rows than this size their first read from the file's average row length.
+_PROFILE_MIN_ROWS = 256
+
+# With engine='auto', reads expected to return at least this many bytes use the mmap engine.
+_MMAP_MIN_BYTES = 1 << 20
+
+# The mmap engine looks for up to this many lines one `find` at a time, and for more with NumPy.
+_MMAP_FIND_MAX_LINES = 64
+
+# Slices of up to this many rows and bytes are parsed without `pandas.read_csv`, whose
+# fixed cost is far larger than the cost of reading a few rows.
+_SMALL_PARSE_MAX_ROWS = 16
+_SMALL_PARSE_MAX_BYTES = 1 << 14
+
+# The strings `pandas.read_csv` reads as missing values and as booleans by default, and
+# the numbers it reads as integers and floats.
+_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+_TRUE_VALUES = frozenset(['True', 'TRUE', 'true'])
+_FALSE_VALUES = frozenset(['False', 'FALSE', 'false'])
+_BOOL_VALUES = _TRUE_VALUES | _FALSE_VALUES
+_INTS_PATTERN = re.compile(r'[+-]?[0-9]+(\n[+-]?[0-9]+)*')
+_NUMBERS_PATTERN = re.compile(
+    r'[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?(\n[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?)*'
+)
+
+# Values longer than this are left to pandas, so that numbers are never rounded differently.
+_SMALL_PARSE_MAX_DIGITS = 15
+
+# Default number of threads the `*_many` readers read files with.
+_MANY_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Default number of threads in the pool shared by every parallel path, and default limits on the
+# file reads in progress at once across all threads: their number and the bytes they read.
+_EXECUTOR_MAX_WORKERS = _MANY_MAX_WORKERS
+_MAX_CONCURRENT_READS = _MANY_MAX_WORKERS
+_MAX_INFLIGHT_BYTES = 1 << 30
+
+# Default number of reads the `aread_*` coroutines run at once, per event loop.
+_ASYNC_CONCURRENCY = _MANY_MAX_WORKERS
+
+# With compact=True, text columns with at most this many distinct values per present value
+# are stored as categoricals.
+_COMPACT_MAX_CATEGORY_RATIO = 0.5
+
+# With processes=, slices are parsed in worker processes when each gets at least this many
+# bytes, and only with the pandas.read_csv arguments that parse every piece of a slice as
+# they parse the whole slice.
+_PROCESS_MIN_BYTES = 1 << 22
+_PROCESS_KWARGS = frozenset([
+    'encoding', 'dtype', 'na_values', 'keep_default_na', 'na_filter', 'true_values', 'false_values',
+    'decimal', 'thousands', 'parse_dates', 'date_format', 'dayfirst',
+])
+
+# With parser='numeric', slices are split into blocks of rows of about this many bytes,
+# converted in parallel.
+_NUMERIC_BLOCK_SIZE = 1 << 20
+
+# The bytes a field may hold with parser='numeric', and the powers of ten that scale
+# decimals, exact as float64 up to 10**22. Integers of up to 18 digits fit an int64.
+_NUMERIC_BYTES = np.zeros(256, dtype=bool)
+_NUMERIC_BYTES[list(b'0123456789+-.eE')] = True
+_FLOAT_POWERS_OF_TEN = np.array([float(10 ** k) for k in range(23)])
+_MAX_INT_DIGITS = 18
+
+if hasattr(os, 'pread'):
+    _pread = os.pread
+else:
+    _pread_lock = threading.Lock()
+
+    def _pread(fd, size, offset):
+        # Windows has no pread; emulate it with a seek followed by a read. The
+        # lock keeps threads sharing a descriptor from moving each other's offset.
+        with _pread_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            return os.read(fd, size)
+
+# Bytes that may come before a quote that opens a field: the separator and line breaks,
+# as pandas reads it. A quote after anything else, as in `55" screen` or `key:"v`, is
+# part of an unquoted field. Separators of more than one byte, or regular expressions,
+# cannot be told from a single byte: any byte but text is taken for a boundary then.
+_ANY_QUOTE_BOUNDARY = np.ones(256, dtype=bool)
+_ANY_QUOTE_BOUNDARY[list(b'"._- 0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')] = False
+_ANY_QUOTE_BOUNDARY[0x80:] = False
+
+_quote_boundaries = {}
+
+def _quote_boundary(sep):
+    """Return which bytes may come before a quote that opens a field, for a file separated by `sep`."""
+    boundary = _quote_boundaries.get(sep)
+    if boundary is None:
+        if sep is None:
+            boundary = _ANY_QUOTE_BOUNDARY
+        else:
+            boundary = np.zeros(256, dtype=bool)
+            boundary[[ord(sep), ord('\n'), ord('\r')]] = True
+        boundary = _quote_boundaries.setdefault(sep, boundary)
+    return boundary
+
+def _quote_sep(sep):
+    """Return the separator quotes are scanned with for `sep`: itself if it is a single ASCII byte, or None."""
+    if isinstance(sep, str) and len(sep) == 1 and sep.isascii() and sep != '"':
+        return sep
+    return None
+
+def _split_newlines(buf, in_quotes=False, from_end=False, prev_byte=None, sep=','):
+    """
+    Split the newlines of `buf` into those that end a record and those inside a quoted field.
+
+    Whether a newline is quoted follows from the quotes between it and the start
+    of `buf`, where the quote state is `in_quotes`. With `from_end`, `in_quotes`
+    is the state at the end of `buf` instead. Returns both position arrays and the
+    quote state on the other side of `buf`.
+
+    Quotes are read as pandas reads them: a quote opens a field only right after
+    the separator `sep`, a line break or `prev_byte`, the byte before `buf` (None
+    at the start of a record), and a doubled quote inside a quoted field is an
+    escaped quote. A quote anywhere else is text of an unquoted field. As a run
+    of adjacent quotes is read as a whole, `buf` must not cut one.
+    """
+    array = np.frombuffer(buf, dtype=np.uint8)
+    newlines = np.flatnonzero(array == ord('\n'))
+    quotes = np.flatnonzero(array == ord('"'))
+    return _split_quoted(array, newlines, quotes, in_quotes, from_end, prev_byte, sep)
+
+class _AmbiguousQuotes(Exception):
+    """
+    Raised scanning back when stray quotes leave the quote state at the start of a buffer undecided.
+
+    `ends` holds the record ends past the first stray quote, which are known all the same.
+    """
+
+    def __init__(self, ends):
+        super().__init__()
+        self.ends = ends
+
+def _split_quoted(array, newlines, quotes, in_quotes, from_end, prev_byte, sep=','):
+    """`_split_newlines`, given the positions of the newlines and quotes of `array`."""
+    # Quotes are taken in runs of adjacent ones. An even run leaves the quote state as it
+    # is: an empty field, or escaped quotes. An odd one after a boundary opens or closes a
+    # field; anywhere else, it either closes a field or is text, and leaves it unquoted.
+    first = np.flatnonzero(np.diff(quotes, prepend=-2) != 1)
+    runs = quotes[first[np.diff(first, append=len(quotes)) % 2 == 1]]
+    if len(runs) == 0:
+        return (newlines[:0], newlines, True) if in_quotes else (newlines, newlines[:0], False)
+    boundary = _quote_boundary(sep)
+    toggles = boundary[array[runs - 1]]
+    if runs[0] == 0:
+        toggles[0] = prev_byte is None or bool(boundary[prev_byte])
+    # The state past each run: the parity of the runs that toggle it since the last one that
+    # did not, which left it unquoted; before any such run, counted from the starting state.
+    order = np.arange(len(runs))
+    n_toggles = np.cumsum(toggles)
+    last_reset = np.maximum.accumulate(np.where(toggles, -1, order))
+    reset = last_reset >= 0
+    parity = (n_toggles - np.where(reset, n_toggles[last_reset], 0)) % 2
+    # The last run before each newline, -1 for none.
+    run_before = np.searchsorted(runs, newlines) - 1
+
+    def split(start_state):
+        after = np.where(reset, parity, (parity + start_state) % 2).astype(bool)
+        quoted = np.where(run_before >= 0, after[run_before], start_state)
+        return quoted, bool(after[-1])
+
+    if not from_end:
+        quoted, end_state = split(in_quotes)
+        return newlines[~quoted], newlines[quoted], end_state
+    # Only the state at the end is known: take the one starting state that leads to it.
+    splits = [(state, split(state)[0]) for state in (False, True) if split(state)[1] == in_quotes]
+    if len(splits) != 1:
+        # Both lead to it when a run left the state unquoted; past that run, the states agree.
+        decided = run_before >= order[~toggles][0] if splits else np.zeros(len(newlines), dtype=bool)
+        raise _AmbiguousQuotes(newlines[decided & ~splits[0][1]] if splits else newlines[:0])
+    (start_state, quoted), = splits
+    return newlines[~quoted], newlines[quoted], start_state
+
+def _record_newlines(buf, in_quotes=False, from_end=False, prev_byte=None, sep=','):
+    """Return the positions of the newlines of `buf` that end a record, and the quote state past `buf`."""
+    ends, _, in_quotes = _split_newlines(buf, in_quotes, from_end, prev_byte, sep)
+    return ends, in_quotes
+
+def _leading_quotes(buf):
+    """Return the number of quotes `buf` starts with, 0 if it is all quotes."""
+    n = 0
+    while n < len(buf) and buf[n] == 0x22:
+        n += 1
+    return n if n < len(buf) else 0
+
+def _trailing_quotes(buf):
+    """Return the number of quotes `buf` ends with, 0 if it is all quotes."""
+    n = 0
+    while n < len(buf) and buf[len(buf) - 1 - n] == 0x22:
+        n += 1
+    return n if n < len(buf) else 0
+
+def _find_record_end(buf, n, in_quotes=False, quoted=True, prev_byte=None, sep=','):
+    """
+    Find the `n`-th newline of `buf` that ends a record.
+
+    Returns its position, or -1 if there are fewer, the number of record ends
+    found and the quote state at the end of `buf`. Blocks without quotes are
+    searched for raw newlines; `quoted=False` skips the quote check entirely.
+    `prev_byte` is the byte before `buf`, None at the start of a record, and
+    `sep` the separator, see `_split_newlines`.
+    """
+    if not in_quotes and not (quoted and b'"' in buf):
+        count = buf.count(b'\n')
+        if count < n:
+            return -1, count, False
+        idx = -1
+        for _ in range(n):
+            idx = buf.find(b'\n', idx + 1)
+        return idx, n, False
+    ends, in_quotes = _record_newlines(buf, in_quotes, prev_byte=prev_byte, sep=sep)
+    if len(ends) < n:
+        return -1, len(ends), in_quotes
+    return int(ends[n - 1]), n, in_quotes
+
+def _rfind_record_end(buf, n, stop, in_quotes=False, quoted=True, prev_byte=None, sep=','):
+    """Like `_find_record_end`, counting backwards from `stop`, with `in_quotes` the quote state at `stop`."""
+    if not in_quotes and not (quoted and buf.find(b'"', 0, stop) >= 0):
+        idx = stop
+        for count in range(n):
+            idx = buf.rfind(b'\n', 0, idx)
+            if idx < 0:
+                return -1, count, False
+        return idx, n, False
+    try:
+        ends, in_quotes = _record_newlines(memoryview(buf)[:stop], in_quotes, True, prev_byte, sep)
+    except _AmbiguousQuotes as exc:
+        # The records past the stray quote may be all that is asked for.
+        if len(exc.ends) < n:
+            raise
+        return int(exc.ends[-n]), n, False
+    if len(ends) < n:
+        return -1, len(ends), in_quotes
+    return int(ends[-n]), n, in_quotes
+
+def _skip_lines(fd, n_lines, offset=0, quoted=True, sep=','):
+    """
+    Return the byte offset just past `n_lines` records starting at `offset`, or EOF if the file is shorter.
+
+    `offset` must be the start of a record. With `quoted`, newlines inside quoted
+    fields do not end a record; otherwise every newline does. `sep` is the
+    separator, see `_split_newlines`.
+    """
+    pos = offset
+    remaining = n_lines
+    in_quotes = False
+    prev_byte = None
+    while remaining > 0:
+        buf = _pread(fd, _BLOCK_SIZE, pos)
+        if not buf:
+            break
+        if len(buf) == _BLOCK_SIZE:
+            # A block never ends inside a run of quotes, which is read as a whole.
+            buf = buf[:len(buf) - _trailing_quotes(buf)]
+        idx, found, in_quotes = _find_record_end(buf, remaining, in_quotes, quoted, prev_byte, sep)
+        if idx >= 0:
+            return pos + idx + 1
+        remaining -= found
+        pos += len(buf)
+        prev_byte = buf[-1]
+    return pos
+
+def _read_forward(fd, n_lines, offset=0, block_size=None, quoted=True, sep=','):
+    """Read `n_lines` records starting at `offset`; return their bytes and the offset just past them."""
+    block_size = block_size or _BLOCK_SIZE
+    chunks = []
+    pos = offset
+    remaining = n_lines
+    in_quotes = False
+    prev_byte = None
+    while remaining > 0:
+        buf = _pread(fd, block_size, pos)
+        if not buf:
+            break
+        if len(buf) == block_size:
+            buf = buf[:len(buf) - _trailing_quotes(buf)]
+        idx, found, in_quotes = _find_record_end(buf, remaining, in_quotes, quoted, prev_byte, sep)
+        if idx < 0:
+            chunks.append(buf)
+            remaining -= found
+            pos += len(buf)
+            prev_byte = buf[-1]
+            continue
+        chunks.append(memoryview(buf)[:idx + 1])
+        pos += idx + 1
+        break
+    return b''.join(chunks), pos
+
+def _read_backward(fd, n_lines, end, floor=0, block_size=None, quoted=True, sep=','):
+    """
+    Read the last `n_lines` records before `end`, never going below `floor`; return their start offset and bytes.
+
+    `end` must be the end of a record, outside any quoted field. Raises `_AmbiguousQuotes`
+    when stray quotes keep the records from being told apart scanning back.
+    """
+    if n_lines <= 0 or end <= floor:
+        return end, b''
+    block_size = block_size or _BLOCK_SIZE
+    chunks = []
+    remaining = n_lines
+    in_quotes = False
+    pos = end
+    while pos > floor:
+        block_start = max(floor, pos - block_size)
+        # The byte before the block tells whether a quote at its start can open a field.
+        lead = 1 if block_start > floor else 0
+        buf = _pread(fd, pos - block_start + lead, block_start - lead)
+        prev_byte = buf[0] if lead else None
+        buf = buf[lead:]
+        if prev_byte == 0x22:
+            # A run of quotes across the start of the block is left whole to the block before it.
+            skipped = _leading_quotes(buf)
+            buf = buf[skipped:]
+            block_start += skipped
+        stop = len(buf)
+        if pos == end and buf.endswith(b'\n'):
+            # A trailing newline terminates the last record, it does not start a new one.
+            stop -= 1
+        idx, found, in_quotes = _rfind_record_end(buf, remaining, stop, in_quotes, quoted, prev_byte, sep)
+        if idx >= 0:
+            chunks.append(memoryview(buf)[idx + 1:])
+            return block_start + idx + 1, b''.join(reversed(chunks))
+        remaining -= found
+        chunks.append(buf)
+        pos = block_start
+    return floor, b''.join(reversed(chunks))
+
+def _forward_tail_offset(fd, n_lines, end, floor, sep=','):
+    """
+    Return where the last `n_lines` records before `end` start, scanning forward from `floor`.
+
+    Scanning back, a quote can only be told apart from a stray one inside an unquoted
+    field by what comes before it; when that is left undecided, the records are
+    counted from `floor` instead.
+    """
+    counts, _, states = _scan_chunk(fd, floor, end, sep=sep)
+    n_records = counts[0] + (1 if _pread(fd, 1, end - 1) != b'\n' or states[0] else 0)
+    return _skip_lines(fd, max(n_records - n_lines, 0), floor, sep=sep)
+
 def check_file_exists(path):
     if not os.path.isfile(path):
         raise FileNotFoundError(f"The file '{path}' does not exist.")
 
-def get_total_lines(path):
-    path_quoted = shlex.quote(str(path))
-    if platform.system().lower().startswith('win'):
-        cmd = [
-            'powershell',
-            '-Command',
-            f"(Get-Content -Path {path_quoted} | Measure-Object -Line).Lines"
-        ]
-    else:
-        cmd = ['wc', '-l', '--', path]
-    output = subprocess.check_output(cmd).decode().strip()
-    total_lines = output.strip().split()[0]
-    return int(total_lines)
+def _past_quotes(fd, pos):
+    """Return the offset of the first byte at or after `pos` that is not a quote, or EOF."""
+    while True:
+        buf = _pread(fd, 256, pos)
+        n = len(buf) - len(buf.lstrip(b'"'))
+        pos += n
+        if n < len(buf) or not buf:
+            return pos
+
+def _scan_chunk(fd, start, end, positions=False, sep=','):
+    """
+    Scan ``[start, end)`` of `fd` for record ends under both quote states it may start in.
+
+    The quote state at the start of a chunk depends on every quote before it, so
+    chunks scanned in parallel cannot know it. The newlines and quotes of each
+    block are found once, and split into record ends and quoted newlines under
+    the quote state of each of the two scans, until both reach the same state.
+    `sep` is the separator, see `_split_newlines`. A run of quotes across the
+    edge of two chunks is scanned with the chunk it starts in.
+
+    Returns, for a chunk starting outside quotes and for one starting inside, the
+    record ends, as counts or with `positions` as offsets, the number of newlines
+    inside quoted fields and the quote state at the end of the chunk.
+    """
+    found = ([], []) if positions else [0, 0]
+    quoted = [0, 0]
+    states = [False, True]
+    prev_byte = _pread(fd, 1, start - 1)[0] if start else None
+    run_end = _past_quotes(fd, end) if end > start and _pread(fd, 1, end - 1) == b'"' else end
+    pos = start
+    while pos < end:
+        buf = _pread(fd, min(_COUNT_BLOCK_SIZE, end - pos), pos)
+        if not buf:
+            break
+        if pos + len(buf) < end:
+            size = len(buf) - _trailing_quotes(buf)
+        else:
+            buf += _pread(fd, run_end - end, end) if run_end > end else b''
+            size = len(buf)
+        skip = 0
+        if pos == start and prev_byte == 0x22 and buf[0] == 0x22:
+            # Quotes at the start of the chunk that go on from before it are scanned with the chunk before.
+            skip = _leading_quotes(buf) or size
+        array = np.frombuffer(buf, dtype=np.uint8, count=size - skip, offset=skip)
+        if not positions and b'"' not in buf:
+            # Without quotes every newline ends a record, or stays quoted, under each state.
+            n_newlines = int(np.count_nonzero(array == ord('\n')))
+            for start_state in (0, 1):
+                if states[start_state]:
+                    quoted[start_state] += n_newlines
+                else:
+                    found[start_state] += n_newlines
+        else:
+            newlines = np.flatnonzero(array == ord('\n'))
+            quotes = np.flatnonzero(array == ord('"'))
+            splits = {}
+            for start_state in (0, 1):
+                state = states[start_state]
+                if state not in splits:
+                    splits[state] = _split_quoted(array, newlines, quotes, state, False, prev_byte, sep)
+                ends, inside, states[start_state] = splits[state]
+                if positions:
+                    found[start_state].append(ends + pos + skip)
+                else:
+                    found[start_state] += len(ends)
+                quoted[start_state] += len(inside)
+        pos += size
+        prev_byte = buf[size - 1]
+    if positions:
+        found = tuple(np.concatenate(parts) if parts else np.empty(0, dtype=np.int64) for parts in found)
+    return found, quoted, states
+
+ExecutorInfo = namedtuple('ExecutorInfo', [
+    'max_workers', 'queued', 'running', 'tasks', 'queue_wait',
+    'max_concurrent_reads', 'max_inflight_bytes', 'reads', 'waiting_reads', 'inflight_bytes', 'total_reads', 'read_wait',
+])
+
+class _SharedExecutor:
+    """
+    The thread pool every parallel path runs on, started on first use, and the limits on file reads.
+
+    Reads are limited across all threads, pool or not: no more than
+    `max_concurrent_reads` at once, expected to read no more than
+    `max_inflight_bytes` together. Tasks submitted from one of the pool's own
+    threads run in that thread, so that the pool never waits on itself.
+    """
+
+    def __init__(self, max_workers, max_concurrent_reads, max_inflight_bytes):
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._executor = None
+        self.max_workers = max_workers
+        self.max_concurrent_reads = max_concurrent_reads
+        self.max_inflight_bytes = max_inflight_bytes
+        self.queued = self.running = self.tasks = 0
+        self.reads = self.waiting_reads = self.inflight_bytes = self.total_reads = 0
+        self.queue_wait = self.read_wait = 0.0
+
+    def configure(self, max_workers, max_concurrent_reads, max_inflight_bytes):
+        with self._condition:
+            if max_workers != self.max_workers and self._executor is not None:
+                # Tasks already submitted still run; new ones go to a pool of the new size.
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.max_workers = max_workers
+            self.max_concurrent_reads = max_concurrent_reads
+            self.max_inflight_bytes = max_inflight_bytes
+            self._condition.notify_all()
+
+    def _after_fork(self):
+        """Start again without a pool in a forked child, which inherits the pool but none of its threads."""
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._executor = None
+        self.queued = self.running = 0
+        self.reads = self.waiting_reads = self.inflight_bytes = 0
+
+    def in_worker(self):
+        return getattr(self._local, 'worker', False)
+
+    def _mark_worker(self):
+        self._local.worker = True
+
+    def submit(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the pool, counting the time it waits for a thread."""
+        submitted = time.perf_counter()
+
+        def run():
+            with self._condition:
+                self.queued -= 1
+                self.running += 1
+                self.queue_wait += time.perf_counter() - submitted
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._condition:
+                    self.running -= 1
+
+        def dequeue_cancelled(future):
+            if future.cancelled():
+                with self._condition:
+                    self.queued -= 1
+
+        with self._condition:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='readcsvturbo', initializer=self._mark_worker
+                )
+            future = self._executor.submit(run)
+            self.queued += 1
+            self.tasks += 1
+        future.add_done_callback(dequeue_cancelled)
+        return future
+
+    def map(self, fn, items, window=None, ordered=True):
+        """
+        Map `fn` over `items` on the pool, yielding the results in order, or as they complete if not `ordered`.
+
+        With `window`, no more than `window` items are submitted ahead of the
+        result being yielded. Items not yet started are cancelled if a call
+        fails or the iteration is closed. In a thread of the pool, the calls are made in turn.
+        """
+        if self.in_worker():
+            return (fn(item) for item in items)
+        if not ordered:
+            return self._map_unordered(fn, items, window)
+        return self._map(fn, items, window)
+
+    def _map(self, fn, items, window):
+        futures = deque()
+        try:
+            for item in items:
+                futures.append(self.submit(fn, item))
+                if window and len(futures) >= window:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _map_unordered(self, fn, items, window):
+        pending = set()
+        try:
+            for item in items:
+                pending.add(self.submit(fn, item))
+                while window and len(pending) >= window:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _read_fits(self, n_bytes):
+        if self.max_concurrent_reads is not None and self.reads >= self.max_concurrent_reads:
+            return False
+        # A read larger than the whole budget runs once nothing else is in flight.
+        return self.max_inflight_bytes is None or not self.reads or self.inflight_bytes + n_bytes <= self.max_inflight_bytes
+
+    @contextlib.contextmanager
+    def read(self, n_bytes):
+        """Hold one of the concurrent reads and `n_bytes` of the in-flight budget, waiting for them if need be."""
+        if getattr(self._local, 'reading', False):
+            # A read within a read of the same thread is already accounted for.
+            yield
+            return
+        start = time.perf_counter()
+        with self._condition:
+            self.waiting_reads += 1
+            try:
+                self._condition.wait_for(lambda: self._read_fits(n_bytes))
+            finally:
+                self.waiting_reads -= 1
+            self.reads += 1
+            self.total_reads += 1
+            self.inflight_bytes += n_bytes
+            self.read_wait += time.perf_counter() - start
+        self._local.reading = True
+        try:
+            yield
+        finally:
+            self._local.reading = False
+            with self._condition:
+                self.reads -= 1
+                self.inflight_bytes -= n_bytes
+                self._condition.notify_all()
+
+    def info(self):
+        with self._condition:
+            return ExecutorInfo(
+                self.max_workers, self.queued, self.running, self.tasks, self.queue_wait,
+                self.max_concurrent_reads, self.max_inflight_bytes, self.reads, self.waiting_reads,
+                self.inflight_bytes, self.total_reads, self.read_wait,
+            )
+
+_shared_executor = _SharedExecutor(_EXECUTOR_MAX_WORKERS, _MAX_CONCURRENT_READS, _MAX_INFLIGHT_BYTES)
+if hasattr(os, 'register_at_fork'):
+    # Process pool workers may be forked once the thread pool has started.
+    os.register_at_fork(after_in_child=_shared_executor._after_fork)
+
+def configure_executor(max_workers=_EXECUTOR_MAX_WORKERS, max_concurrent_reads=_MAX_CONCURRENT_READS, max_inflight_bytes=_MAX_INFLIGHT_BYTES):
+    """
+    Configure the thread pool and the read limits shared by every read of the library.
+
+    Parallel line counts, index builds, numeric parsing, `read_csv_headtail`, the
+    `*_many` readers and the `aread_*` coroutines all run on one thread pool,
+    started on first use. Every file read, on any thread, also waits for its
+    turn under the read limits. Arguments left out are reset to their defaults.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Number of threads in the pool. Default is the number of CPUs plus four, up to 32.
+    max_concurrent_reads : int, optional
+        Maximum number of files read at once, or None for no limit. Default is the same as `max_workers`.
+    max_inflight_bytes : int, optional
+        Maximum number of bytes the reads in progress are expected to read together, or None for no limit.
+        A read larger than the whole budget runs alone. Default is 1 GiB.
+    """
+    if max_workers < 1:
+        raise ValueError("The executor must have a positive number of workers.")
+    if max_concurrent_reads is not None and max_concurrent_reads < 1:
+        raise ValueError("The limit on concurrent reads must be a positive number of reads.")
+    if max_inflight_bytes is not None and max_inflight_bytes < 1:
+        raise ValueError("The in-flight budget must be a positive number of bytes.")
+    _shared_executor.configure(max_workers, max_concurrent_reads, max_inflight_bytes)
+
+def executor_info():
+    """
+    Return the settings and the counters of the shared thread pool and read limits.
+
+    Returns
+    -------
+    ExecutorInfo
+        A named tuple with the pool size `max_workers`, the number of tasks `queued` for a thread
+        and `running`, the number of `tasks` submitted and the seconds they spent in the queue
+        (`queue_wait`); and the read limits `max_concurrent_reads` and `max_inflight_bytes`,
+        the number of `reads` in progress, of `waiting_reads`, the `inflight_bytes`, the number of
+        `total_reads` and the seconds they waited for their turn (`read_wait`).
+    """
+    return _shared_executor.info()
+
+@contextlib.contextmanager
+def _chunk_map(n_chunks):
+    """Yield a `map` over chunks: on the shared thread pool, or in the calling thread for a single chunk."""
+    if n_chunks <= 1:
+        yield map
+        return
+    # Both pread and the NumPy comparisons release the GIL, so the threads overlap I/O with scanning.
+    yield _shared_executor.map
+
+def get_total_lines(path, sep=','):
+    meta = _file_metadata(path, _quote_sep(sep))
+    if meta.total_lines is None:
+        with open(path, 'rb') as f:
+            _total_lines(_Source(path, f.fileno(), meta))
+    return meta.total_lines
+
+def _total_lines(source):
+    meta = source.meta
+    if meta.total_lines is None:
+        size = meta.stat_key[2]
+        counted = meta.counted
+        if counted is not None and size > counted.signature.size and _has_only_grown(source.fd, counted.signature):
+            # Only the bytes appended since the last count are scanned.
+            total_lines, ends_in_quotes, quoted_newlines = _extend_line_count(source.fd, counted, size, meta.sep)
+        else:
+            profile = _file_profile(source.fd, meta) if size else None
+            if profile is not None and profile.row_length:
+                # Fixed-width rows: the count follows from the file size.
+                meta.total_lines = 1 + (size - profile.first_line_length) // profile.row_length
+                return meta.total_lines
+            total_lines, ends_in_quotes, quoted_newlines = _count_lines(source.fd, size, meta.sep)
+        meta.counted = _LineCount(
+            _file_signature(source.fd, meta.stat_key), total_lines, ends_in_quotes, quoted_newlines
+        )
+        meta.total_lines, meta.quoted_newlines = total_lines, quoted_newlines
+    return meta.total_lines
+
+# The record count of one state of a file, which a count of the file once appended to starts from.
+_LineCount = namedtuple('_LineCount', ['signature', 'total_lines', 'ends_in_quotes', 'quoted_newlines'])
+
+def _count_record_ends(fd, start, end, in_quotes=False, sep=','):
+    """
+    Count the newlines that end a record in ``[start, end)``, where `start` is in the quote state `in_quotes`.
+
+    Returns the count, the quote state at `end` and whether any newline was inside a quoted field.
+    """
+    # Byte ranges are counted in parallel, each under both quote states it may
+    # start in; walking the chunks in order then picks the right count of each.
+    chunk_starts = range(start, end, _COUNT_CHUNK_SIZE)
+    n_ends = 0
+    quoted_newlines = False
+    with _chunk_map(len(chunk_starts)) as map_chunks:
+        scans = map_chunks(lambda chunk_start: _scan_chunk(fd, chunk_start, min(chunk_start + _COUNT_CHUNK_SIZE, end), sep=sep), chunk_starts)
+        for counts, quoted, states in scans:
+            n_ends += counts[in_quotes]
+            quoted_newlines = quoted_newlines or quoted[in_quotes] > 0
+            in_quotes = states[in_quotes]
+    return n_ends, in_quotes, quoted_newlines
+
+def _count_lines(fd, size, sep=','):
+    """
+    Return the number of records of a file separated by `sep`, whether it ends inside
+    a quoted field, and whether any of its records holds a quoted newline.
+    """
+    if size == 0:
+        return 0, False, False
+    total_lines, in_quotes, quoted_newlines = _count_record_ends(fd, 0, size, sep=sep)
+    # A last record without a trailing newline, or cut inside a quoted field, is still a record.
+    if _pread(fd, 1, size - 1) != b'\n' or in_quotes:
+        total_lines += 1
+    return total_lines, in_quotes, quoted_newlines
+
+def _extend_line_count(fd, counted, end, sep=','):
+    """Count the records of a file that `counted` counted before bytes were appended to it, up to `end`."""
+    start = counted.signature.size
+    # An unterminated last record is continued by the appended bytes, not followed by them.
+    n_ended = counted.total_lines
+    if start and (_pread(fd, 1, start - 1) != b'\n' or counted.ends_in_quotes):
+        n_ended -= 1
+    n_ends, in_quotes, quoted_newlines = _count_record_ends(fd, start, end, counted.ends_in_quotes, sep)
+    total_lines = n_ended + n_ends + (1 if _pread(fd, 1, end - 1) != b'\n' or in_quotes else 0)
+    return total_lines, in_quotes, quoted_newlines or counted.quoted_newlines
+
+FileSignature = namedtuple('FileSignature', ['inode', 'size', 'mtime_ns', 'head_fingerprint', 'tail_fingerprint'])
+
+def _fingerprint(fd, start, end):
+    digest = hashlib.blake2b(_pread(fd, end - start, start), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def _file_signature(fd, stat_key=None):
+    """
+    Identify a state of a file: its inode, size, mtime and a hash of its first and last bytes.
+
+    The state is the one `stat_key` was taken in, by default the current one.
+    """
+    _, inode, size, mtime_ns = stat_key or _stat_key(os.fstat(fd))
+    return FileSignature(
+        inode,
+        size,
+        mtime_ns,
+        _fingerprint(fd, 0, min(_FINGERPRINT_SIZE, size)),
+        _fingerprint(fd, max(0, size - _FINGERPRINT_SIZE), size),
+    )
+
+def _has_only_grown(fd, signature):
+    """Whether the file behind `fd` is the file described by `signature` with bytes appended to it."""
+    stat = os.fstat(fd)
+    if stat.st_ino != signature.inode or stat.st_size <= signature.size:
+        return False
+    size = signature.size
+    return (
+        _fingerprint(fd, 0, min(_FINGERPRINT_SIZE, size)) == signature.head_fingerprint
+        and _fingerprint(fd, max(0, size - _FINGERPRINT_SIZE), size) == signature.tail_fingerprint
+    )
+
+class LineIndex:
+    """
+    Byte offsets of every `step`-th record of a CSV file, together with its exact record count.
+
+    The offsets are stored as a compact uint64 array: ``offsets[i]`` is the byte
+    offset where record ``i * step`` (0-based) starts. A record is a line, unless
+    a quoted field holds newlines; `quoted_newlines` tells whether any does, and
+    `ends_in_quotes` whether the file ends inside a quoted field, when it is
+    separated by `sep`. `signature` identifies the state of the file the index
+    was built for.
+    """
+
+    def __init__(self, step, total_lines, offsets, signature, quoted_newlines=False, ends_in_quotes=False, sep=','):
+        self.step = step
+        self.total_lines = total_lines
+        self.offsets = offsets
+        self.signature = signature
+        self.quoted_newlines = quoted_newlines
+        self.ends_in_quotes = ends_in_quotes
+        self.sep = sep
+
+    def seek(self, line):
+        """Return the closest indexed line at or before `line`, and the byte offset where it starts."""
+        if line >= self.total_lines:
+            return self.total_lines, self.signature.size
+        i = line // self.step
+        return i * self.step, int(self.offsets[i])
+
+def _index_path(path):
+    return f'{os.fspath(path)}{_INDEX_SUFFIX}'
+
+def _scan_line_offsets(fd, step, offset, line, end, in_quotes=False, sep=','):
+    """
+    Scan ``[offset, end)``, where `offset` is inside record number `line` and in the quote state `in_quotes`.
+
+    Returns the start offsets of the following records whose number is a multiple
+    of `step`, the number of records ended, the quote state at `end` and whether
+    any newline was inside a quoted field.
+    """
+    parts = []
+    n_records = 0
+    quoted_newlines = False
+    # Chunks are scanned in parallel under both quote states, and stitched in order:
+    # the state each chunk starts in, and so its record ends, follow from the chunks before it.
+    chunk_starts = range(offset, end, _COUNT_CHUNK_SIZE)
+    with _chunk_map(len(chunk_starts)) as map_chunks:
+        scans = map_chunks(
+            lambda start: _scan_chunk(fd, start, min(start + _COUNT_CHUNK_SIZE, end), True, sep),
+            chunk_starts,
+        )
+        for ends, quoted, states in scans:
+            quoted_newlines = quoted_newlines or quoted[in_quotes] > 0
+            # Every newline that ends a record starts a new one right after it.
+            starts = ends[in_quotes].astype(np.uint64)
+            starts += 1
+            first_line = line + n_records + 1
+            parts.append(starts[(-first_line) % step::step])
+            n_records += len(starts)
+            in_quotes = states[in_quotes]
+    offsets = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+    # A newline at the very end of the file does not start a record.
+    return offsets[offsets < end], n_records, in_quotes, quoted_newlines
+
+def _extend_line_index(fd, index, end):
+    """
+    Index the records in the bytes of a file past the end of `index`, up to `end`.
+
+    Returns the extended offsets, record count, quote state at `end` and whether
+    any quoted field holds a newline.
+    """
+    start = index.signature.size
+    if end <= start:
+        return index.offsets, index.total_lines, index.ends_in_quotes, index.quoted_newlines
+    new_offsets = [index.offsets]
+    if start == 0 or (_pread(fd, 1, start - 1) == b'\n' and not index.ends_in_quotes):
+        # The first new byte starts a new record.
+        line = index.total_lines
+        if line % index.step == 0:
+            new_offsets.append(np.array([start], dtype=np.uint64))
+    else:
+        # The new bytes continue the last, unterminated record.
+        line = index.total_lines - 1
+    scanned, n_records, in_quotes, quoted_newlines = _scan_line_offsets(
+        fd, index.step, start, line, end, index.ends_in_quotes, index.sep
+    )
+    new_offsets.append(scanned)
+    # A last record without a trailing newline, or cut inside a quoted field, is still a record.
+    total_lines = line + n_records + (1 if _pread(fd, 1, end - 1) != b'\n' or in_quotes else 0)
+    return np.concatenate(new_offsets), total_lines, in_quotes, quoted_newlines or index.quoted_newlines
+
+def build_line_index(path, step=_INDEX_STEP, sep=','):
+    """
+    Build a sidecar line index for a CSV file, saved next to it as ``<path>.rctidx``.
+
+    Parameters
+    ----------
+    path : str
+        The file path to the CSV file.
+    step : int, optional
+        Index the byte offset of every `step`-th line. Smaller values make reads
+        faster at the cost of a larger index. Default is 1024.
+    sep : str, optional
+        The separator of the file, which tells quotes that open a field from quotes
+        inside one. Reads with another `sep` do not use the index. Default is ','.
+
+    Returns
+    -------
+    LineIndex
+        The index that was written.
+
+    Notes
+    -----
+    - Once an index exists, `read_csv_head`, `read_csv_tail`, `read_csv_headtail` and
+      `read_csv_line_range` seek straight to the closest indexed line before the rows
+      they need, and scan at most `step` lines from there.
+    - The index also records the exact number of lines of the file.
+    - Rows whose quoted fields hold newlines are indexed and counted as one line each.
+    - When the file has only been appended to, the index is extended by scanning the
+      appended bytes only. Any other change to the file makes the index be ignored.
+
+    Example
+    -------
+    >>> build_line_index('data.csv', step=1000)
+    >>> df = read_csv_line_range('data.csv', n=150_000_000, rows_after_n=99)
+    """
+    check_file_exists(path)
+    if step < 1:
+        raise ValueError("The index step must be a positive number of lines.")
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        signature = _file_signature(fd)
+        sep = _quote_sep(sep)
+        empty = LineIndex(step, 0, np.empty(0, dtype=np.uint64), FileSignature(0, 0, 0, 0, 0), sep=sep)
+        offsets, total_lines, in_quotes, quoted_newlines = _extend_line_index(fd, empty, signature.size)
+
+    index = LineIndex(step, total_lines, offsets, signature, quoted_newlines, in_quotes, sep)
+    _write_line_index(path, index)
+    _metadata_cache.discard(path)
+    return index
+
+def _write_line_index(path, index):
+    tmp_path = f'{_index_path(path)}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        flags = (_INDEX_QUOTED_NEWLINES if index.quoted_newlines else 0) | (
+            _INDEX_ENDS_IN_QUOTES if index.ends_in_quotes else 0
+        ) | (ord(index.sep) if index.sep is not None else 0) << _INDEX_SEP_SHIFT
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, index.step, index.total_lines, flags, *index.signature))
+        f.write(index.offsets.astype('<u8').tobytes())
+    # Replace the old index atomically, so readers never see a partial one.
+    os.replace(tmp_path, _index_path(path))
+
+def _load_line_index(path, sep=','):
+    """
+    Return the sidecar index of `path`, or None if there is none, it no longer matches the file
+    or it was built with another separator than `sep`.
+
+    An index of a file that has only been appended to since is extended with the
+    appended lines and saved again.
+    """
+    try:
+        with open(_index_path(path), 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return None
+    if len(raw) < _INDEX_HEADER.size:
+        return None
+    magic, step, total_lines, flags, *signature = _INDEX_HEADER.unpack_from(raw)
+    if magic != _INDEX_MAGIC or flags >> _INDEX_SEP_SHIFT != (ord(sep) if sep is not None else 0):
+        return None
+    offsets = np.frombuffer(raw, dtype='<u8', offset=_INDEX_HEADER.size)
+    index = LineIndex(
+        step,
+        total_lines,
+        offsets,
+        FileSignature(*signature),
+        bool(flags & _INDEX_QUOTED_NEWLINES),
+        bool(flags & _INDEX_ENDS_IN_QUOTES),
+        sep,
+    )
+
+    stat = os.stat(path)
+    if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == index.signature[:3]:
+        return index
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        if not _has_only_grown(fd, index.signature):
+            return None
+        # Only the appended bytes are scanned.
+        new_signature = _file_signature(fd)
+        offsets, total_lines, in_quotes, quoted_newlines = _extend_line_index(fd, index, new_signature.size)
+    index = LineIndex(step, total_lines, offsets, new_signature, quoted_newlines, in_quotes, sep)
+    try:
+        _write_line_index(path, index)
+    except OSError:
+        # The extended index is still valid for this read even if it cannot be saved.
+        pass
+    return index
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+FileProfile = namedtuple(
+    'FileProfile',
+    ['line_terminator', 'bom', 'avg_row_length', 'first_line_length', 'row_length'],
+)
+
+def _stat_key(stat):
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+class _FileMetadata:
+    """What is known about one state of a file: its line index and count, its headers and its profile."""
+
+    def __init__(self, path, stat_key, previous=None, sep=','):
+        self.stat_key = stat_key
+        # The separator quotes are scanned with, see `_quote_sep`: it tells which records a quote spans.
+        self.sep = sep
+        self.line_index = _load_line_index(path, sep)
+        self.total_lines = None if self.line_index is None else self.line_index.total_lines
+        # The last count of the file, kept from the metadata of an earlier state of it.
+        self.counted = None if previous is None or self.line_index is not None else previous.counted
+        # Whether quoted fields hold newlines, once a scan of the whole file has told.
+        self.quoted_newlines = None if self.line_index is None else self.line_index.quoted_newlines
+        # Header line, as bytes, and offset of the first data row, for each `skip_n_first_rows`.
+        self.headers = {}
+        # Column dtypes and datetime formats of a head sample, for each `(header, skip_n_first_rows, schema_rows)`
+        # and set of parsing arguments.
+        self.schemas = {}
+        self.profile = None
+        # Memory map of the file and a NumPy view of it, kept until the metadata is evicted or replaced.
+        self.mapping = None
+        self.mapping_array = None
+
+    def release_mapping(self):
+        """Close the memory map, which holds a descriptor and keeps a deleted file on disk."""
+        mapping, self.mapping, self.mapping_array = self.mapping, None, None
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                # A read still holds a view of the map: it is closed once the last view is gone.
+                pass
+
+class _MetadataCache:
+    """A bounded LRU cache of `_FileMetadata`, keyed by path and separator and validated with one `os.stat`."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, sep=','):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        if stat is None or not S_ISREG(stat.st_mode):
+            raise FileNotFoundError(f"The file '{path}' does not exist.")
+        key = (os.fspath(path), sep)
+        stat_key = _stat_key(stat)
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous.stat_key == stat_key:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return previous
+            self.misses += 1
+
+        meta = _FileMetadata(path, stat_key, previous, sep)
+        released = []
+        with self._lock:
+            if self.maxsize > 0:
+                released.append(self._entries.pop(key, None))
+                self._entries[key] = meta
+                while len(self._entries) > self.maxsize:
+                    released.append(self._entries.popitem(last=False)[1])
+        _release_mappings(released)
+        return meta
+
+    def discard(self, path):
+        path = os.fspath(path)
+        with self._lock:
+            released = [self._entries.pop(key) for key in list(self._entries) if key[0] == path]
+        _release_mappings(released)
+
+    def resize(self, maxsize):
+        released = []
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                released.append(self._entries.popitem(last=False)[1])
+        _release_mappings(released)
+
+    def clear(self):
+        with self._lock:
+            released = list(self._entries.values())
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        _release_mappings(released)
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+def _release_mappings(metas):
+    for meta in metas:
+        if meta is not None:
+            meta.release_mapping()
+
+_metadata_cache = _MetadataCache(_METADATA_CACHE_SIZE)
+
+def _file_metadata(path, sep=','):
+    return _metadata_cache.get(path, sep)
+
+def set_metadata_cache_size(maxsize):
+    """
+    Set how many files the in-process metadata cache holds.
+
+    The cache keeps, for each recently read file, its line count, its decoded
+    headers and its profile (line terminator, BOM and average row length), so
+    repeated reads of an unchanged file cost one `os.stat` plus the data read.
+    The least recently used files are evicted first, and their memory maps closed.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of files to keep. 0 disables the cache. Default is 128.
+    """
+    _metadata_cache.resize(maxsize)
+
+def metadata_cache_info():
+    """
+    Return the statistics of the in-process metadata cache.
+
+    Returns
+    -------
+    CacheInfo
+        A named tuple with the number of `hits` and `misses`, the `maxsize` of the
+        cache and its current size `currsize`.
+    """
+    return _metadata_cache.info()
+
+def clear_metadata_cache():
+    """
+    Empty the in-process metadata cache and reset its statistics.
+
+    The memory maps of the `'mmap'` engine are kept with the metadata and closed
+    with it, so clearing the cache releases their descriptors, and the disk space
+    of mapped files that have since been deleted.
+    """
+    _metadata_cache.clear()
+
+def _fixed_row_layout(fd, size, head_sample, tail_sample, tail_start):
+    """
+    Return the length of the first line and the length shared by every later line, or None.
+
+    The layout is taken from the newlines of the first block and checked against the
+    newlines of the last block, one row in the middle of the file and the file size.
+    Samples with quotes are not taken as fixed-width, as quoted fields may hold newlines.
+    """
+    if (tail_sample or head_sample)[-1:] != b'\n' or b'"' in head_sample or b'"' in tail_sample:
+        return None
+    head_newlines = np.flatnonzero(np.frombuffer(head_sample, dtype=np.uint8) == ord('\n'))
+    if len(head_newlines) < 3:
+        return None
+    first_line_length = int(head_newlines[0]) + 1
+    row_lengths = np.diff(head_newlines)
+    row_length = int(row_lengths[0])
+    if (row_lengths != row_length).any() or (size - first_line_length) % row_length:
+        return None
+    if tail_sample:
+        tail_newlines = np.flatnonzero(np.frombuffer(tail_sample, dtype=np.uint8) == ord('\n')) + tail_start
+        if len(tail_newlines) == 0 or ((tail_newlines + 1 - first_line_length) % row_length).any():
+            return None
+        if (np.diff(tail_newlines) != row_length).any():
+            return None
+        # The middle row must sit exactly where the layout puts it.
+        n_rows = (size - first_line_length) // row_length
+        start = first_line_length + (n_rows // 2) * row_length
+        row = _pread(fd, row_length + 1, start - 1)
+        if row[:1] != b'\n' or row.find(b'\n', 1) != row_length:
+            return None
+    return first_line_length, row_length
+
+def _file_profile(fd, meta):
+    """Return the profile of a file, sampling its first and last blocks the first time."""
+    if meta.profile is None:
+        size = meta.stat_key[2]
+        head_sample = _pread(fd, _BLOCK_SIZE, 0)
+        tail_start = max(size - _BLOCK_SIZE, len(head_sample))
+        tail_sample = _pread(fd, _BLOCK_SIZE, tail_start)
+        # Only complete lines are measured: everything up to the last newline of the
+        # head sample, and everything after the first newline of the tail sample.
+        head_lines = head_sample[:head_sample.rfind(b'\n') + 1]
+        tail_lines = tail_sample[tail_sample.find(b'\n') + 1:]
+        n_newlines = head_lines.count(b'\n') + tail_lines.count(b'\n')
+        first_newline = head_sample.find(b'\n')
+        layout = _fixed_row_layout(fd, size, head_sample, tail_sample, tail_start) or (None, None)
+        meta.profile = FileProfile(
+            line_terminator='\r\n' if first_newline > 0 and head_sample[first_newline - 1] == ord('\r') else '\n',
+            bom=head_sample.startswith(codecs.BOM_UTF8),
+            avg_row_length=(len(head_lines) + len(tail_lines)) / n_newlines if n_newlines else max(size, 1),
+            first_line_length=layout[0],
+            row_length=layout[1],
+        )
+    return meta.profile
+
+def _read_size(fd, meta, n_rows):
+    """Return how many bytes to read at once to get `n_rows` rows in a single read."""
+    if n_rows <= _PROFILE_MIN_ROWS:
+        return _BLOCK_SIZE
+    # Leave some margin, so that rows a little longer than average still fit.
+    return max(_BLOCK_SIZE, int(n_rows * _file_profile(fd, meta).avg_row_length * 1.1))
+
+def _fixed_tail_offset(meta, n_rows, floor):
+    """Return where the last `n_rows` lines start if the rows have a fixed width, else None."""
+    profile = meta.profile
+    if profile is None or not profile.row_length:
+        return None
+    return max(floor, meta.stat_key[2] - max(n_rows, 0) * profile.row_length)
+
+def _nearest_known_line(fd, meta, line, known=(0, 0)):
+    """
+    Return the closest known line at or before `line`, as a line number and offset.
+
+    With fixed-width rows this is `line` itself; otherwise the line index or
+    `known`, whichever is closer. The profile is only sampled for long skips.
+    """
+    profile = meta.profile
+    if profile is None and meta.line_index is None and line - known[0] > _PROFILE_MIN_ROWS:
+        profile = _file_profile(fd, meta)
+    if profile is not None and profile.row_length:
+        if line <= 0:
+            return 0, 0
+        return line, min(meta.stat_key[2], profile.first_line_length + (line - 1) * profile.row_length)
+    if meta.line_index is not None:
+        indexed = meta.line_index.seek(line)
+        if indexed[0] > known[0]:
+            return indexed
+    return known
+
+def _quoted(meta):
+    """Whether reads must track quotes: unless a scan of the whole file found no newline in a quoted field."""
+    return meta.quoted_newlines is not False
+
+def _seek_line(fd, meta, line, known=(0, 0)):
+    """Return the byte offset where line number `line` (0-based) starts, or EOF."""
+    known_line, offset = _nearest_known_line(fd, meta, line, known)
+    return _skip_lines(fd, line - known_line, offset, _quoted(meta), meta.sep)
+
+def _read_header(fd, meta, skip_n_first_rows):
+    """Return the header line after `skip_n_first_rows` lines, as bytes, and the offset of the first data row."""
+    cached = meta.headers.get(skip_n_first_rows)
+    if cached is None:
+        pos = _seek_line(fd, meta, skip_n_first_rows)
+        header_bytes, pos = _read_forward(fd, 1, pos, quoted=_quoted(meta), sep=meta.sep)
+        cached = meta.headers[skip_n_first_rows] = (_header_line(header_bytes), pos)
+    return cached
+
+def _read_head(fd, meta, header, skip_n_first_rows, n_rows, skip_data_rows=0):
+    """
+    Read the header and `n_rows` data rows, after skipping `skip_data_rows` data rows.
+
+    Returns the header line as bytes, the offset of the first data row and the data bytes.
+    """
+    block_size = _read_size(fd, meta, n_rows)
+    header_line = b''
+    if header:
+        if skip_data_rows == 0 and skip_n_first_rows not in meta.headers:
+            # The header and the data are next to each other: one bounded read returns both.
+            pos = _seek_line(fd, meta, skip_n_first_rows)
+            lines, _ = _read_forward(fd, 1 + max(n_rows, 0), pos, block_size, _quoted(meta), meta.sep)
+            split = _find_record_end(lines, 1, quoted=_quoted(meta), sep=meta.sep)[0] + 1
+            if split == 0:
+                split = len(lines)
+            header_line = _header_line(lines[:split])
+            meta.headers[skip_n_first_rows] = (header_line, pos + split)
+            return header_line, pos + split, lines[split:]
+        header_line, pos = _read_header(fd, meta, skip_n_first_rows)
+    else:
+        pos = _seek_line(fd, meta, skip_n_first_rows)
+    if skip_data_rows > 0:
+        line = skip_n_first_rows + (1 if header else 0)
+        pos = _seek_line(fd, meta, line + skip_data_rows, (line, pos))
+    data_bytes, _ = _read_forward(fd, n_rows, pos, block_size, _quoted(meta), meta.sep)
+    return header_line, pos, data_bytes
+
+def _read_tail(fd, meta, header, skip_n_first_rows, n_rows):
+    """
+    Read the header and the last `n_rows` data rows.
+
+    Returns the header line as bytes, the offset of the first returned data row and the data bytes.
+    """
+    if header:
+        # A small read at the start of the file, in the same descriptor as the tail.
+        header_line, pos = _read_header(fd, meta, skip_n_first_rows)
+    else:
+        header_line, pos = b'', _seek_line(fd, meta, skip_n_first_rows)
+    end = meta.stat_key[2]
+    block_size = _read_size(fd, meta, n_rows)
+    start = _fixed_tail_offset(meta, n_rows, pos)
+    if start is not None:
+        # Fixed-width rows: the tail starts at a computed offset, read in one call.
+        return header_line, start, _pread(fd, end - start, start)
+    try:
+        start, data_bytes = _read_backward(fd, n_rows, end, pos, block_size, _quoted(meta), meta.sep)
+    except _AmbiguousQuotes:
+        start = _forward_tail_offset(fd, n_rows, end, pos, meta.sep)
+        data_bytes = _pread(fd, end - start, start)
+    return header_line, start, data_bytes
+
+def _decode(data_bytes):
+    return data_bytes.decode('utf-8').strip()
+
+def _header_line(line_bytes):
+    # The header is kept as the bytes of the file: only the parser knows its encoding.
+    return bytes(line_bytes).strip()
+
+def _header_text(header_line, encoding='utf-8'):
+    """Return a header line as text, decoding it with `encoding` if it is the bytes read from the file."""
+    return header_line if isinstance(header_line, str) else bytes(header_line).decode(encoding)
+
+def _is_blank(data_bytes):
+    # Look at the start of the data first, so that only blank data is ever copied whole.
+    if bytes(data_bytes[:_BLOCK_SIZE]).strip():
+        return False
+    return len(data_bytes) <= _BLOCK_SIZE or not bytes(data_bytes).strip()
+
+def _check_line_number(n, data_bytes):
+    if n < 1 or _is_blank(data_bytes):
+        raise ValueError("Requested starting line exceeds the available number of data lines in the file.")
+
+# Everything an engine may need to read from a file: its path, an open descriptor and its metadata.
+_Source = namedtuple('_Source', ['path', 'fd', 'meta'])
+
+class _PythonEngine:
+    """Reads the file in blocks with `os.pread`, scanning forward from the start or backwards from the end."""
+
+    name = 'python'
+    reports_offsets = True
+
+    def read_head(self, source, header, skip_n_first_rows, n_rows, skip_data_rows=0):
+        return _read_head(source.fd, source.meta, header, skip_n_first_rows, n_rows, skip_data_rows)
+
+    def read_tail(self, source, header, skip_n_first_rows, n_rows):
+        return _read_tail(source.fd, source.meta, header, skip_n_first_rows, n_rows)
+
+def _mmap_skip_lines(m, array, n_lines, offset, end, quoted=True, sep=','):
+    """Return the offset just past `n_lines` records starting at `offset` in the map `m`, or `end`."""
+    pos = offset
+    if n_lines <= _MMAP_FIND_MAX_LINES:
+        for _ in range(n_lines):
+            idx = m.find(b'\n', pos, end)
+            if idx < 0:
+                pos = end
+                break
+            pos = idx + 1
+        # Raw newlines all end a record when no quote comes before them.
+        if not quoted or m.find(b'"', offset, pos) < 0:
+            return pos
+        pos = offset
+    # Many lines, or quotes: look for the record ends of a whole window at once in the NumPy view of the map.
+    remaining = n_lines
+    in_quotes = False
+    while pos < end:
+        window_end = min(end, pos + _COUNT_BLOCK_SIZE)
+        if window_end < end:
+            # A window never ends inside a run of quotes, which is read as a whole.
+            window_end -= _trailing_quotes(array[pos:window_end])
+        if quoted:
+            ends, in_quotes = _record_newlines(
+                array[pos:window_end], in_quotes, prev_byte=int(array[pos - 1]) if pos > offset else None, sep=sep
+            )
+        else:
+            ends = np.flatnonzero(array[pos:window_end] == ord('\n'))
+        if len(ends) >= remaining:
+            return pos + int(ends[remaining - 1]) + 1
+        remaining -= len(ends)
+        pos = window_end
+    return end
+
+def _mmap_tail_offset(m, array, n_lines, end, floor, quoted=True, sep=','):
+    """Return the offset where the last `n_lines` records before `end` start in the map `m`, never below `floor`."""
+    if n_lines <= 0 or end <= floor:
+        return end
+    # A trailing newline terminates the last record, it does not start a new one.
+    last = end - 1 if m[end - 1] == ord('\n') else end
+    if n_lines <= _MMAP_FIND_MAX_LINES:
+        pos = last
+        for _ in range(n_lines):
+            idx = m.rfind(b'\n', floor, pos)
+            if idx < 0:
+                start = floor
+                break
+            pos = idx
+        else:
+            start = pos + 1
+        # The end of the file is outside quotes, so without quotes after them raw newlines end a record.
+        if not quoted or m.find(b'"', start, end) < 0:
+            return start
+    remaining = n_lines
+    in_quotes = False
+    pos = last
+    while pos > floor:
+        window_start = max(floor, pos - _COUNT_BLOCK_SIZE)
+        if window_start > floor and array[window_start - 1] == 0x22:
+            window_start += _leading_quotes(array[window_start:pos])
+        if quoted:
+            prev_byte = int(array[window_start - 1]) if window_start > floor else None
+            try:
+                ends, in_quotes = _record_newlines(array[window_start:pos], in_quotes, True, prev_byte, sep)
+            except _AmbiguousQuotes as exc:
+                if len(exc.ends) < remaining:
+                    raise
+                return window_start + int(exc.ends[-remaining]) + 1
+        else:
+            ends = np.flatnonzero(array[window_start:pos] == ord('\n'))
+        if len(ends) >= remaining:
+            return window_start + int(ends[-remaining]) + 1
+        remaining -= len(ends)
+        pos = window_start
+    return floor
+
+class _MmapEngine:
+    """
+    Maps the file into memory and finds line boundaries with `mmap.find`, or NumPy for many lines.
+
+    The map is kept with the file metadata, so repeated reads of a hot file are served
+    from the page cache without a syscall, and the rows are returned as memoryviews of
+    the map that are handed to pandas without being copied first.
+    """
+
+    name = 'mmap'
+    reports_offsets = True
+
+    def _map(self, source):
+        meta = source.meta
+        if meta.mapping is None:
+            # Map the size seen by `stat`, so the map matches the rest of the metadata.
+            mapping = mmap.mmap(source.fd, meta.stat_key[2], access=mmap.ACCESS_READ)
+            meta.mapping_array = np.frombuffer(mapping, dtype=np.uint8)
+            meta.mapping = mapping
+        return meta.mapping, meta.mapping_array
+
+    def _seek_line(self, source, m, array, line, known=(0, 0)):
+        known_line, offset = _nearest_known_line(source.fd, source.meta, line, known)
+        return _mmap_skip_lines(m, array, line - known_line, offset, len(m), _quoted(source.meta), source.meta.sep)
+
+    def _read_header(self, source, m, array, skip_n_first_rows):
+        meta = source.meta
+        cached = meta.headers.get(skip_n_first_rows)
+        if cached is None:
+            pos = self._seek_line(source, m, array, skip_n_first_rows)
+            end = _mmap_skip_lines(m, array, 1, pos, len(m), _quoted(meta), meta.sep)
+            cached = meta.headers[skip_n_first_rows] = (_header_line(m[pos:end]), end)
+        return cached
+
+    def read_head(self, source, header, skip_n_first_rows, n_rows, skip_data_rows=0):
+        meta = source.meta
+        if meta.stat_key[2] == 0:
+            # Empty files cannot be mapped.
+            return _PYTHON_ENGINE.read_head(source, header, skip_n_first_rows, n_rows, skip_data_rows)
+        m, array = self._map(source)
+        if header:
+            header_line, pos = self._read_header(source, m, array, skip_n_first_rows)
+        else:
+            header_line, pos = b'', self._seek_line(source, m, array, skip_n_first_rows)
+        if skip_data_rows > 0:
+            line = skip_n_first_rows + (1 if header else 0)
+            pos = self._seek_line(source, m, array, line + skip_data_rows, (line, pos))
+        end = _mmap_skip_lines(m, array, n_rows, pos, len(m), _quoted(meta), meta.sep)
+        return header_line, pos, memoryview(m)[pos:end]
+
+    def read_tail(self, source, header, skip_n_first_rows, n_rows):
+        meta = source.meta
+        if meta.stat_key[2] == 0:
+            return _PYTHON_ENGINE.read_tail(source, header, skip_n_first_rows, n_rows)
+        m, array = self._map(source)
+        if header:
+            header_line, floor = self._read_header(source, m, array, skip_n_first_rows)
+        else:
+            header_line, floor = b'', self._seek_line(source, m, array, skip_n_first_rows)
+        if n_rows > _PROFILE_MIN_ROWS:
+            _file_profile(source.fd, meta)
+        start = _fixed_tail_offset(meta, n_rows, floor)
+        if start is None:
+            try:
+                start = _mmap_tail_offset(m, array, n_rows, len(m), floor, _quoted(meta), meta.sep)
+            except _AmbiguousQuotes:
+                start = _forward_tail_offset(source.fd, n_rows, len(m), floor, meta.sep)
+        return header_line, start, memoryview(m)[start:]
+
+def _powershell_path(path):
+    return "'" + os.fspath(path).replace("'", "''") + "'"
+
+class _ChildProcesses:
+    """The child processes started for one read, killed together if the read is cancelled."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = []
+        self.cancelled = False
+
+    def popen(self, cmd, **kwargs):
+        with self._lock:
+            if self.cancelled:
+                raise concurrent.futures.CancelledError()
+            process = subprocess.Popen(cmd, **kwargs)
+            self._processes.append(process)
+            return process
+
+    def kill(self):
+        with self._lock:
+            self.cancelled = True
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+# The `_ChildProcesses` of the read running in the current context, if it can be cancelled.
+_child_processes = contextvars.ContextVar('_child_processes', default=None)
+
+def _popen(cmd, **kwargs):
+    """`subprocess.Popen`, registering the process with the cancellable read that starts it."""
+    children = _child_processes.get()
+    if children is None:
+        return subprocess.Popen(cmd, **kwargs)
+    return children.popen(cmd, **kwargs)
+
+def _check_output(cmd, stdin=None):
+    """`subprocess.check_output`, through `_popen`."""
+    with _popen(cmd, stdin=stdin, stdout=subprocess.PIPE) as process:
+        output, _ = process.communicate()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, output)
+    return output
+
+class _SubprocessEngine:
+    """
+    Extracts lines with the system tools: `sed` and `tail`, or PowerShell on Windows.
+
+    The tools do not report where the lines they return start, so `headtail`
+    works out the overlap between the head and the tail from the line count.
+    They also take every line for a record, so this engine does not support
+    newlines inside quoted fields.
+    """
+
+    name = 'subprocess'
+    reports_offsets = False
+
+    def _lines(self, path, first_line, n_lines):
+        """Return `n_lines` lines starting at the 1-based line number `first_line`."""
+        if n_lines <= 0:
+            return b''
+        if platform.system().lower().startswith('win'):
+            cmd = [
+                'powershell',
+                '-Command',
+                f"Get-Content -Path {_powershell_path(path)} | Select-Object -Skip {first_line - 1} -First {n_lines}"
+            ]
+        else:
+            # Quit after the last requested line instead of reading on to EOF.
+            last_line = first_line + n_lines - 1
+            cmd = ['sed', '-n', f'{first_line},{last_line}p;{last_line}q', '--', path]
+        return _check_output(cmd)
+
+    def _header(self, path, skip_n_first_rows):
+        return _header_line(self._lines(path, skip_n_first_rows + 1, 1))
+
+    def read_head(self, source, header, skip_n_first_rows, n_rows, skip_data_rows=0):
+        header_line = self._header(source.path, skip_n_first_rows) if header else b''
+        first_line = skip_n_first_rows + (1 if header else 0) + max(skip_data_rows, 0) + 1
+        return header_line, None, self._lines(source.path, first_line, n_rows)
+
+    def read_tail(self, source, header, skip_n_first_rows, n_rows):
+        header_line = self._header(source.path, skip_n_first_rows) if header else b''
+        skip_lines = skip_n_first_rows + (1 if header else 0)
+        if n_rows <= 0:
+            return header_line, None, b''
+        if platform.system().lower().startswith('win'):
+            cmd = [
+                'powershell',
+                '-Command',
+                f"Get-Content -Path {_powershell_path(source.path)} | Select-Object -Skip {skip_lines}"
+            ]
+            output = _check_output(cmd).splitlines()
+            return header_line, None, b'\n'.join(output[-n_rows:])
+        # Skip the first 'skip_lines' lines, then get the last 'n_rows' lines
+        tail_proc = _popen(['tail', '-n', f'+{skip_lines + 1}', '--', source.path], stdout=subprocess.PIPE)
+        output = _check_output(['tail', '-n', f'{n_rows}'], stdin=tail_proc.stdout)
+        tail_proc.stdout.close()
+        tail_proc.wait()
+        return header_line, None, output
+
+_PYTHON_ENGINE = _PythonEngine()
+
+_ENGINES = {
+    engine.name: engine
+    for engine in (_PYTHON_ENGINE, _MmapEngine(), _SubprocessEngine())
+}
+
+def _select_engine(engine, source, n_rows):
+    """
+    Return the engine called `engine`, or for 'auto', the engine best suited to reading `n_rows` rows.
+
+    Reads are served by the python engine, which needs no process spawn and seeks
+    straight to the rows it needs. Reads expected to return a large slice of a
+    large file use the mmap engine, which finds line boundaries without a
+    syscall per block.
+    """
+    if engine != 'auto':
+        try:
+            return _ENGINES[engine]
+        except KeyError:
+            raise ValueError(
+                f"Unknown engine '{engine}'. Expected one of: 'auto', {', '.join(map(repr, _ENGINES))}."
+            ) from None
+    size = source.meta.stat_key[2]
+    if size < _MMAP_MIN_BYTES or n_rows <= _PROFILE_MIN_ROWS:
+        return _PYTHON_ENGINE
+    expected_bytes = n_rows * _file_profile(source.fd, source.meta).avg_row_length
+    return _ENGINES['mmap'] if expected_bytes >= _MMAP_MIN_BYTES else _PYTHON_ENGINE
+
+def _data_content(*data_bytes):
+    """
+    Return the data of a read in the form it is parsed in: a list of its non-empty segments.
+
+    The segments are the bytes, or memory map views, returned by the engines. They
+    are handed to pandas one after the other, without being decoded or joined.
+    """
+    return [segment for segment in data_bytes if len(segment)]
+
+def _read_limit(source, *n_rows):
+    """Hold a read of the shared read limits, sized for slices of `n_rows` rows of the file."""
+    return _shared_executor.read(sum(_read_size(source.fd, source.meta, max(rows, 0)) for rows in n_rows))
+
+def _head_content(source, header, skip_n_first_rows, n_rows, engine='auto'):
+    reader = _select_engine(engine, source, n_rows)
+    with _read_limit(source, n_rows):
+        header_line, _, data_bytes = reader.read_head(source, header, skip_n_first_rows, max(n_rows, 0))
+    return header_line, _data_content(data_bytes)
+
+def _tail_content(source, header, skip_n_first_rows, n_rows, engine='auto'):
+    reader = _select_engine(engine, source, n_rows)
+    with _read_limit(source, n_rows):
+        header_line, _, data_bytes = reader.read_tail(source, header, skip_n_first_rows, max(n_rows, 0))
+    return header_line, _data_content(data_bytes)
+
+def _headtail_content(source, header, skip_n_first_rows, n_rows_head, n_rows_tail, engine='auto'):
+    n_rows_head = max(n_rows_head, 0)
+    n_rows_tail = max(n_rows_tail, 0)
+    reader = _select_engine(engine, source, n_rows_head + n_rows_tail)
+    if not reader.reports_offsets:
+        # Without offsets the overlap has to be removed up front, from the line count.
+        available_lines = _total_lines(source) - skip_n_first_rows - (1 if header else 0)
+        n_rows_tail = min(n_rows_tail, max(available_lines - n_rows_head, 0))
+
+    if (reader.reports_offsets and n_rows_head + n_rows_tail <= _PROFILE_MIN_ROWS) or _shared_executor.in_worker():
+        # A block at each end of the file: reading them in turn costs less than handing one to a thread.
+        with _read_limit(source, n_rows_head, n_rows_tail):
+            header_line, head_start, head_bytes = reader.read_head(source, header, skip_n_first_rows, n_rows_head)
+            _, tail_start, tail_bytes = reader.read_tail(source, header, skip_n_first_rows, n_rows_tail)
+    else:
+        def read_head():
+            with _read_limit(source, n_rows_head):
+                return reader.read_head(source, header, skip_n_first_rows, n_rows_head)
+
+        # Retrieve the header and head on the shared pool while this thread reads the tail,
+        # through one shared descriptor. The head runs in a copy of this context, so its child
+        # processes are killed with a cancelled read.
+        future_head = _shared_executor.submit(contextvars.copy_context().run, read_head)
+        with _read_limit(source, n_rows_tail):
+            _, tail_start, tail_bytes = reader.read_tail(source, header, skip_n_first_rows, n_rows_tail)
+        # The tail gives its read back before waiting: the head may be queued behind tasks waiting for one.
+        header_line, head_start, head_bytes = future_head.result()
+
+    # Rows that are part of both the head and the tail are only kept once; the
+    # overlap is found from the byte offsets, so the file never has to be counted.
+    if reader.reports_offsets:
+        head_end = head_start + len(head_bytes)
+        if tail_start < head_end:
+            tail_bytes = tail_bytes[head_end - tail_start:]
+
+    # Combine head and tail data
+    return header_line, _data_content(head_bytes, tail_bytes)
+
+def _line_range_content(source, n, rows_after_n, header, skip_n_first_rows, engine='auto'):
+    num_lines = max(rows_after_n, 0) + 1  # Total number of lines to retrieve
+    reader = _select_engine(engine, source, num_lines)
+    with _read_limit(source, num_lines):
+        header_line, _, data_bytes = reader.read_head(
+            source, header, skip_n_first_rows, num_lines, skip_data_rows=n - 1
+        )
+    _check_line_number(n, data_bytes)
+    return header_line, _data_content(data_bytes)
+
+def _as_text(data):
+    return data if isinstance(data, str) else '\n'.join(_decode(segment) for segment in data)
+
+def csv_header(path, skip_n_first_rows=0):
+    meta = _file_metadata(path)
+    with open(path, 'rb') as f:
+        header_line, _ = _read_header(f.fileno(), meta, skip_n_first_rows)
+    return _header_text(header_line)
+
+def csv_head(path, total_lines=None, header=True, skip_n_first_rows=0, n_rows=1, engine='auto'):
+    # `total_lines` is ignored: the rows are found without counting the lines of the
+    # file. It is kept so that positional arguments still bind as they always have.
+    # Stops reading as soon as the last requested line has been found, so the
+    # cost grows with `skip_n_first_rows + n_rows` rather than with the file size.
+    if n_rows <= 0:
+        return ''
+    meta = _file_metadata(path)
+    with open(path, 'rb') as f:
+        _, data = _head_content(_Source(path, f.fileno(), meta), header, skip_n_first_rows, n_rows, engine)
+    return _as_text(data)
+
+def csv_tail(path, total_lines=None, header=True, skip_n_first_rows=0, n_rows=1, engine='auto'):
+    # `total_lines` is ignored, as in `csv_head`.
+    # Seek to the end of the file and scan backwards, so the cost depends on the
+    # size of the requested rows rather than on the size of the file.
+    if n_rows <= 0:
+        return ''
+    meta = _file_metadata(path)
+    with open(path, 'rb') as f:
+        _, data = _tail_content(_Source(path, f.fileno(), meta), header, skip_n_first_rows, n_rows, engine)
+    return _as_text(data)
+
+def csv_line_range(path, total_lines=None, n=None, rows_after_n=0, header=True, skip_n_first_rows=0, engine='auto'):
+    # `total_lines` is ignored, as in `csv_head`.
+    if n is None:
+        raise TypeError("csv_line_range() missing required argument: 'n'")
+    meta = _file_metadata(path)
+    with open(path, 'rb') as f:
+        _, data = _line_range_content(
+            _Source(path, f.fileno(), meta), n, rows_after_n, header, skip_n_first_rows, engine
+        )
+    return _as_text(data)
+
+class _SegmentReader(RawIOBase):
+    """A read-only binary file over a list of bytes-like segments, read in turn without joining them."""
+
+    def __init__(self, segments):
+        self._segments = [memoryview(segment).cast('B') for segment in segments if len(segment)]
+        self._index = 0
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        out = memoryview(buffer).cast('B')
+        n = 0
+        while n < len(out) and self._index < len(self._segments):
+            segment = self._segments[self._index]
+            size = min(len(out) - n, len(segment) - self._pos)
+            out[n:n + size] = segment[self._pos:self._pos + size]
+            n += size
+            self._pos += size
+            if self._pos == len(segment):
+                self._index += 1
+                self._pos = 0
+        return n
+
+def _csv_data(header_str, data, encoding='utf-8'):
+    """
+    Return a file for pandas to read `header_str` and `data` from, `data` being a string or segments.
+
+    Segments are chained behind the header rather than joined to it, so the rows
+    reach the parser as the bytes that were read from the file. A header read
+    from the file is bytes too, and goes in as it is; `encoding` is the one of
+    the file, which a header given as text is encoded in.
+    """
+    if isinstance(data, str):
+        header_str = _header_text(header_str, encoding)
+        return StringIO(f'{header_str}\n{data}' if header_str else data)
+    if isinstance(header_str, str):
+        header_str = header_str.encode(encoding)
+    segments = [header_str, b'\n'] if header_str else []
+    for segment in data:
+        segments.append(segment)
+        if segment[-1] != ord('\n'):
+            segments.append(b'\n')
+    return _SegmentReader(segments)
+
+def _small_column(values):
+    """
+    Convert the strings of one column as `pandas.read_csv` does by default.
+
+    Returns an array or list to build the column from, or None when the values
+    are not plainly missing, boolean, numeric or text, so pandas must decide.
+    """
+    present = [value for value in values if value not in _NA_VALUES]
+    if not present:
+        return np.full(len(values), np.nan)
+    has_na = len(present) < len(values)
+    if _BOOL_VALUES.issuperset(present):
+        flags = [np.nan if value in _NA_VALUES else value in _TRUE_VALUES for value in values]
+        return np.array(flags, dtype=object if has_na else bool)
+    if max(map(len, present)) > _SMALL_PARSE_MAX_DIGITS:
+        # Long numbers may not round the same way as in pandas, or may not fit in an int64.
+        return None
+    # One match over the whole column rather than one per value.
+    joined = '\n'.join(present)
+    if _INTS_PATTERN.fullmatch(joined):
+        if not has_na:
+            return np.array(list(map(int, values)), dtype=np.int64)
+        return np.array([np.nan if value in _NA_VALUES else int(value) for value in values], dtype=np.float64)
+    if _NUMBERS_PATTERN.fullmatch(joined):
+        return np.array([np.nan if value in _NA_VALUES else float(value) for value in values], dtype=np.float64)
+    for value in present:
+        stripped = value.strip()
+        if stripped in _NA_VALUES or stripped in _TRUE_VALUES or stripped in _FALSE_VALUES:
+            return None
+        try:
+            # Anything Python reads as a number ('inf', ' 1', '1_000', ...) is left to pandas.
+            float(value)
+        except ValueError:
+            continue
+        return None
+    return [np.nan if value in _NA_VALUES else value for value in values]
+
+def _column_names(header_str, header, sep, width):
+    """Return the column names pandas gives a slice `width` fields wide, or None if pandas would rename any."""
+    if not header:
+        return list(range(width))
+    # Only reads without `pandas.read_csv` arguments get here, so the file is in UTF-8.
+    names = next(csv.reader([_header_text(header_str)], delimiter=sep))
+    # Duplicate, unnamed and BOM-prefixed columns are renamed by pandas.
+    if len(set(names)) < len(names) or not all(names) or names[0].startswith('\ufeff'):
+        return None
+    return names
+
+def _compact_column(values, compact):
+    """
+    Return a column in the smallest dtype that holds its values exactly.
+
+    Integers get the narrowest (unsigned) integer type of their range, floats
+    float32 when every value survives the round trip, and text columns of few
+    distinct values become categoricals; with ``compact='pyarrow'``, the other
+    text columns use pyarrow-backed strings. Other columns are left as they are.
+    """
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and dtype.kind in 'iu':
+        if len(values) == 0:
+            return values
+        low, high = values.min(), values.max()
+        types = [np.uint8, np.uint16, np.uint32, np.uint64] if low >= 0 else [np.int8, np.int16, np.int32, np.int64]
+        return values.astype(next(t for t in types if np.iinfo(t).min <= low and high <= np.iinfo(t).max))
+    if dtype is not None and dtype.kind == 'f':
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return narrow
+        return values
+    if not (isinstance(dtype, pd.StringDtype) or pd.api.types.infer_dtype(values, skipna=True) == 'string'):
+        return values
+    categorical = pd.Categorical(values)
+    n_present = len(categorical) - int(categorical.isna().sum())
+    if len(categorical.categories) <= n_present * _COMPACT_MAX_CATEGORY_RATIO:
+        return categorical
+    if compact == 'pyarrow':
+        return pd.array(values, dtype=pd.StringDtype('pyarrow'))
+    return values
+
+def _compact_frame(df, compact):
+    """Return `df` with every column compacted, see `_compact_column`."""
+    if not compact or not len(df.columns):
+        return df
+    compacted = pd.DataFrame({i: _compact_column(df.iloc[:, i], compact) for i in range(len(df.columns))})
+    compacted.columns = df.columns
+    return compacted
+
+def _parse_small(header_str, data, header, sep, kwargs, compact=False):
+    """
+    Parse a slice of a few rows with the `csv` module, or return None to leave it to `pandas.read_csv`.
+
+    Only the default options are handled, and the columns come out with the
+    dtypes `pandas.read_csv` would give them: int64, float64, bool or text.
+    """
+    if kwargs or not isinstance(sep, str) or len(sep) != 1 or sep in '"\r\n':
+        return None
+    if isinstance(data, str):
+        text = data
+    else:
+        if sum(len(segment) for segment in data) > _SMALL_PARSE_MAX_BYTES:
+            return None
+        try:
+            text = '\n'.join(bytes(segment).decode('utf-8') for segment in data)
+        except UnicodeDecodeError:
+            return None
+    if len(text) > _SMALL_PARSE_MAX_BYTES or text.count('\n') > 2 * _SMALL_PARSE_MAX_ROWS:
+        return None
+    rows = []
+    for row in csv.reader(StringIO(text), delimiter=sep):
+        if not row:
+            # Blank lines are skipped.
+            continue
+        if len(row) == 1 and not row[0].strip():
+            # Whether pandas skips this line depends on its quotes, which the csv module drops.
+            return None
+        rows.append(row)
+    if not rows or len(rows) > _SMALL_PARSE_MAX_ROWS:
+        return None
+    names = _column_names(header_str, header, sep, len(rows[0]))
+    if names is None or any(len(row) != len(names) for row in rows):
+        return None
+    columns = []
+    for values in zip(*rows):
+        column = _small_column(values)
+        if column is None:
+            return None
+        columns.append(column)
+    if compact:
+        columns = [_compact_column(column, compact) for column in columns]
+    if all(isinstance(column, np.ndarray) and column.dtype == columns[0].dtype for column in columns):
+        # Columns of one dtype make a single 2D block, much cheaper to build than one block per column.
+        return pd.DataFrame(np.column_stack(columns), columns=pd.Index(names))
+    df = pd.DataFrame(dict(enumerate(columns)))
+    df.columns = pd.Index(names)
+    return df
+
+def _numeric_fields(block, sep, n_columns):
+    """
+    Find the fields of a block of whole rows, or return None if it cannot be a table of numbers.
+
+    Returns the start and length of every field, and how often each byte value occurs in the block.
+    """
+    counts = np.bincount(block, minlength=256)
+    allowed = _NUMERIC_BYTES.copy()
+    allowed[[sep, ord('\n'), ord('\r')]] = True
+    n_rows = int(counts[ord('\n')])
+    if n_rows == 0 or counts[~allowed].any() or counts[sep] != n_rows * (n_columns - 1):
+        return None
+    ends = np.flatnonzero((block == sep) | (block == ord('\n')))
+    row_ends = ends[n_columns - 1::n_columns]
+    # With as many separators as rows need, every row has `n_columns` fields when each of
+    # its last fields ends in a newline.
+    if not (block[row_ends] == ord('\n')).all():
+        return None
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    if counts[ord('\r')]:
+        # Carriage returns may only end rows.
+        carriage_returns = block.take(row_ends - 1, mode='clip') == ord('\r')
+        if np.count_nonzero(carriage_returns) != counts[ord('\r')]:
+            return None
+        ends[n_columns - 1::n_columns] -= carriage_returns
+    return starts, ends - starts, counts
+
+def _push_digits(values, digits, is_digit):
+    """Append `digits` to `values` where `is_digit`; the arithmetic is cheaper than `np.where`."""
+    shifted = values * 9
+    shifted += digits
+    shifted *= is_digit
+    shifted += values
+    return shifted
+
+def _parse_numeric_block(block, sep, n_columns):
+    """
+    Convert one block of whole rows of numbers, without a Python-level loop over the fields.
+
+    Fields are read position by position, one NumPy operation covering the same
+    position of every field. Returns the rows as an int64 matrix, as a float64
+    matrix (None when every column holds only integers) and which columns hold
+    only integers; or None when a field is not a plain number, so the slice must
+    be left to pandas.
+    """
+    fields = _numeric_fields(block, sep, n_columns)
+    if fields is None:
+        return None
+    starts, lengths, counts = fields
+    width = int(lengths.max())
+    present = lengths > 0
+    if width == 0 or width > 2 * _MAX_INT_DIGITS or (n_columns == 1 and not present.all()):
+        # Blank lines, which pandas skips, or fields too long to be numbers this parser converts.
+        return None
+    first = block.take(starts, mode='clip')
+    negative = present & (first == ord('-'))
+    signed = negative | (present & (first == ord('+')))
+    n_signs = counts[ord('+')] + counts[ord('-')]
 
-def csv_header(path, skip_n_first_rows=0):
-    path_quoted = shlex.quote(str(path))
-    skip_lines = skip_n_first_rows
-
-    if platform.system().lower().startswith("win"):
-        cmd = [
-            'powershell',
-            '-Command',
-            f"Get-Content -Path '{path}' | Select-Object -Skip {skip_lines} -First 1"
-        ]
+    # The byte at each position of every field; past its end, a field stays on the separator
+    # or newline that ends it, which is neither a digit nor part of a number.
+    ends = starts + lengths
+    at = starts.copy()
+    mantissa = np.zeros(len(starts), dtype=np.int64)
+    if not (counts[ord('e')] or counts[ord('E')]):
+        # Plain decimals: signs must open their fields, and each field has at most one dot.
+        has_dot = np.zeros(len(starts), dtype=bool)
+        n_fraction = np.zeros(len(starts), dtype=np.uint8)
+        for _ in range(width):
+            chars = block.take(at)
+            digits = chars - ord('0')
+            is_digit = digits <= 9
+            mantissa = _push_digits(mantissa, digits, is_digit)
+            if counts[ord('.')]:
+                n_fraction += is_digit & has_dot
+                has_dot |= chars == ord('.')
+            at += 1
+            np.minimum(at, ends, out=at)
+        n_mantissa = lengths - signed - has_dot
+        if (
+            np.count_nonzero(signed) != n_signs or np.count_nonzero(has_dot) != counts[ord('.')]
+            or (present & (n_mantissa == 0)).any()
+        ):
+            return None
+        is_int = present & ~has_dot
+        exponent = -n_fraction.astype(np.int64)
+        n_exponent = np.zeros_like(exponent)
     else:
-        start_line = 1 + skip_lines
-        cmd = ['sed', '-n', f'{start_line}p', path]
-    output = subprocess.check_output(cmd).decode('utf-8').strip()
-    return output
+        exponent = np.zeros(len(starts), dtype=np.int64)
+        n_mantissa = np.zeros(len(starts), dtype=np.uint8)
+        n_fraction = np.zeros(len(starts), dtype=np.uint8)
+        n_exponent = np.zeros(len(starts), dtype=np.uint8)
+        exponent_negative = np.zeros(len(starts), dtype=bool)
+        after_dot = np.zeros(len(starts), dtype=bool)
+        in_exponent = np.zeros(len(starts), dtype=bool)
+        after_marker = np.zeros(len(starts), dtype=bool)
+        invalid = np.zeros(len(starts), dtype=bool)
+        for position in range(width):
+            chars = block.take(at)
+            digits = chars - ord('0')
+            is_digit = digits <= 9
+            is_dot = chars == ord('.')
+            is_marker = (chars == ord('e')) | (chars == ord('E'))
+            is_sign = (chars == ord('+')) | (chars == ord('-'))
+            if position:
+                # Signs may only open a field or follow its exponent marker.
+                invalid |= is_sign & ~after_marker
+                exponent_negative |= (chars == ord('-')) & after_marker
+            invalid |= (is_dot & (after_dot | in_exponent)) | (is_marker & in_exponent)
+            mantissa_digit = is_digit & ~in_exponent
+            mantissa = _push_digits(mantissa, digits, mantissa_digit)
+            n_mantissa += mantissa_digit
+            n_fraction += mantissa_digit & after_dot
+            exponent_digit = is_digit & in_exponent
+            exponent = _push_digits(exponent, digits, exponent_digit)
+            n_exponent += exponent_digit
+            after_dot |= is_dot
+            in_exponent |= is_marker
+            after_marker = is_marker
+            at += 1
+            np.minimum(at, ends, out=at)
+        invalid |= (present & (n_mantissa == 0)) | (in_exponent & (n_exponent == 0))
+        if invalid.any():
+            return None
+        is_int = present & ~after_dot & ~in_exponent
+        exponent = np.where(exponent_negative, -exponent, exponent) - n_fraction
+        n_mantissa = n_mantissa.astype(np.int64)
 
-def csv_head(path, total_lines, header=True, skip_n_first_rows=0, n_rows=1):
-    skip_lines = skip_n_first_rows + (1 if header else 0)
-    n_rows = min(n_rows, total_lines - skip_lines)
-    if n_rows <= 0:
-        return ''
-    path_quoted = shlex.quote(str(path))
-
-    if platform.system().lower().startswith('win'):
-        cmd = [
-            'powershell',
-            '-Command',
-            f"Get-Content -Path {path_quoted} | Select-Object -Skip {skip_lines} -First {n_rows}"
-        ]
-    else:
-        start_line = skip_lines + 1
-        end_line = start_line + n_rows - 1
-        cmd = ['sed', '-n', f'{start_line},{end_line}p', path]
-    output = subprocess.check_output(cmd).decode('utf-8').strip()
-    return output
+    if (is_int & (n_mantissa > _MAX_INT_DIGITS)).any() or (~is_int & (n_mantissa > _SMALL_PARSE_MAX_DIGITS)).any():
+        # Too long for an int64, or a decimal pandas does not always round to the nearest float.
+        return None
 
-def csv_tail(path, total_lines, header=True, skip_n_first_rows=0, n_rows=1):
-    skip_lines = skip_n_first_rows + (1 if header else 0)
-    n_available_lines = total_lines - skip_lines
-    n_rows = min(n_rows, n_available_lines)
-    if n_rows <= 0:
-        return ''
-    path_quoted = shlex.quote(str(path))
-
-    if platform.system().lower().startswith('win'):
-        # On Windows
-        cmd = [
-            'powershell',
-            '-Command',
-            f"Get-Content -Path {path_quoted} | Select-Object -Skip {skip_lines}"
-        ]
-        output = subprocess.check_output(cmd).decode('utf-8').splitlines()
-        data_lines = output[-n_rows:]  # Get the last n_rows from the remaining lines
-        output = '\n'.join(data_lines)
-    else:
-        # On Unix-like systems
-        # Skip the first 'skip_lines' lines, then get the last 'n_rows' lines
-        cmd = ['tail', '-n', f'+{skip_lines + 1}', path]
-        tail_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        output = subprocess.check_output(['tail', '-n', f'{n_rows}'], stdin=tail_proc.stdout).decode('utf-8').strip()
-        tail_proc.stdout.close()
-        tail_proc.wait()
-    return output
+    ints = np.where(negative, -mantissa, mantissa).reshape(-1, n_columns)
+    int_columns = is_int.reshape(-1, n_columns).all(axis=0)
+    if int_columns.all():
+        return ints, None, int_columns
+    # Below 2**53 and 10**22 both factors are exact, so one multiplication or division
+    # rounds the value correctly, as a full decimal conversion would; Python converts the
+    # rest, including exponents of more than 3 digits, which may have overflowed.
+    exact = (np.abs(exponent) <= 22) & (n_exponent <= 3)
+    powers = _FLOAT_POWERS_OF_TEN[np.clip(np.abs(exponent), 0, 22)]
+    floats = mantissa.astype(np.float64)
+    floats = np.where(exponent >= 0, floats * powers, floats / powers)
+    for i in np.flatnonzero(present & ~exact):
+        floats[i] = abs(float(bytes(block[starts[i]:starts[i] + lengths[i]])))
+    floats = np.where(negative, -floats, floats)
+    floats[~present] = np.nan
+    return ints, floats.reshape(-1, n_columns), int_columns
+
+def _long_ints(ints):
+    """
+    Tell whether integers of `ints` have more digits than `_SMALL_PARSE_MAX_DIGITS`.
+
+    In a column that also holds decimals, pandas reads such integers as decimals,
+    which it does not always round as a conversion of the int64 to float64 does.
+    """
+    return bool((np.abs(ints) >= 10 ** _SMALL_PARSE_MAX_DIGITS).any())
 
-def csv_line_range(path, total_lines, n, rows_after_n=0, header=True, skip_n_first_rows=0):
-    skip_lines = (1 if header else 0) + skip_n_first_rows
-    available_lines = total_lines - skip_lines
+def _row_blocks(array, block_size):
+    """Split `array` into `(start, end)` ranges of whole lines of about `block_size` bytes."""
+    bounds = [0]
+    while len(array) - bounds[-1] > block_size:
+        window_start = bounds[-1] + block_size
+        cut = -1
+        while cut < 0 and window_start < len(array):
+            newlines = np.flatnonzero(array[window_start:window_start + _BLOCK_SIZE] == ord('\n'))
+            if len(newlines):
+                cut = window_start + int(newlines[0]) + 1
+            window_start += _BLOCK_SIZE
+        if cut < 0 or cut >= len(array):
+            break
+        bounds.append(cut)
+    bounds.append(len(array))
+    return list(zip(bounds[:-1], bounds[1:]))
 
-    if n < 1 or n > available_lines:
-        raise ValueError("Requested starting line exceeds the available number of data lines in the file.")
+def _numeric_arrays(header_str, data, header, sep, kwargs):
+    """
+    Parse a slice of numbers with NumPy, or return None to leave it to `pandas.read_csv`.
+
+    The separators and newlines of the raw bytes are found with NumPy, and the
+    fields converted to int64 or float64 in vectorized blocks of rows, in parallel.
+    The columns come out as `pandas.read_csv` would read them, empty fields as NaN;
+    any field that is not a plain decimal number sends the slice back to pandas.
+    Returns the column names, the rows as an int64 matrix and as a float64 matrix
+    (None when every column holds only integers) and which columns hold only integers.
+    """
+    if kwargs or not isinstance(sep, str) or len(sep) != 1 or not sep.isascii() or sep in '"\r\n.+-eE0123456789':
+        return None
+    if isinstance(data, str):
+        data = [data.encode('utf-8')]
+    segments = []
+    for segment in data:
+        segments.append(np.frombuffer(segment, dtype=np.uint8))
+        if segment[-1] != ord('\n'):
+            segments.append(np.frombuffer(b'\n', dtype=np.uint8))
+    array = segments[0] if len(segments) == 1 else np.concatenate(segments)
+    first_row = array[:np.argmax(array == ord('\n')) + 1]
+    names = _column_names(header_str, header, sep, int(np.count_nonzero(first_row == ord(sep))) + 1)
+    if names is None:
+        return None
+
+    blocks = _row_blocks(array, _NUMERIC_BLOCK_SIZE)
+    with _chunk_map(len(blocks)) as map_blocks:
+        parsed = list(map_blocks(lambda bounds: _parse_numeric_block(array[bounds[0]:bounds[1]], ord(sep), len(names)), blocks))
+    if any(block is None for block in parsed):
+        return None
 
-    rows_after_n = min(rows_after_n, available_lines - n)
-    num_lines = rows_after_n + 1  # Total number of lines to retrieve
+    int_columns = np.logical_and.reduce([block_int_columns for _, _, block_int_columns in parsed])
+    ints = np.concatenate([ints for ints, _, _ in parsed])
+    if int_columns.all():
+        return names, ints, None, int_columns
+    if _long_ints(ints[:, ~int_columns]):
+        return None
+    floats = np.concatenate([ints.astype(np.float64) if floats is None else floats for ints, floats, _ in parsed])
+    return names, ints, floats, int_columns
 
-    path_quoted = shlex.quote(str(path))
+def _numeric_columns(arrays, compact):
+    """Return the columns of the matrices of `_numeric_arrays`, compacted if asked to."""
+    names, ints, floats, int_columns = arrays
+    columns = [ints[:, i] if int_columns[i] else floats[:, i] for i in range(len(names))]
+    return [_compact_column(column, compact) for column in columns] if compact else columns
 
-    # Map the data line numbers to file line numbers
-    start_file_line = skip_lines + n
-    end_file_line = start_file_line + rows_after_n
+def _parse_numeric(header_str, data, header, sep, kwargs, compact=False):
+    """Parse a slice of numbers into a DataFrame with NumPy, see `_numeric_arrays`, or return None."""
+    arrays = _numeric_arrays(header_str, data, header, sep, kwargs)
+    if arrays is None:
+        return None
+    names, ints, floats, int_columns = arrays
+    if compact:
+        df = pd.DataFrame(dict(enumerate(_numeric_columns(arrays, compact))))
+        df.columns = pd.Index(names)
+        return df
+    if int_columns.all():
+        return pd.DataFrame(ints, columns=pd.Index(names))
+    if not int_columns.any():
+        return pd.DataFrame(floats, columns=pd.Index(names))
+    df = pd.DataFrame(dict(enumerate(_numeric_columns(arrays, False))))
+    df.columns = pd.Index(names)
+    return df
 
-    if platform.system().lower().startswith('win'):
-        # Windows implementation
-        skip_lines_cmd = start_file_line - 1
-        cmd = [
-            'powershell',
-            '-Command',
-            f"Get-Content -Path {path_quoted} | Select-Object -Skip {skip_lines_cmd} -First {num_lines}"
-        ]
+def _numeric_records(header_str, data, header, sep, kwargs, compact=False):
+    """Parse a slice of numbers into a structured array with NumPy, see `_numeric_arrays`, or return None."""
+    arrays = _numeric_arrays(header_str, data, header, sep, kwargs)
+    if arrays is None:
+        return None
+    names = arrays[0]
+    columns = _numeric_columns(arrays, compact)
+    records = np.empty(len(arrays[1]), dtype=[(str(name), column.dtype) for name, column in zip(names, columns)])
+    for name, column in zip(names, columns):
+        records[str(name)] = column
+    return records
+
+def _data_segments(data):
+    """Return `data`, a string or segments read from the file, as segments."""
+    if isinstance(data, str):
+        return [data.encode('utf-8')] if data else []
+    return data or []
+
+def _data_lines(data, sep=','):
+    """
+    Split the data into its rows, as bytes without their line terminators; blank lines are dropped.
+
+    `sep` is the separator of the file, which tells the quotes that open a field apart.
+    """
+    lines = []
+    for segment in _data_segments(data):
+        segment = bytes(segment)
+        if b'"' in segment:
+            # Newlines inside quoted fields do not end a row.
+            ends, _ = _record_newlines(segment, sep=_quote_sep(sep))
+            rows = [segment[start:end] for start, end in zip([0, *(ends + 1).tolist()], [*ends.tolist(), len(segment)])]
+        else:
+            rows = segment.split(b'\n')
+        for row in rows:
+            if row.endswith(b'\r'):
+                row = row[:-1]
+            if row:
+                lines.append(row)
+    return lines
+
+def _parse_columns(header_str, data, header, sep, encoding):
+    """Split the rows with the `csv` module into a dict of lists of field texts, None for empty fields."""
+    text = '\n'.join(line.decode(encoding) for line in _data_lines(data, sep))
+    rows = [row for row in csv.reader(StringIO(text), delimiter=sep) if row]
+    width = max(map(len, rows), default=0)
+    if header:
+        names = []
+        for name in next(csv.reader([_header_text(header_str, encoding)], delimiter=sep)) if header_str else []:
+            # Repeated names are numbered as pandas numbers them.
+            unique, count = name, 0
+            while unique in names:
+                count += 1
+                unique = f'{name}.{count}'
+            names.append(unique)
+        width = max(width, len(names))
+        names += [f'Unnamed: {i}' for i in range(len(names), width)]
     else:
-        # Unix-like systems implementation
-        cmd = ['sed', '-n', f'{start_file_line},{end_file_line}p', path]
-    output = subprocess.check_output(cmd).decode('utf-8').strip()
-    return output
+        names = list(range(width))
+    for row in rows:
+        if len(row) < width:
+            row += [''] * (width - len(row))
+    values = zip(*rows) if rows else [()] * width
+    return {
+        name: [value or None for value in column] if '' in column else list(column)
+        for name, column in zip(names, values)
+    }
+
+def _parse_arrow(header_str, data, header, sep, encoding):
+    """Read the rows into a `pyarrow.Table` with the CSV reader of pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        raise ImportError("output='arrow' requires pyarrow, which is not installed.") from None
+    data = _data_segments(data)
+    named = bool(header and header_str)
+    if not data and not named:
+        return pa.table({})
+    table = pa_csv.read_csv(
+        _csv_data(header_str if named else '', data, encoding),
+        read_options=pa_csv.ReadOptions(autogenerate_column_names=not named, encoding=encoding),
+        parse_options=pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True),
+    )
+    if not named:
+        table = table.rename_columns([str(i) for i in range(table.num_columns)])
+    return table
+
+# Column dtypes and the formats of the datetime columns, as read from a head sample of a file.
+_Schema = namedtuple('_Schema', ['dtypes', 'date_formats'])
+
+def _datetime_format(column):
+    """Return the format every value of a text column is a datetime in, or None."""
+    values = column.dropna()
+    if values.empty:
+        return None
+    date_format = guess_datetime_format(values.iloc[0])
+    if date_format is None:
+        return None
+    try:
+        pd.to_datetime(values, format=date_format)
+    except (ValueError, TypeError):
+        return None
+    return date_format
+
+def _infer_schema(sample):
+    """Read the dtypes and datetime formats of the columns of a sample; columns of only NA tell nothing."""
+    dtypes = {}
+    date_formats = {}
+    for name, column in sample.items():
+        if column.isna().all():
+            continue
+        if pd.api.types.is_string_dtype(column.dtype):
+            date_format = _datetime_format(column)
+            if date_format is not None:
+                date_formats[name] = date_format
+                continue
+        dtypes[name] = column.dtype
+    return _Schema(dtypes, date_formats)
+
+def _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs):
+    """Return the schema of the first `schema_rows` data rows, read once per state of the file."""
+    if schema_rows is None:
+        return None
+    if schema_rows < 1:
+        raise ValueError("The schema sample must be a positive number of rows.")
+    # The sample is parsed with the arguments of the read, which select, name and type its
+    # columns: reads with other arguments get a schema of their own. Values such as lists
+    # and dicts are not hashable, and are told apart by their repr.
+    arguments = tuple(sorted(
+        (name, repr(value)) for name, value in kwargs.items() if name not in ('output', 'compact', 'processes')
+    ))
+    key = (header, skip_n_first_rows, schema_rows, arguments)
+    schema = source.meta.schemas.get(key)
+    if schema is None:
+        header_str, data_str = _head_content(source, header, skip_n_first_rows, schema_rows, engine)
+        sample = parse_csv_content(header_str, data_str, header=header, **{**kwargs, 'output': 'pandas', 'compact': False})
+        schema = source.meta.schemas[key] = _infer_schema(sample)
+    return schema
+
+def _apply_schema(df, schema):
+    """Convert the datetime columns of a frame parsed without pandas, or return None if its dtypes differ from the schema."""
+    for name, dtype in schema.dtypes.items():
+        if name not in df.columns or df[name].dtype != dtype:
+            return None
+    if schema.date_formats:
+        df = df.copy(deep=False)
+        for name, date_format in schema.date_formats.items():
+            if name not in df.columns or not pd.api.types.is_string_dtype(df[name].dtype):
+                return None
+            try:
+                df[name] = pd.to_datetime(df[name], format=date_format)
+            except (ValueError, TypeError):
+                return None
+    return df
+
+def _read_csv(make_data, sep, header, schema, kwargs, compact=False):
+    """`pandas.read_csv` with the dtypes and datetime formats of `schema`, as far as the rows fit them."""
+    return _compact_frame(_read_csv_frame(make_data, sep, header, schema, kwargs), compact)
+
+def _read_csv_frame(make_data, sep, header, schema, kwargs):
+    if schema is not None:
+        schema_kwargs = {}
+        if schema.date_formats:
+            schema_kwargs.update(parse_dates=list(schema.date_formats), date_format=schema.date_formats)
+        # Integer and bool columns cannot hold missing values: if the rows have some, their
+        # types are inferred, and if other columns do not fit either, so are all the types.
+        nullable = {name: dtype for name, dtype in schema.dtypes.items() if dtype.kind not in 'iub'}
+        for dtypes in [schema.dtypes, nullable]:
+            try:
+                return pd.read_csv(make_data(), sep=sep, header=header, **{'dtype': dtypes, **schema_kwargs, **kwargs})
+            except ValueError:
+                pass
+    return pd.read_csv(make_data(), sep=sep, header=header, **kwargs)
+
+_process_pool_lock = threading.Lock()
+_process_pool = (None, None)
+# Workers are not forked from this process, whose threads a fork would leave behind
+# in a state no thread of the child can ever change.
+_PROCESS_START_METHOD = 'forkserver' if 'forkserver' in get_all_start_methods() else 'spawn'
+
+def _process_executor(processes):
+    """Return the process pool slices are parsed in, started on first use and restarted to change its size."""
+    global _process_pool
+    with _process_pool_lock:
+        size, executor = _process_pool
+        if executor is None or size != processes:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            # Started before the workers, the resource tracker is shared with them, so the
+            # blocks they create are unregistered when this process unlinks them.
+            resource_tracker.ensure_running()
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes, mp_context=get_context(_PROCESS_START_METHOD)
+            )
+            _process_pool = (processes, executor)
+        return executor
+
+def _drop_process_executor(executor):
+    """Shut down `executor`, broken by a worker that died, so that the next read starts a new pool."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool[1] is executor:
+            _process_pool = (None, None)
+    executor.shutdown(wait=False)
+
+def _parse_piece(name, start, end, header_str, header, sep, parser, schema, kwargs):
+    """
+    Parse bytes `start:end` of the shared memory block `name`, in a worker process.
+
+    Returns the column names and the columns: NumPy columns are copied into new
+    shared memory blocks, returned as `(block name, dtype, length)` for the caller
+    to copy out and unlink, and only the other columns are pickled.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        with block.buf[start:end] as piece:
+            data = bytes(piece)
+    finally:
+        block.close()
+    df = parse_csv_content(header_str, [data], header=header, parser=parser, schema=schema, sep=sep, **kwargs)
+    columns = []
+    for _, column in df.items():
+        if not isinstance(column.dtype, np.dtype) or column.dtype.kind not in 'biufmM':
+            columns.append(column.array)
+            continue
+        values = column.to_numpy()
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        columns.append((block.name, values.dtype.str, len(values)))
+        block.close()
+    return list(df.columns), columns
 
-def parse_csv_content(header_str, data_str, header=True, **kwargs):
+def _piece_blocks(pieces):
+    """Attach the shared memory blocks of parsed pieces; returns the blocks and the pieces with NumPy views of them."""
+    blocks = []
+    views = []
+    for names, columns in pieces:
+        piece_columns = []
+        for column in columns:
+            if isinstance(column, tuple):
+                name, dtype, length = column
+                blocks.append(shared_memory.SharedMemory(name=name))
+                column = np.ndarray(length, dtype=dtype, buffer=blocks[-1].buf)
+            piece_columns.append(column)
+        views.append((names, piece_columns))
+    return blocks, views
+
+def _join_pieces(pieces):
+    """Stack the columns of parsed pieces, or return None if the pieces differ in their columns or types."""
+    names = pieces[0][0]
+    if len(set(names)) < len(names) or any(piece_names != names for piece_names, _ in pieces):
+        return None
+    starts = np.cumsum([0, *(len(columns[0]) if columns else 0 for _, columns in pieces)])
+    joined = {}
+    for i in range(len(names)):
+        parts = [columns[i] for _, columns in pieces]
+        dtypes = {part.dtype for part in parts}
+        # Integers and floats are read as floats, as they are when the slice is parsed at once.
+        if len(dtypes) > 1 and not dtypes <= {np.dtype(np.int64), np.dtype(np.float64)}:
+            return None
+        if len(dtypes) > 1 and any(part.dtype == np.int64 and _long_ints(part) for part in parts):
+            return None
+        buffer, dtype = _column_buffer([part.dtype for part in parts], starts[-1], True)
+        for start, part in zip(starts, parts):
+            buffer[start:start + len(part)] = np.asarray(part)
+        joined[i] = buffer if dtype is None else pd.array(buffer, dtype=dtype)
+    df = pd.DataFrame(joined, copy=False)
+    df.columns = pd.Index(names)
+    return df
+
+def _parse_in_processes(header_str, data, header, sep, parser, schema, kwargs, processes):
+    """
+    Parse a large slice in `processes` worker processes, or return None to parse it in this one.
+
+    The rows are copied once into shared memory and split at record boundaries,
+    and the workers return their columns through shared memory too, so neither
+    the rows nor the parsed frames are pickled. Pieces that come out with other
+    columns or types than their neighbours, which parsing the slice at once would
+    have unified, send the slice back to the calling process.
+    """
+    if not processes or processes < 2 or isinstance(data, str) or not kwargs.keys() <= _PROCESS_KWARGS:
+        return None
+    size = sum(len(segment) + 1 for segment in data)
+    n_pieces = min(processes, size // _PROCESS_MIN_BYTES)
+    if n_pieces < 2:
+        return None
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        array = np.ndarray(size, dtype=np.uint8, buffer=block.buf)
+        end = 0
+        for segment in data:
+            segment = np.frombuffer(segment, dtype=np.uint8)
+            array[end:end + len(segment)] = segment
+            end += len(segment)
+            if segment[-1] != ord('\n'):
+                array[end] = ord('\n')
+                end += 1
+        # The slice starts at a record and ends with a newline, so every piece gets whole records.
+        ends, _ = _record_newlines(array[:end], sep=_quote_sep(sep))
+        del array
+        cuts = ends[np.searchsorted(ends, np.arange(1, n_pieces) * end // n_pieces)] + 1
+        bounds = np.unique([0, *cuts.tolist(), end]).tolist()
+
+        def submit_pieces(executor):
+            return [
+                executor.submit(_parse_piece, block.name, start, stop, header_str, header, sep, parser, schema, kwargs)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+
+        executor = _process_executor(processes)
+        try:
+            futures = submit_pieces(executor)
+        except BrokenProcessPool:
+            # A worker died after the last read: the pieces go to a new pool.
+            _drop_process_executor(executor)
+            executor = _process_executor(processes)
+            futures = submit_pieces(executor)
+        concurrent.futures.wait(futures)
+    finally:
+        block.close()
+        block.unlink()
+    pieces = [future.result() for future in futures if future.exception() is None]
+    blocks, pieces = _piece_blocks(pieces)
+    try:
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if any(isinstance(error, BrokenProcessPool) for error in errors):
+            _drop_process_executor(executor)
+        if errors:
+            raise errors[0]
+        return _join_pieces(pieces)
+    finally:
+        del pieces
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+def parse_csv_content(header_str, data_str, header=True, parser='pandas', schema=None, output='pandas', compact=False, processes=None, **kwargs):
+    if parser not in ('pandas', 'numeric'):
+        raise ValueError(f"Unknown parser '{parser}'. Expected one of: 'pandas', 'numeric'.")
+    if compact not in (False, True, 'pyarrow'):
+        raise ValueError(f"Unknown compact mode '{compact}'. Expected one of: False, True, 'pyarrow'.")
+    if output not in ('pandas', 'numpy', 'columns', 'lines', 'arrow'):
+        raise ValueError(
+            f"Unknown output '{output}'. Expected one of: 'pandas', 'numpy', 'columns', 'lines', 'arrow'."
+        )
     sep = kwargs.pop('sep', ',')
+    # The header read from a file is the bytes of the file, in the encoding its rows are read with.
+    encoding = kwargs.get('encoding') or 'utf-8'
     # Strip whitespace to accurately check for emptiness
     header_str = header_str.strip() if header_str else ''
-    data_str = data_str.strip() if data_str else ''
+    if isinstance(data_str, list):
+        # Segments read from the file: pandas reads them as they are, without a copy into one string
+        data_str = [segment for segment in data_str if not _is_blank(segment)] or ''
+    else:
+        data_str = data_str.strip() if data_str else ''
+
+    if output in ('columns', 'lines', 'arrow'):
+        # These never reach pandas, so of its arguments only the encoding applies.
+        kwargs.pop('encoding', None)
+        if kwargs:
+            raise TypeError(f"output='{output}' takes no pandas.read_csv arguments but `sep` and `encoding`, got: {', '.join(kwargs)}.")
+        if output == 'lines':
+            return _data_lines(data_str, sep)
+        if output == 'columns':
+            return _parse_columns(header_str, data_str, header, sep, encoding)
+        return _parse_arrow(header_str, data_str, header, sep, encoding)
+    if output == 'numpy':
+        records = None
+        if data_str and (header_str or not header) and schema is None and not processes:
+            records = _numeric_records(header_str, data_str, header, sep, kwargs, compact)
+        if records is None:
+            df = parse_csv_content(
+                header_str, data_str, header=header, parser=parser, schema=schema, compact=compact,
+                processes=processes, sep=sep, **kwargs
+            )
+            records = df.to_records(index=False).view(np.ndarray)
+        return records
+
+    if data_str and (header_str or not header):
+        # A few rows are parsed directly, as pandas.read_csv costs more than the read itself.
+        # Columns are compacted as they are built, or once they have the dtypes of the schema.
+        compact_columns = compact if schema is None else False
+        df = _parse_small(header_str, data_str, header, sep, kwargs, compact_columns)
+        if df is None and processes:
+            # The workers apply the schema themselves.
+            parsed = _parse_in_processes(header_str, data_str, header, sep, parser, schema, kwargs, processes)
+            if parsed is not None:
+                return _compact_frame(parsed, compact)
+        if df is None and parser == 'numeric':
+            df = _parse_numeric(header_str, data_str, header, sep, kwargs, compact_columns)
+        if df is not None and schema is not None:
+            df = _apply_schema(df, schema)
+            if df is not None:
+                df = _compact_frame(df, compact)
+        if df is not None:
+            return df
 
     if header:
         if not header_str:
@@ -139,26 +2592,22 @@ def parse_csv_content(header_str, data_str, header=True, **kwargs):
                 return pd.DataFrame()
             else:
                 # No header but data present
-                string_data = StringIO(data_str)
-                return pd.read_csv(string_data, sep=sep, header=None, **kwargs)
+                return _read_csv(lambda: _csv_data('', data_str), sep, None, schema, kwargs, compact)
         else:
             if not data_str:
                 # Header present but no data
-                string_data = StringIO(header_str)
-                return pd.read_csv(string_data, sep=sep, header=0, **kwargs)
+                return _read_csv(lambda: StringIO(_header_text(header_str, encoding)), sep, 0, schema, kwargs, compact)
             else:
                 # Both header and data present
-                string_data = StringIO(f'{header_str}\n{data_str}')
-                return pd.read_csv(string_data, sep=sep, header=0, **kwargs)
+                return _read_csv(lambda: _csv_data(header_str, data_str, encoding), sep, 0, schema, kwargs, compact)
     else:
         if not data_str:
             # No data and no header
             return pd.DataFrame()
         else:
-            string_data = StringIO(data_str)
-            return pd.read_csv(string_data, sep=sep, header=None, **kwargs)
+            return _read_csv(lambda: _csv_data('', data_str), sep, None, schema, kwargs, compact)
 
-def read_csv_head(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
+def read_csv_head(path, header=True, skip_n_first_rows=0, n_rows=1, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
     """
     Read the first `n_rows` of a CSV file into a pandas DataFrame.
 
@@ -172,13 +2621,43 @@ def read_csv_head(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
         Number of initial data rows to skip before reading. Does not count the header row if `header` is True. Default is 0.
     n_rows : int, optional
         Number of data rows to read after skipping. Default is 1.
+    engine : {'auto', 'python', 'mmap', 'subprocess'}, optional
+        How the lines are extracted from the file. 'python' reads the file in blocks, 'mmap' maps it into
+        memory, 'subprocess' runs the system tools (`sed`/`tail`, or PowerShell on Windows). 'auto' picks
+        an engine from the file size, the number of requested rows and the file profile. Default is 'auto'.
+    parser : {'pandas', 'numeric'}, optional
+        How the rows are parsed. 'numeric' converts slices made only of numbers with NumPy, in parallel
+        blocks of rows, and hands anything else to `pandas.read_csv`, which 'pandas' always uses. A few
+        rows are parsed directly with either. Default is 'pandas'.
+    schema_rows : int, optional
+        If given, the column dtypes and datetime formats are inferred once from the first `schema_rows`
+        data rows, kept with the file metadata, and passed to the parser as `dtype`, `parse_dates` and
+        `date_format` by every read of the same file. Reads then return the same types wherever the rows
+        come from. Rows that do not fit the schema are read without it. Default is None, which infers
+        the types of every read from its own rows.
+    output : {'pandas', 'numpy', 'columns', 'lines', 'arrow'}, optional
+        What the rows are returned as: a pandas DataFrame, a NumPy structured array, a dict of lists
+        of field texts (None for empty fields), a list of the raw rows as bytes, or a `pyarrow.Table`
+        (pyarrow must be installed). 'columns', 'lines' and 'arrow' never call `pandas.read_csv`, and
+        take no `**kwargs` but `sep` and `encoding`; 'lines' does not parse the rows at all. Slices of
+        numbers become a structured array without pandas. Default is 'pandas'.
+    compact : bool or 'pyarrow', optional
+        With 'pandas' and 'numpy' outputs, store the columns compactly as they are parsed: integers in the
+        narrowest integer type of their range, floats as float32 when no value changes, and text columns
+        of few distinct values as categoricals. 'pyarrow' also stores the other text columns as
+        pyarrow-backed strings, which requires pyarrow. Default is False.
+    processes : int, optional
+        Number of worker processes a large slice is parsed in. Slices of several megabytes per process
+        are split at record boundaries, parsed in a process pool started on first use, and returned
+        through shared memory; smaller slices, and `**kwargs` that cannot be applied piece by piece, are
+        parsed in the calling process. Default is None, which always parses in the calling process.
     **kwargs
         Additional keyword arguments passed to `pandas.read_csv`.
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing the requested rows from the CSV file.
+    pandas.DataFrame, numpy.ndarray, dict, list or pyarrow.Table
+        A DataFrame containing the requested rows from the CSV file. With another `output`, the same rows in that form.
 
     Notes
     -----
@@ -187,13 +2666,14 @@ def read_csv_head(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
     - The `header` parameter controls whether the header is read and used as column names.
     - Use `sep` in `**kwargs` to specify a different delimiter if the CSV uses one.
     """
-    check_file_exists(path)
-    total_lines = get_total_lines(path)
-    data_str = csv_head(path, total_lines, header, skip_n_first_rows, n_rows)
-    header_str = csv_header(path, skip_n_first_rows) if header else ''
-    return parse_csv_content(header_str, data_str, header=header, **kwargs)
+    meta = _file_metadata(path, _quote_sep(kwargs.get('sep', ',')))
+    with open(path, 'rb') as f:
+        source = _Source(path, f.fileno(), meta)
+        header_str, data_str = _head_content(source, header, skip_n_first_rows, n_rows, engine)
+        schema = _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs)
+    return parse_csv_content(header_str, data_str, header=header, parser=parser, schema=schema, output=output, compact=compact, processes=processes, **kwargs)
 
-def read_csv_tail(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
+def read_csv_tail(path, header=True, skip_n_first_rows=0, n_rows=1, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
     """
     Read the last `n_rows` of a CSV file into a pandas DataFrame.
 
@@ -207,13 +2687,43 @@ def read_csv_tail(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
         Number of initial data rows to skip before reading. Does not count the header row if `header` is True. Default is 0.
     n_rows : int, optional
         Number of data rows to read from the end of the file. Default is 1.
+    engine : {'auto', 'python', 'mmap', 'subprocess'}, optional
+        How the lines are extracted from the file. 'python' reads the file in blocks, 'mmap' maps it into
+        memory, 'subprocess' runs the system tools (`sed`/`tail`, or PowerShell on Windows). 'auto' picks
+        an engine from the file size, the number of requested rows and the file profile. Default is 'auto'.
+    parser : {'pandas', 'numeric'}, optional
+        How the rows are parsed. 'numeric' converts slices made only of numbers with NumPy, in parallel
+        blocks of rows, and hands anything else to `pandas.read_csv`, which 'pandas' always uses. A few
+        rows are parsed directly with either. Default is 'pandas'.
+    schema_rows : int, optional
+        If given, the column dtypes and datetime formats are inferred once from the first `schema_rows`
+        data rows, kept with the file metadata, and passed to the parser as `dtype`, `parse_dates` and
+        `date_format` by every read of the same file. Reads then return the same types wherever the rows
+        come from. Rows that do not fit the schema are read without it. Default is None, which infers
+        the types of every read from its own rows.
+    output : {'pandas', 'numpy', 'columns', 'lines', 'arrow'}, optional
+        What the rows are returned as: a pandas DataFrame, a NumPy structured array, a dict of lists
+        of field texts (None for empty fields), a list of the raw rows as bytes, or a `pyarrow.Table`
+        (pyarrow must be installed). 'columns', 'lines' and 'arrow' never call `pandas.read_csv`, and
+        take no `**kwargs` but `sep` and `encoding`; 'lines' does not parse the rows at all. Slices of
+        numbers become a structured array without pandas. Default is 'pandas'.
+    compact : bool or 'pyarrow', optional
+        With 'pandas' and 'numpy' outputs, store the columns compactly as they are parsed: integers in the
+        narrowest integer type of their range, floats as float32 when no value changes, and text columns
+        of few distinct values as categoricals. 'pyarrow' also stores the other text columns as
+        pyarrow-backed strings, which requires pyarrow. Default is False.
+    processes : int, optional
+        Number of worker processes a large slice is parsed in. Slices of several megabytes per process
+        are split at record boundaries, parsed in a process pool started on first use, and returned
+        through shared memory; smaller slices, and `**kwargs` that cannot be applied piece by piece, are
+        parsed in the calling process. Default is None, which always parses in the calling process.
     **kwargs
         Additional keyword arguments passed to `pandas.read_csv`.
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing the requested rows from the end of the CSV file.
+    pandas.DataFrame, numpy.ndarray, dict, list or pyarrow.Table
+        A DataFrame containing the requested rows from the end of the CSV file. With another `output`, the same rows in that form.
 
     Notes
     -----
@@ -222,13 +2732,14 @@ def read_csv_tail(path, header=True, skip_n_first_rows=0, n_rows=1, **kwargs):
     - The `header` parameter controls whether the header is read and used as column names.
     - Use `sep` in `**kwargs` to specify a different delimiter if the CSV uses one.
     """
-    check_file_exists(path)
-    total_lines = get_total_lines(path)
-    data_str = csv_tail(path, total_lines, header, skip_n_first_rows, n_rows=n_rows)
-    header_str = csv_header(path, skip_n_first_rows) if header else ''
-    return parse_csv_content(header_str, data_str, header=header, **kwargs)
+    meta = _file_metadata(path, _quote_sep(kwargs.get('sep', ',')))
+    with open(path, 'rb') as f:
+        source = _Source(path, f.fileno(), meta)
+        header_str, data_str = _tail_content(source, header, skip_n_first_rows, n_rows, engine)
+        schema = _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs)
+    return parse_csv_content(header_str, data_str, header=header, parser=parser, schema=schema, output=output, compact=compact, processes=processes, **kwargs)
 
-def read_csv_headtail(path, header=True, skip_n_first_rows=0, n_rows_head=1, n_rows_tail=1, **kwargs):
+def read_csv_headtail(path, header=True, skip_n_first_rows=0, n_rows_head=1, n_rows_tail=1, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
     """
     Read both the first `n_rows_head` and the last `n_rows_tail` of a CSV file into a pandas DataFrame.
 
@@ -244,17 +2755,48 @@ def read_csv_headtail(path, header=True, skip_n_first_rows=0, n_rows_head=1, n_r
         Number of data rows to read from the start of the file after skipping. Default is 1.
     n_rows_tail : int, optional
         Number of data rows to read from the end of the file. Default is 1.
+    engine : {'auto', 'python', 'mmap', 'subprocess'}, optional
+        How the lines are extracted from the file. 'python' reads the file in blocks, 'mmap' maps it into
+        memory, 'subprocess' runs the system tools (`sed`/`tail`, or PowerShell on Windows). 'auto' picks
+        an engine from the file size, the number of requested rows and the file profile. Default is 'auto'.
+    parser : {'pandas', 'numeric'}, optional
+        How the rows are parsed. 'numeric' converts slices made only of numbers with NumPy, in parallel
+        blocks of rows, and hands anything else to `pandas.read_csv`, which 'pandas' always uses. A few
+        rows are parsed directly with either. Default is 'pandas'.
+    schema_rows : int, optional
+        If given, the column dtypes and datetime formats are inferred once from the first `schema_rows`
+        data rows, kept with the file metadata, and passed to the parser as `dtype`, `parse_dates` and
+        `date_format` by every read of the same file. Reads then return the same types wherever the rows
+        come from. Rows that do not fit the schema are read without it. Default is None, which infers
+        the types of every read from its own rows.
+    output : {'pandas', 'numpy', 'columns', 'lines', 'arrow'}, optional
+        What the rows are returned as: a pandas DataFrame, a NumPy structured array, a dict of lists
+        of field texts (None for empty fields), a list of the raw rows as bytes, or a `pyarrow.Table`
+        (pyarrow must be installed). 'columns', 'lines' and 'arrow' never call `pandas.read_csv`, and
+        take no `**kwargs` but `sep` and `encoding`; 'lines' does not parse the rows at all. Slices of
+        numbers become a structured array without pandas. Default is 'pandas'.
+    compact : bool or 'pyarrow', optional
+        With 'pandas' and 'numpy' outputs, store the columns compactly as they are parsed: integers in the
+        narrowest integer type of their range, floats as float32 when no value changes, and text columns
+        of few distinct values as categoricals. 'pyarrow' also stores the other text columns as
+        pyarrow-backed strings, which requires pyarrow. Default is False.
+    processes : int, optional
+        Number of worker processes a large slice is parsed in. Slices of several megabytes per process
+        are split at record boundaries, parsed in a process pool started on first use, and returned
+        through shared memory; smaller slices, and `**kwargs` that cannot be applied piece by piece, are
+        parsed in the calling process. Default is None, which always parses in the calling process.
     **kwargs
         Additional keyword arguments passed to `pandas.read_csv`.
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing the combined head and tail rows from the CSV file, without duplicates.
+    pandas.DataFrame, numpy.ndarray, dict, list or pyarrow.Table
+        A DataFrame containing the combined head and tail rows from the CSV file, without duplicates. With another `output`, the same rows in that form.
 
     Notes
     -----
     - If the total available data rows are fewer than `n_rows_head + n_rows_tail`, overlapping rows are included only once.
+    - The rows of the file are never counted; overlap is detected from the byte offsets of the head and tail.
     - The function efficiently reads only the necessary lines, making it suitable for large files.
     - The `header` parameter controls whether the header is read and used as column names.
     - Use `sep` in `**kwargs` to specify a different delimiter if the CSV uses one.
@@ -264,43 +2806,16 @@ def read_csv_headtail(path, header=True, skip_n_first_rows=0, n_rows_head=1, n_r
     >>> df = read_csv_headtail('data.csv', n_rows_head=2, n_rows_tail=2)
     >>> print(df)
     """
-    check_file_exists(path)
-    total_lines = get_total_lines(path)
-    skip_lines = skip_n_first_rows + (1 if header else 0)
-    available_lines = total_lines - skip_lines
-
-    if available_lines <= 0:
-        # No data available
-        header_str = csv_header(path, skip_n_first_rows) if header else ''
-        return parse_csv_content(header_str, '', header=header, **kwargs)
-
-    # Adjust n_rows_head and n_rows_tail if they exceed available lines
-    n_rows_head = min(n_rows_head, available_lines)
+    meta = _file_metadata(path, _quote_sep(kwargs.get('sep', ',')))
+    with open(path, 'rb') as f:
+        source = _Source(path, f.fileno(), meta)
+        header_str, data_str = _headtail_content(
+            source, header, skip_n_first_rows, n_rows_head, n_rows_tail, engine
+        )
+        schema = _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs)
+    return parse_csv_content(header_str, data_str, header=header, parser=parser, schema=schema, output=output, compact=compact, processes=processes, **kwargs)
 
-    n_rows_tail = min(n_rows_tail, available_lines)
-
-    # Calculate overlap
-    overlap = n_rows_head + n_rows_tail - available_lines
-    if overlap > 0:
-        # Reduce n_rows_tail to avoid overlap
-        n_rows_tail -= overlap
-
-    # Concurrently retrieve header, head, and tail data
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_header = executor.submit(csv_header, path, skip_n_first_rows) if header else None
-        future_head = executor.submit(csv_head, path, total_lines, header, skip_n_first_rows, n_rows_head)
-        future_tail = executor.submit(csv_tail, path, total_lines, header, skip_n_first_rows, n_rows_tail)
-
-        header_str = future_header.result() if future_header else ''
-        head_str = future_head.result()
-        tail_str = future_tail.result() if n_rows_tail > 0 else ''
-
-    # Combine head and tail data
-    data_str = '\n'.join(filter(None, [head_str.strip(), tail_str.strip()]))
-
-    return parse_csv_content(header_str, data_str, header=header, **kwargs)
-
-def read_csv_line_range(path, n, rows_after_n=0, header=True, skip_n_first_rows=0, **kwargs):
+def read_csv_line_range(path, n, rows_after_n=0, header=True, skip_n_first_rows=0, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
     """
     Read a specific range of lines from a CSV file into a pandas DataFrame.
 
@@ -316,19 +2831,50 @@ def read_csv_line_range(path, n, rows_after_n=0, header=True, skip_n_first_rows=
         Whether the CSV file contains a header row. Default is True.
     skip_n_first_rows : int, optional
         Number of initial data rows to skip before counting line `n`. Does not count the header row if `header` is True. Default is 0.
+    engine : {'auto', 'python', 'mmap', 'subprocess'}, optional
+        How the lines are extracted from the file. 'python' reads the file in blocks, 'mmap' maps it into
+        memory, 'subprocess' runs the system tools (`sed`/`tail`, or PowerShell on Windows). 'auto' picks
+        an engine from the file size, the number of requested rows and the file profile. Default is 'auto'.
+    parser : {'pandas', 'numeric'}, optional
+        How the rows are parsed. 'numeric' converts slices made only of numbers with NumPy, in parallel
+        blocks of rows, and hands anything else to `pandas.read_csv`, which 'pandas' always uses. A few
+        rows are parsed directly with either. Default is 'pandas'.
+    schema_rows : int, optional
+        If given, the column dtypes and datetime formats are inferred once from the first `schema_rows`
+        data rows, kept with the file metadata, and passed to the parser as `dtype`, `parse_dates` and
+        `date_format` by every read of the same file. Reads then return the same types wherever the rows
+        come from. Rows that do not fit the schema are read without it. Default is None, which infers
+        the types of every read from its own rows.
+    output : {'pandas', 'numpy', 'columns', 'lines', 'arrow'}, optional
+        What the rows are returned as: a pandas DataFrame, a NumPy structured array, a dict of lists
+        of field texts (None for empty fields), a list of the raw rows as bytes, or a `pyarrow.Table`
+        (pyarrow must be installed). 'columns', 'lines' and 'arrow' never call `pandas.read_csv`, and
+        take no `**kwargs` but `sep` and `encoding`; 'lines' does not parse the rows at all. Slices of
+        numbers become a structured array without pandas. Default is 'pandas'.
+    compact : bool or 'pyarrow', optional
+        With 'pandas' and 'numpy' outputs, store the columns compactly as they are parsed: integers in the
+        narrowest integer type of their range, floats as float32 when no value changes, and text columns
+        of few distinct values as categoricals. 'pyarrow' also stores the other text columns as
+        pyarrow-backed strings, which requires pyarrow. Default is False.
+    processes : int, optional
+        Number of worker processes a large slice is parsed in. Slices of several megabytes per process
+        are split at record boundaries, parsed in a process pool started on first use, and returned
+        through shared memory; smaller slices, and `**kwargs` that cannot be applied piece by piece, are
+        parsed in the calling process. Default is None, which always parses in the calling process.
     **kwargs
         Additional keyword arguments passed to `pandas.read_csv`.
 
     Returns
     -------
-    pandas.DataFrame
-        A DataFrame containing the specified range of rows from the CSV file.
+    pandas.DataFrame, numpy.ndarray, dict, list or pyarrow.Table
+        A DataFrame containing the specified range of rows from the CSV file. With another `output`, the same rows in that form.
 
     Notes
     -----
     - Line numbering starts after skipping the initial rows and the header.
     - If the CSV file has fewer rows than requested, all available data rows starting from line `n` are returned.
     - The function efficiently reads only the necessary lines.
+    - If a line index was built with `build_line_index`, the read seeks straight to the requested rows.
     - The `header` parameter controls whether the header is read and used as column names.
     - Use `sep` in `**kwargs` to specify a different delimiter if the CSV uses one.
 
@@ -342,8 +2888,612 @@ def read_csv_line_range(path, n, rows_after_n=0, header=True, skip_n_first_rows=
     >>> df = read_csv_line_range('data.csv', n=5, rows_after_n=2)
     >>> print(df)
     """
-    check_file_exists(path)
-    total_lines = get_total_lines(path)
-    data_str = csv_line_range(path, total_lines, n, rows_after_n, header, skip_n_first_rows)
-    header_str = csv_header(path, skip_n_first_rows) if header else ''
-    return parse_csv_content(header_str, data_str, header=header, **kwargs)
+    meta = _file_metadata(path, _quote_sep(kwargs.get('sep', ',')))
+    with open(path, 'rb') as f:
+        source = _Source(path, f.fileno(), meta)
+        header_str, data_str = _line_range_content(source, n, rows_after_n, header, skip_n_first_rows, engine)
+        schema = _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs)
+    return parse_csv_content(header_str, data_str, header=header, parser=parser, schema=schema, output=output, compact=compact, processes=processes, **kwargs)
+
+class CsvFile:
+    """
+    A CSV file kept open for repeated reads.
+
+    The file is opened once and every read goes through the same descriptor with
+    position-independent `os.pread`, so a `CsvFile` can be shared between threads.
+    The header and the line count are kept for as long as the file does not change,
+    which a single `os.fstat` of the open descriptor checks on every read; once rows
+    are appended, only they are counted.
+
+    Parameters
+    ----------
+    path : str
+        The file path to the CSV file.
+    header : bool, optional
+        Whether the CSV file contains a header row. Default is True.
+    skip_n_first_rows : int, optional
+        Number of initial data rows to skip before reading. Does not count the header row if `header` is True. Default is 0.
+    engine : {'auto', 'python', 'mmap', 'subprocess'}, optional
+        How the lines are extracted from the file, see `read_csv_head`. Default is 'auto'.
+    parser : {'pandas', 'numeric'}, optional
+        How the rows are parsed, see `read_csv_head`. Default is 'pandas'.
+    schema_rows : int, optional
+        Number of head rows the column types of every read are inferred from, see `read_csv_head`.
+        Default is None.
+    output : {'pandas', 'numpy', 'columns', 'lines', 'arrow'}, optional
+        What the rows are returned as, see `read_csv_head`. Default is 'pandas'.
+    compact : bool or 'pyarrow', optional
+        Whether to store the columns compactly, see `read_csv_head`. Default is False.
+    processes : int, optional
+        Number of worker processes large slices are parsed in, see `read_csv_head`. Default is None.
+    **kwargs
+        Default keyword arguments passed to `pandas.read_csv` by every read.
+
+    Notes
+    -----
+    - Every method takes the same arguments as the matching module function, except for
+      `path`, `header` and `skip_n_first_rows`. Keyword arguments given to a method
+      override those given to the constructor, but quotes are scanned with the `sep` of the constructor.
+    - Close the file with `close`, or use the `CsvFile` as a context manager.
+
+    Example
+    -------
+    >>> with CsvFile('data.csv') as csv_file:
+    ...     df_tail = csv_file.tail(n_rows=10)
+    ...     n_lines = csv_file.count()
+    """
+
+    _fd = None
+    _meta = None
+
+    def __init__(self, path, header=True, skip_n_first_rows=0, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
+        check_file_exists(path)
+        self.path = path
+        self.header = header
+        self.skip_n_first_rows = skip_n_first_rows
+        self.engine = engine
+        self.parser = parser
+        self.schema_rows = schema_rows
+        self.output = output
+        self.compact = compact
+        self.processes = processes
+        self.kwargs = kwargs
+        self._fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        self._meta = None
+
+    def _source(self):
+        if self._fd is None:
+            raise ValueError("I/O operation on a closed CsvFile.")
+        stat_key = _stat_key(os.fstat(self._fd))
+        meta = self._meta
+        if meta is None or meta.stat_key != stat_key:
+            if meta is not None:
+                meta.release_mapping()
+            meta = self._meta = _FileMetadata(self.path, stat_key, meta, _quote_sep(self.kwargs.get('sep', ',')))
+        return _Source(self.path, self._fd, meta)
+
+    def _parse(self, source, content, kwargs):
+        header_str, data_str = content
+        options = {'parser': self.parser, 'output': self.output, 'compact': self.compact, 'processes': self.processes, **self.kwargs, **kwargs}
+        schema = _file_schema(source, self.header, self.skip_n_first_rows, self.schema_rows, self.engine, options)
+        return parse_csv_content(header_str, data_str, header=self.header, schema=schema, **options)
+
+    def head(self, n_rows=1, **kwargs):
+        """Read the first `n_rows` data rows, see `read_csv_head`."""
+        source = self._source()
+        content = _head_content(source, self.header, self.skip_n_first_rows, n_rows, self.engine)
+        return self._parse(source, content, kwargs)
+
+    def tail(self, n_rows=1, **kwargs):
+        """Read the last `n_rows` data rows, see `read_csv_tail`."""
+        source = self._source()
+        content = _tail_content(source, self.header, self.skip_n_first_rows, n_rows, self.engine)
+        return self._parse(source, content, kwargs)
+
+    def headtail(self, n_rows_head=1, n_rows_tail=1, **kwargs):
+        """Read the first `n_rows_head` and the last `n_rows_tail` data rows, see `read_csv_headtail`."""
+        source = self._source()
+        content = _headtail_content(
+            source, self.header, self.skip_n_first_rows, n_rows_head, n_rows_tail, self.engine
+        )
+        return self._parse(source, content, kwargs)
+
+    def line_range(self, n, rows_after_n=0, **kwargs):
+        """Read the data rows `n` to `n + rows_after_n`, see `read_csv_line_range`."""
+        source = self._source()
+        content = _line_range_content(
+            source, n, rows_after_n, self.header, self.skip_n_first_rows, self.engine
+        )
+        return self._parse(source, content, kwargs)
+
+    def count(self):
+        """Return the number of lines in the file, header included."""
+        return _total_lines(self._source())
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._meta is not None:
+            self._meta.release_mapping()
+
+    @property
+    def closed(self):
+        return self._fd is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __repr__(self):
+        return f"CsvFile({self.path!r})"
+
+def _expand_paths(paths):
+    """Return the paths of a glob pattern, sorted, or the given paths as a list."""
+    if isinstance(paths, (str, os.PathLike)):
+        return sorted(glob.glob(os.fspath(paths)))
+    return list(paths)
+
+def _column_buffer(dtypes, n_rows, complete):
+    """
+    Allocate the values of one column of the frames of `dtypes`, `complete` if every frame has it.
+
+    Returns the buffer and the dtype to convert it to once filled, None if it already has it.
+    """
+    dtypes = list(dict.fromkeys(dtypes))
+    if all(isinstance(dtype, np.dtype) for dtype in dtypes):
+        if len(dtypes) == 1 and (complete or dtypes[0].kind in 'fmM'):
+            # Columns some frames lack are filled with NaN, or NaT.
+            buffer = np.empty(n_rows, dtype=dtypes[0])
+            if not complete:
+                buffer.fill(np.nan if dtypes[0].kind == 'f' else np.datetime64('NaT'))
+            return buffer, None
+        if all(dtype.kind in 'iuf' for dtype in dtypes):
+            dtype = np.result_type(*dtypes, *([] if complete else [np.float64]))
+            return np.full(n_rows, np.nan, dtype=dtype) if dtype.kind == 'f' else np.empty(n_rows, dtype=dtype), None
+    buffer = np.full(n_rows, np.nan, dtype=object)
+    if len(dtypes) == 1 and not isinstance(dtypes[0], np.dtype):
+        return buffer, dtypes[0]
+    return buffer, None
+
+def _concat_frames(frames, source_column):
+    """
+    Stack `(path, frame)` pairs into one frame, like `pd.concat`, but into preallocated columns.
+
+    Every column is allocated once for all rows and filled frame by frame, and
+    `source_column`, unless None, names the file each row comes from.
+    """
+    lengths = [len(df) for _, df in frames]
+    starts = np.cumsum([0, *lengths])
+    columns = {}
+    if source_column is not None:
+        paths = [os.fspath(path) for path, _ in frames]
+        categories = list(dict.fromkeys(paths))
+        codes = np.repeat([categories.index(path) for path in paths], lengths)
+        columns[source_column] = pd.Categorical.from_codes(codes, categories=categories)
+    names = list(dict.fromkeys(name for _, df in frames for name in df.columns))
+    if source_column in names:
+        raise ValueError(f"The source column '{source_column}' is also a column of the files.")
+    for name in names:
+        parts = [(start, df[name]) for start, (_, df) in zip(starts, frames) if name in df.columns]
+        buffer, dtype = _column_buffer([part.dtype for _, part in parts], starts[-1], len(parts) == len(frames))
+        for start, part in parts:
+            buffer[start:start + len(part)] = part.to_numpy()
+        if isinstance(dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical(buffer)
+        elif dtype is not None:
+            columns[name] = pd.array(buffer, dtype=dtype)
+        else:
+            columns[name] = buffer
+    df = pd.DataFrame(dict(enumerate(columns.values())), index=pd.RangeIndex(starts[-1]))
+    df.columns = pd.Index(list(columns))
+    return df
+
+def _read_many(read, paths, max_workers, concat, source_column, kwargs):
+    """Run `read(path, **kwargs)` for every path on the shared thread pool, see `read_csv_tail_many`."""
+    paths = _expand_paths(paths)
+    if concat and kwargs.get('output', 'pandas') != 'pandas':
+        raise ValueError("Only DataFrames can be concatenated: use concat=False with another output.")
+    if not paths:
+        return pd.DataFrame() if concat else {}
+    # No more than `max_workers` files are queued at once; if a read fails, those not started are dropped.
+    results = list(_shared_executor.map(
+        lambda path: read(path, **kwargs), paths, window=max_workers or _MANY_MAX_WORKERS
+    ))
+    if concat:
+        return _concat_frames(list(zip(paths, results)), source_column)
+    return dict(zip(paths, results))
+
+def read_csv_head_many(paths, header=True, skip_n_first_rows=0, n_rows=1, max_workers=None, concat=False, source_column='source_file', **kwargs):
+    """
+    Read the first `n_rows` of many CSV files, on one pool of threads.
+
+    Parameters
+    ----------
+    paths : list of str or str
+        The file paths, or a glob pattern matching them (read in sorted order).
+    header, skip_n_first_rows, n_rows
+        As in `read_csv_head`, for every file.
+    max_workers : int, optional
+        Maximum number of files queued at once on the shared thread pool, see `configure_executor`.
+        Default is None, for `min(32, os.cpu_count() + 4)`.
+    concat : bool, optional
+        Return one DataFrame of the rows of all files, in the order of `paths`, rather than a dict.
+        The columns are allocated once for all rows and filled file by file. Default is False.
+    source_column : str or None, optional
+        With `concat`, the name of a categorical column holding the path each row was read from,
+        or None for no such column. Default is 'source_file'.
+    **kwargs
+        Further arguments of `read_csv_head`, such as `engine`, `parser` or `output`, and keyword
+        arguments passed to `pandas.read_csv`.
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        The result of `read_csv_head` for each path, keyed by path; or, with `concat`, one DataFrame.
+
+    Notes
+    -----
+    - If a read fails, the reads not yet started are dropped and its exception is raised.
+    """
+    kwargs.update(header=header, skip_n_first_rows=skip_n_first_rows, n_rows=n_rows)
+    return _read_many(read_csv_head, paths, max_workers, concat, source_column, kwargs)
+
+def read_csv_tail_many(paths, header=True, skip_n_first_rows=0, n_rows=1, max_workers=None, concat=False, source_column='source_file', **kwargs):
+    """
+    Read the last `n_rows` of many CSV files, on one pool of threads.
+
+    Parameters
+    ----------
+    paths : list of str or str
+        The file paths, or a glob pattern matching them (read in sorted order).
+    header, skip_n_first_rows, n_rows
+        As in `read_csv_tail`, for every file.
+    max_workers : int, optional
+        Maximum number of files queued at once on the shared thread pool, see `configure_executor`.
+        Default is None, for `min(32, os.cpu_count() + 4)`.
+    concat : bool, optional
+        Return one DataFrame of the rows of all files, in the order of `paths`, rather than a dict.
+        The columns are allocated once for all rows and filled file by file. Default is False.
+    source_column : str or None, optional
+        With `concat`, the name of a categorical column holding the path each row was read from,
+        or None for no such column. Default is 'source_file'.
+    **kwargs
+        Further arguments of `read_csv_tail`, such as `engine`, `parser` or `output`, and keyword
+        arguments passed to `pandas.read_csv`.
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        The result of `read_csv_tail` for each path, keyed by path; or, with `concat`, one DataFrame.
+
+    Notes
+    -----
+    - If a read fails, the reads not yet started are dropped and its exception is raised.
+
+    Example
+    -------
+    >>> df_last_rows = read_csv_tail_many('exports/*.csv', concat=True)
+    """
+    kwargs.update(header=header, skip_n_first_rows=skip_n_first_rows, n_rows=n_rows)
+    return _read_many(read_csv_tail, paths, max_workers, concat, source_column, kwargs)
+
+def read_csv_headtail_many(paths, header=True, skip_n_first_rows=0, n_rows_head=1, n_rows_tail=1, max_workers=None, concat=False, source_column='source_file', **kwargs):
+    """
+    Read the first `n_rows_head` and the last `n_rows_tail` of many CSV files, on one pool of threads.
+
+    Parameters
+    ----------
+    paths : list of str or str
+        The file paths, or a glob pattern matching them (read in sorted order).
+    header, skip_n_first_rows, n_rows_head, n_rows_tail
+        As in `read_csv_headtail`, for every file.
+    max_workers : int, optional
+        Maximum number of files queued at once on the shared thread pool, see `configure_executor`.
+        Default is None, for `min(32, os.cpu_count() + 4)`.
+    concat : bool, optional
+        Return one DataFrame of the rows of all files, in the order of `paths`, rather than a dict.
+        The columns are allocated once for all rows and filled file by file. Default is False.
+    source_column : str or None, optional
+        With `concat`, the name of a categorical column holding the path each row was read from,
+        or None for no such column. Default is 'source_file'.
+    **kwargs
+        Further arguments of `read_csv_headtail`, such as `engine`, `parser` or `output`, and keyword
+        arguments passed to `pandas.read_csv`.
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        The result of `read_csv_headtail` for each path, keyed by path; or, with `concat`, one DataFrame.
+
+    Notes
+    -----
+    - If a read fails, the reads not yet started are dropped and its exception is raised.
+    """
+    kwargs.update(header=header, skip_n_first_rows=skip_n_first_rows, n_rows_head=n_rows_head, n_rows_tail=n_rows_tail)
+    return _read_many(read_csv_headtail, paths, max_workers, concat, source_column, kwargs)
+
+def read_csv_line_range_many(paths, n, rows_after_n=0, header=True, skip_n_first_rows=0, max_workers=None, concat=False, source_column='source_file', **kwargs):
+    """
+    Read the same range of lines from many CSV files, on one pool of threads.
+
+    Parameters
+    ----------
+    paths : list of str or str
+        The file paths, or a glob pattern matching them (read in sorted order).
+    n, rows_after_n, header, skip_n_first_rows
+        As in `read_csv_line_range`, for every file.
+    max_workers : int, optional
+        Maximum number of files queued at once on the shared thread pool, see `configure_executor`.
+        Default is None, for `min(32, os.cpu_count() + 4)`.
+    concat : bool, optional
+        Return one DataFrame of the rows of all files, in the order of `paths`, rather than a dict.
+        The columns are allocated once for all rows and filled file by file. Default is False.
+    source_column : str or None, optional
+        With `concat`, the name of a categorical column holding the path each row was read from,
+        or None for no such column. Default is 'source_file'.
+    **kwargs
+        Further arguments of `read_csv_line_range`, such as `engine`, `parser` or `output`, and keyword
+        arguments passed to `pandas.read_csv`.
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        The result of `read_csv_line_range` for each path, keyed by path; or, with `concat`, one DataFrame.
+
+    Notes
+    -----
+    - If a read fails, the reads not yet started are dropped and its exception is raised.
+    """
+    kwargs.update(n=n, rows_after_n=rows_after_n, header=header, skip_n_first_rows=skip_n_first_rows)
+    return _read_many(read_csv_line_range, paths, max_workers, concat, source_column, kwargs)
+
+_async_semaphores = weakref.WeakKeyDictionary()
+
+def set_async_concurrency(limit):
+    """
+    Set how many reads the `aread_*` coroutines run at once in each event loop.
+
+    Parameters
+    ----------
+    limit : int
+        Maximum number of reads in progress per event loop; further reads wait
+        for one to finish. The default is the number of CPUs plus four, up to 32.
+    """
+    global _ASYNC_CONCURRENCY
+    if limit < 1:
+        raise ValueError("The async concurrency must be a positive number of reads.")
+    _ASYNC_CONCURRENCY = limit
+
+def _async_semaphore():
+    """Return the semaphore of the running event loop, made anew when the concurrency is changed."""
+    loop = asyncio.get_running_loop()
+    limit, semaphore = _async_semaphores.get(loop, (None, None))
+    if limit != _ASYNC_CONCURRENCY:
+        semaphore = asyncio.Semaphore(_ASYNC_CONCURRENCY)
+        _async_semaphores[loop] = (_ASYNC_CONCURRENCY, semaphore)
+    return semaphore
+
+async def _aread(read, semaphore, *args, **kwargs):
+    """
+    Run `read(*args, **kwargs)` on the shared thread pool, holding `semaphore`.
+
+    A read cancelled while it waits for the semaphore or for a thread is never
+    started; one cancelled while it runs has its child processes killed, and
+    its result is dropped.
+    """
+    async with semaphore or _async_semaphore():
+        children = _ChildProcesses()
+        context = contextvars.copy_context()
+        context.run(_child_processes.set, children)
+        try:
+            return await asyncio.wrap_future(_shared_executor.submit(context.run, read, *args, **kwargs))
+        except asyncio.CancelledError:
+            children.kill()
+            raise
+
+async def aread_csv_head(path, header=True, skip_n_first_rows=0, n_rows=1, semaphore=None, **kwargs):
+    """
+    Read the first `n_rows` of a CSV file without blocking the event loop.
+
+    The read runs on the shared thread pool, see `read_csv_head`
+    for the arguments and the result.
+
+    Parameters
+    ----------
+    semaphore : asyncio.Semaphore, optional
+        Held while the file is read. Default is None, which uses one semaphore per event loop,
+        sized with `set_async_concurrency`.
+
+    Notes
+    -----
+    - Cancelling the read kills the child processes of engine='subprocess', and drops a read that has not started.
+    """
+    return await _aread(
+        read_csv_head, semaphore, path, header=header, skip_n_first_rows=skip_n_first_rows, n_rows=n_rows, **kwargs
+    )
+
+async def aread_csv_tail(path, header=True, skip_n_first_rows=0, n_rows=1, semaphore=None, **kwargs):
+    """
+    Read the last `n_rows` of a CSV file without blocking the event loop.
+
+    The read runs on the shared thread pool, see `read_csv_tail`
+    for the arguments and the result.
+
+    Parameters
+    ----------
+    semaphore : asyncio.Semaphore, optional
+        Held while the file is read, see `aread_csv_head`. Default is None.
+
+    Example
+    -------
+    >>> df_tail = await aread_csv_tail('data.csv', n_rows=10)
+    """
+    return await _aread(
+        read_csv_tail, semaphore, path, header=header, skip_n_first_rows=skip_n_first_rows, n_rows=n_rows, **kwargs
+    )
+
+async def aread_csv_headtail(path, header=True, skip_n_first_rows=0, n_rows_head=1, n_rows_tail=1, semaphore=None, **kwargs):
+    """
+    Read the first `n_rows_head` and the last `n_rows_tail` of a CSV file without blocking the event loop.
+
+    The read runs on the shared thread pool, see `read_csv_headtail`
+    for the arguments and the result.
+
+    Parameters
+    ----------
+    semaphore : asyncio.Semaphore, optional
+        Held while the file is read, see `aread_csv_head`. Default is None.
+    """
+    return await _aread(
+        read_csv_headtail, semaphore, path, header=header, skip_n_first_rows=skip_n_first_rows,
+        n_rows_head=n_rows_head, n_rows_tail=n_rows_tail, **kwargs
+    )
+
+async def aread_csv_line_range(path, n, rows_after_n=0, header=True, skip_n_first_rows=0, semaphore=None, **kwargs):
+    """
+    Read the data rows `n` to `n + rows_after_n` of a CSV file without blocking the event loop.
+
+    The read runs on the shared thread pool, see `read_csv_line_range`
+    for the arguments and the result.
+
+    Parameters
+    ----------
+    semaphore : asyncio.Semaphore, optional
+        Held while the file is read, see `aread_csv_head`. Default is None.
+    """
+    return await _aread(
+        read_csv_line_range, semaphore, path, n, rows_after_n=rows_after_n, header=header,
+        skip_n_first_rows=skip_n_first_rows, **kwargs
+    )
+
+async def aread_csv_many(paths, read=aread_csv_tail, limit=None, concat=False, source_column='source_file', **kwargs):
+    """
+    Read many CSV files concurrently without blocking the event loop.
+
+    Every file is read by its own task, but the tasks share one semaphore, so no
+    more than `limit` reads, and threads, run at once however many files there are.
+
+    Parameters
+    ----------
+    paths : str or iterable of str
+        The file paths, or a glob pattern, whose matches are read in sorted order.
+    read : coroutine function, optional
+        The read to run for each path, one of `aread_csv_head`, `aread_csv_tail`, `aread_csv_headtail`
+        and `aread_csv_line_range`. Default is `aread_csv_tail`.
+    limit : int, optional
+        Maximum number of files read at once. Default is None, which shares the semaphore of the
+        event loop with every other `aread_*` call, see `set_async_concurrency`.
+    concat : bool, optional
+        Return a single DataFrame of the rows of every file, see `read_csv_tail_many`. Default is False.
+    source_column : str, optional
+        With `concat`, the name of the categorical column holding the path each row was read from,
+        or None to leave it out. Default is 'source_file'.
+    **kwargs
+        Keyword arguments passed to `read` for every file.
+
+    Returns
+    -------
+    dict or pandas.DataFrame
+        The result of every read keyed by its path, in the order of `paths`, or with `concat`, one DataFrame.
+
+    Notes
+    -----
+    - If a read fails, the others are cancelled and the first error is raised.
+
+    Example
+    -------
+    >>> tails = await aread_csv_many('exports/*.csv', n_rows=5, limit=100)
+    """
+    paths = _expand_paths(paths)
+    if concat and kwargs.get('output', 'pandas') != 'pandas':
+        raise ValueError("Only DataFrames can be concatenated: use concat=False with another output.")
+    if not paths:
+        return pd.DataFrame() if concat else {}
+    semaphore = asyncio.Semaphore(limit) if limit else None
+    tasks = [asyncio.ensure_future(read(path, semaphore=semaphore, **kwargs)) for path in paths]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    if concat:
+        return _concat_frames(list(zip(paths, results)), source_column)
+    return dict(zip(paths, results))
+
+def _extract_tail(path, header, skip_n_first_rows, n_rows, engine, schema_rows, kwargs):
+    """Extract the tail of a file and its schema, leaving the rows unparsed."""
+    meta = _file_metadata(path, _quote_sep(kwargs.get('sep', ',')))
+    with open(path, 'rb') as f:
+        source = _Source(path, f.fileno(), meta)
+        header_str, data_str = _tail_content(source, header, skip_n_first_rows, n_rows, engine)
+        schema = _file_schema(source, header, skip_n_first_rows, schema_rows, engine, kwargs)
+    return path, header_str, data_str, schema
+
+def iter_csv_tails(paths, header=True, skip_n_first_rows=0, n_rows=1, prefetch=8, ordered=True, engine='auto', parser='pandas', schema_rows=None, output='pandas', compact=False, processes=None, **kwargs):
+    """
+    Iterate over the last `n_rows` of many CSV files, reading the next files while the current one is parsed.
+
+    The rows of up to `prefetch` upcoming files are extracted on the shared thread
+    pool while the rows of the current file are parsed in the iterating thread, so
+    that the disk is kept busy while pandas parses, and the other way around.
+
+    Parameters
+    ----------
+    paths : str or iterable of str
+        The file paths, or a glob pattern, whose matches are read in sorted order. An iterable
+        is consumed as the iteration goes.
+    header, skip_n_first_rows, n_rows, engine, parser, schema_rows, output, compact, processes, **kwargs
+        As for `read_csv_tail`, for every file.
+    prefetch : int, optional
+        Number of files extracted ahead of the one being parsed. 0 reads every file in the
+        iterating thread, in turn. Default is 8.
+    ordered : bool, optional
+        Whether to yield the files in the order of `paths`. If False, each file is yielded as soon
+        as it has been extracted, so that a slow file does not hold back the others. Default is True.
+
+    Yields
+    ------
+    tuple
+        The path of a file and its last rows, as `read_csv_tail` returns them.
+
+    Notes
+    -----
+    - An error reading a file is raised when that file's turn comes; the files being
+      prefetched are then dropped, as they are when the iteration is closed early.
+
+    Example
+    -------
+    >>> for path, df_tail in iter_csv_tails('exports/*.csv', n_rows=5):
+    ...     print(path, df_tail['timestamp'].max())
+    """
+    if prefetch < 0:
+        raise ValueError("The prefetch window must be a non-negative number of files.")
+    if isinstance(paths, (str, os.PathLike)):
+        paths = _expand_paths(paths)
+    parse_options = dict(
+        header=header, parser=parser, output=output, compact=compact, processes=processes, **kwargs
+    )
+
+    def extract(path):
+        return _extract_tail(path, header, skip_n_first_rows, n_rows, engine, schema_rows, kwargs)
+
+    return _iter_parsed(extract, paths, prefetch, ordered, parse_options)
+
+def _iter_parsed(extract, paths, prefetch, ordered, parse_options):
+    """Yield the paths and parsed contents of `extract(path)` for every path, extracting up to `prefetch` ahead."""
+    if prefetch:
+        # One more than `prefetch`, for the file being parsed.
+        contents = _shared_executor.map(extract, paths, window=prefetch + 1, ordered=ordered)
+    else:
+        contents = (extract(path) for path in paths)
+    with contextlib.closing(contents):
+        for path, header_str, data_str, schema in contents:
+            yield path, parse_csv_content(header_str, data_str, schema=schema, **parse_options)
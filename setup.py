@@ -24,7 +24,7 @@ setup(
         description=DESCRIPTION,
         long_description=LONG_DESCRIPTION,
         packages=find_packages(),
-        install_requires=["pandas"],
+        install_requires=["numpy", "pandas>=2.2"],
         url="https://github.com/donjor/read-csv-turbo",
 
         keywords=['python', 'pandas', 'readcsv', 'readfirstlinecsv', 'readlastlinecsv', 'readspecificlinecsv'],
@@ -126,6 +126,147 @@ def test_speed_performance(large_csv_file):
     if not IS_CI and 'Pandas' in results:
         assert results['Turbo'] < results['Pandas'], "Turbo should be faster on large files!"
 
+def run_small_slice_benchmark(csv_path, repeats=200):
+    """Median end-to-end latency of a 1+1 row headtail read, with and without the small-slice parser."""
+    results = {}
+
+    print(f"\n\n--- SMALL SLICE BENCHMARK: {csv_path} ---")
+    module = rct.readcsvturbo
+    max_rows = module._SMALL_PARSE_MAX_ROWS
+    for name, parse_max_rows in [('Turbo (read_csv)', 0), ('Turbo (small-slice parser)', max_rows)]:
+        module._SMALL_PARSE_MAX_ROWS = parse_max_rows
+        try:
+            rct.read_csv_headtail(csv_path, n_rows_head=1, n_rows_tail=1)  # warm the metadata cache
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                rct.read_csv_headtail(csv_path, n_rows_head=1, n_rows_tail=1)
+                timings.append(time.perf_counter() - start)
+        finally:
+            module._SMALL_PARSE_MAX_ROWS = max_rows
+        results[name] = float(np.median(timings))
+        print(f"[{name}] Median: {results[name] * 1000:.3f}ms")
+
+    return results
+
+def test_small_slice_latency(large_csv_file):
+    """
+    The small-slice parser must beat pandas.read_csv on a 1+1 row read, and stay under a millisecond.
+    """
+    results = run_small_slice_benchmark(large_csv_file)
+    assert results['Turbo (small-slice parser)'] < results['Turbo (read_csv)']
+    if not IS_CI:
+        assert results['Turbo (small-slice parser)'] < 0.001, "Small slices should be read in under a millisecond!"
+
+def run_numeric_parser_benchmark(csv_path):
+    """Time a tail of half the file with each parser, and check they return the same frame."""
+    results = {}
+
+    print(f"\n\n--- NUMERIC PARSER BENCHMARK: {csv_path} ---")
+    with rct.CsvFile(csv_path) as csv_file:
+        n_rows = csv_file.count() // 2
+    frames = {}
+    for parser in ['pandas', 'numeric']:
+        name = f'Turbo tail (parser={parser!r})'
+        start = time.perf_counter()
+        frames[parser] = rct.read_csv_tail(csv_path, n_rows=n_rows, parser=parser)
+        results[name] = time.perf_counter() - start
+        print(f"[{name}] Time: {results[name]:.4f}s")
+
+    pd.testing.assert_frame_equal(frames['pandas'], frames['numeric'])
+    return results
+
+def test_numeric_parser_speed(large_csv_file):
+    """
+    The numeric parser must return what pandas does on the generated integer table.
+    """
+    results = run_numeric_parser_benchmark(large_csv_file)
+    assert len(results) == 2
+
+def run_output_benchmark(csv_path, n_rows=10_000, repeats=20):
+    """Median latency of a tail read with each output backend, for one row and for `n_rows` rows."""
+    results = {}
+
+    print(f"\n\n--- OUTPUT BENCHMARK: {csv_path} ---")
+    outputs = ['pandas', 'numpy', 'columns', 'lines']
+    try:
+        import pyarrow  # noqa: F401
+        outputs.append('arrow')
+    except ImportError:
+        print("pyarrow is not installed, skipping output='arrow'")
+    for rows in [1, n_rows]:
+        for output in outputs:
+            name = f'Turbo tail {rows} rows (output={output!r})'
+            rct.read_csv_tail(csv_path, n_rows=rows, output=output)  # warm the metadata cache
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                rct.read_csv_tail(csv_path, n_rows=rows, output=output)
+                timings.append(time.perf_counter() - start)
+            results[name] = float(np.median(timings))
+            print(f"[{name}] Median: {results[name] * 1000:.3f}ms")
+
+    return results
+
+def test_output_backends_speed(large_csv_file):
+    """
+    Skipping pandas must pay off: raw lines are the cheapest way to get a large tail.
+    """
+    n_rows = min(10_000, ROWS // 2)
+    results = run_output_benchmark(large_csv_file, n_rows=n_rows)
+    assert results[f"Turbo tail {n_rows} rows (output='lines')"] < results[f"Turbo tail {n_rows} rows (output='pandas')"]
+
+def run_process_parse_benchmark(csv_path):
+    """Time a tail of the whole file parsed in this process and in one worker process per core."""
+    results = {}
+
+    print(f"\n\n--- PROCESS PARSE BENCHMARK: {csv_path} ---")
+    with rct.CsvFile(csv_path) as csv_file:
+        n_rows = csv_file.count() - 1
+    frames = {}
+    for processes in [None, max(2, os.cpu_count() or 1)]:
+        name = f'Turbo tail (processes={processes})'
+        start = time.perf_counter()
+        frames[processes] = rct.read_csv_tail(csv_path, n_rows=n_rows, processes=processes)
+        results[name] = time.perf_counter() - start
+        print(f"[{name}] Time: {results[name]:.4f}s")
+
+    pd.testing.assert_frame_equal(*frames.values())
+    return results
+
+def test_process_parse_speed(large_csv_file):
+    """
+    Parsing in worker processes must return what parsing in this process does.
+    """
+    results = run_process_parse_benchmark(large_csv_file)
+    assert len(results) == 2
+
+def run_prefetch_benchmark(csv_path, n_files=100, n_rows=1000):
+    """Time the tails of `n_files` reads of the file, one after the other and through the prefetching iterator."""
+    results = {}
+
+    print(f"\n\n--- PREFETCH BENCHMARK: {csv_path} ---")
+    paths = [csv_path] * n_files
+    start = time.perf_counter()
+    expected = [rct.read_csv_tail(path, n_rows=n_rows) for path in paths]
+    results['Turbo tails (loop)'] = time.perf_counter() - start
+    start = time.perf_counter()
+    tails = [df for _, df in rct.iter_csv_tails(paths, n_rows=n_rows, prefetch=8)]
+    results['Turbo tails (iter_csv_tails)'] = time.perf_counter() - start
+    for name in results:
+        print(f"[{name}] Time: {results[name]:.4f}s")
+
+    for df, df_expected in zip(tails, expected):
+        pd.testing.assert_frame_equal(df, df_expected)
+    return results
+
+def test_prefetch_speed(large_csv_file):
+    """
+    The prefetching iterator must return the tails a loop over `read_csv_tail` does.
+    """
+    results = run_prefetch_benchmark(large_csv_file)
+    assert len(results) == 2
+
 if __name__ == "__main__":
     # Setup for standalone execution
     path = Path(FILENAME)
@@ -138,6 +279,11 @@ if __name__ == "__main__":
 
     try:
         results = run_speed_benchmark(path)
+        results.update(run_small_slice_benchmark(path))
+        results.update(run_numeric_parser_benchmark(path))
+        results.update(run_output_benchmark(path))
+        results.update(run_process_parse_benchmark(path))
+        results.update(run_prefetch_benchmark(path))
 
         # Print Summary
         print("\n--- SUMMARY ---")
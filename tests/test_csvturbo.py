@@ -1,8 +1,16 @@
 import pytest
+import asyncio
 import os
+import sys
+import time
+import signal
+import threading
+import glob
+import numpy as np
 import pandas as pd
 import readcsvturbo as rct
 from io import StringIO
+from concurrent.futures.process import BrokenProcessPool
 
 # Define the sample CSV data
 SAMPLE_CSV_DATA = """col1,col2,col3
@@ -13,6 +21,11 @@ SAMPLE_CSV_DATA = """col1,col2,col3
 13,14,15
 """
 
+@pytest.fixture(autouse=True)
+def clear_metadata_cache():
+    # Files are rewritten quickly between tests; never let one test see another's metadata.
+    rct.clear_metadata_cache()
+
 @pytest.fixture
 def sample_csv():
     sample_path = 'sample.csv'
@@ -26,6 +39,24 @@ def sample_csv():
 def expected_df():
     return pd.read_csv(StringIO(SAMPLE_CSV_DATA))
 
+@pytest.fixture
+def pread_calls(monkeypatch):
+    """Record the `(size, offset, bytes read)` of every `_pread`."""
+    module = rct.readcsvturbo
+    calls = []
+    real_pread = module._pread
+
+    def recording_pread(fd, size, offset):
+        data = real_pread(fd, size, offset)
+        calls.append((size, offset, len(data)))
+        return data
+
+    monkeypatch.setattr(module, '_pread', recording_pread)
+    return calls
+
+def bytes_read(pread_calls):
+    return sum(n_read for _, _, n_read in pread_calls)
+
 # --- Standard Reads ---
 
 def test_read_csv_head_with_extra_rows(sample_csv, expected_df):
@@ -251,3 +282,1189 @@ def test_read_csv_special_characters():
     expected_df = pd.read_csv(StringIO(sample_data))
     pd.testing.assert_frame_equal(df_head, expected_df)
     os.remove(sample_path)
+
+# --- Seek-from-end Tail ---
+
+def test_read_csv_tail_no_trailing_newline(tmp_path, expected_df):
+    path = tmp_path / 'no_newline.csv'
+    path.write_text(SAMPLE_CSV_DATA.rstrip('\n'))
+    df_tail = rct.read_csv_tail(path, header=True, n_rows=2)
+    pd.testing.assert_frame_equal(df_tail, expected_df.iloc[-2:].reset_index(drop=True))
+
+def test_read_csv_tail_across_blocks(tmp_path, monkeypatch):
+    # Force a tiny block size so the backwards scan has to cross many blocks.
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', 7)
+    path = tmp_path / 'blocks.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(100)))
+    df_tail = rct.read_csv_tail(path, header=True, n_rows=30)
+    assert df_tail['a'].tolist() == list(range(70, 100))
+
+def test_read_csv_tail_does_not_cross_skipped_rows(sample_csv):
+    df_tail = rct.read_csv_tail(sample_csv, header=True, skip_n_first_rows=3, n_rows=10)
+    expected_tail = pd.read_csv(StringIO(SAMPLE_CSV_DATA), skiprows=3)
+    pd.testing.assert_frame_equal(df_tail, expected_tail)
+
+# --- Early-exit Extraction ---
+
+def test_csv_head_stops_reading_after_last_line(tmp_path, monkeypatch, pread_calls):
+    module = rct.readcsvturbo
+    monkeypatch.setattr(module, '_BLOCK_SIZE', 64)
+    path = tmp_path / 'long.csv'
+    path.write_text('a,b\n' + '1,2\n' * 100_000)
+
+    assert module.csv_header(path) == 'a,b'
+    assert module.csv_head(path, header=True, skip_n_first_rows=2, n_rows=3) == '1,2\n1,2\n1,2'
+    assert bytes_read(pread_calls) < 1_000
+
+# --- Count-free Reads ---
+
+def test_csv_extraction_ignores_positional_total_lines(sample_csv):
+    module = rct.readcsvturbo
+    # Called as before the lines were found without a count: (path, total_lines, ...).
+    assert module.csv_head(sample_csv, 6, True, 0, 2) == '1,2,3\n4,5,6'
+    assert module.csv_tail(sample_csv, 6, True, 0, 2) == '10,11,12\n13,14,15'
+    assert module.csv_line_range(sample_csv, 6, 2, 1) == '4,5,6\n7,8,9'
+    with pytest.raises(TypeError, match="'n'"):
+        module.csv_line_range(sample_csv)
+
+def test_read_csv_head_does_not_count_lines(sample_csv, expected_df, monkeypatch):
+    def fail(path):
+        raise AssertionError('get_total_lines should not be called')
+
+    monkeypatch.setattr(rct.readcsvturbo, 'get_total_lines', fail)
+    pd.testing.assert_frame_equal(rct.read_csv_head(sample_csv, n_rows=2), expected_df.iloc[:2])
+    df_headtail = rct.read_csv_headtail(sample_csv, n_rows_head=3, n_rows_tail=3)
+    pd.testing.assert_frame_equal(df_headtail, expected_df)
+
+def test_read_csv_headtail_overlap_without_trailing_newline(tmp_path, expected_df):
+    path = tmp_path / 'no_newline.csv'
+    path.write_text(SAMPLE_CSV_DATA.rstrip('\n'))
+    df_headtail = rct.read_csv_headtail(path, n_rows_head=4, n_rows_tail=2)
+    pd.testing.assert_frame_equal(df_headtail, expected_df)
+
+# --- Line Counting ---
+
+def test_get_total_lines(sample_csv):
+    assert rct.readcsvturbo.get_total_lines(sample_csv) == 6
+
+def test_get_total_lines_without_trailing_newline(tmp_path):
+    path = tmp_path / 'no_newline.csv'
+    path.write_text(SAMPLE_CSV_DATA.rstrip('\n'))
+    assert rct.readcsvturbo.get_total_lines(path) == 6
+
+def test_get_total_lines_parallel_chunks(tmp_path, monkeypatch):
+    module = rct.readcsvturbo
+    monkeypatch.setattr(module, '_COUNT_CHUNK_SIZE', 100)
+    monkeypatch.setattr(module, '_COUNT_BLOCK_SIZE', 30)
+    path = tmp_path / 'many.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i}\n' for i in range(1_000)))
+    assert module.get_total_lines(path) == 1_001
+
+def test_get_total_lines_extended_after_append(tmp_path, pread_calls):
+    module = rct.readcsvturbo
+    path = tmp_path / 'growing.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(20_000)))
+    assert module.get_total_lines(path) == 20_001
+    del pread_calls[:]
+    with open(path, 'a') as f:
+        f.write('20000,"cut\n')
+    assert module.get_total_lines(path) == 20_002
+    with open(path, 'a') as f:
+        f.write('short"\n20001,end')
+    assert module.get_total_lines(path) == 20_003
+    # Fingerprints of the file as counted and as appended to, and the appended bytes.
+    assert bytes_read(pread_calls) < 9 * 4096
+    rct.clear_metadata_cache()
+    assert module.get_total_lines(path) == 20_003
+    assert rct.read_csv_tail(path, n_rows=2)['b'].tolist() == ['cut\nshort', 'end']
+
+# --- Single-read Extraction ---
+
+def test_read_csv_head_single_read(sample_csv, expected_df, pread_calls):
+    df_head = rct.read_csv_head(sample_csv, header=True, n_rows=2)
+    pd.testing.assert_frame_equal(df_head, expected_df.iloc[:2])
+    assert len(pread_calls) == 1
+
+def test_read_csv_tail_header_and_tail_reads(sample_csv, expected_df, pread_calls):
+    df_tail = rct.read_csv_tail(sample_csv, header=True, n_rows=2)
+    pd.testing.assert_frame_equal(df_tail, expected_df.iloc[-2:].reset_index(drop=True))
+    assert len(pread_calls) == 2
+
+def test_read_csv_line_range_does_not_count_lines(sample_csv, expected_df, monkeypatch):
+    def fail(path):
+        raise AssertionError('get_total_lines should not be called')
+
+    monkeypatch.setattr(rct.readcsvturbo, 'get_total_lines', fail)
+    df_line = rct.read_csv_line_range(sample_csv, n=5, rows_after_n=3)
+    pd.testing.assert_frame_equal(df_line, expected_df.iloc[4:].reset_index(drop=True))
+
+# --- Line Index ---
+
+@pytest.fixture
+def indexed_csv(tmp_path):
+    path = tmp_path / 'indexed.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(1_000)))
+    return path
+
+def test_build_line_index(indexed_csv):
+    index = rct.build_line_index(indexed_csv, step=10)
+    assert os.path.exists(f'{indexed_csv}.rctidx')
+    assert index.total_lines == 1_001
+    assert len(index.offsets) == 101
+    assert rct.readcsvturbo.get_total_lines(indexed_csv) == 1_001
+
+def test_read_csv_line_range_with_index(indexed_csv, monkeypatch, pread_calls):
+    rct.build_line_index(indexed_csv, step=10)
+    del pread_calls[:]
+    module = rct.readcsvturbo
+    monkeypatch.setattr(module, '_BLOCK_SIZE', 64)
+    df_line = rct.read_csv_line_range(indexed_csv, n=901, rows_after_n=2)
+    assert df_line['a'].tolist() == [900, 901, 902]
+    assert bytes_read(pread_calls) < 512
+
+def test_read_csv_head_skip_rows_with_index(indexed_csv):
+    rct.build_line_index(indexed_csv, step=7)
+    df_head = rct.read_csv_head(indexed_csv, header=True, skip_n_first_rows=500, n_rows=3)
+    expected_head = pd.read_csv(indexed_csv, skiprows=500, nrows=3)
+    pd.testing.assert_frame_equal(df_head, expected_head)
+
+def test_read_csv_line_range_past_end_with_index(indexed_csv):
+    rct.build_line_index(indexed_csv, step=10)
+    with pytest.raises(ValueError):
+        rct.read_csv_line_range(indexed_csv, n=1_001)
+
+def test_stale_line_index_is_ignored(indexed_csv):
+    rct.build_line_index(indexed_csv, step=10)
+    indexed_csv.write_text('a,b\n1,2\n')
+    assert rct.readcsvturbo.get_total_lines(indexed_csv) == 2
+    pd.testing.assert_frame_equal(rct.read_csv_line_range(indexed_csv, n=1), pd.DataFrame({'a': [1], 'b': [2]}))
+
+def test_line_index_extended_after_append(indexed_csv, monkeypatch, pread_calls):
+    rct.build_line_index(indexed_csv, step=10)
+    with open(indexed_csv, 'a') as f:
+        f.write(''.join(f'{i},{i * 2}\n' for i in range(1_000, 1_025)))
+
+    module = rct.readcsvturbo
+    del pread_calls[:]
+    assert module.get_total_lines(indexed_csv) == 1_026
+    # Two fingerprints of the old file, one of the new file, and the appended bytes.
+    assert bytes_read(pread_calls) < 4 * 4096 + 1_000
+
+    monkeypatch.undo()
+    index = module._load_line_index(indexed_csv)
+    assert index.total_lines == 1_026
+    fresh = module.build_line_index(indexed_csv, step=10)
+    np.testing.assert_array_equal(index.offsets, fresh.offsets)
+
+def test_line_index_extended_after_append_to_unterminated_line(tmp_path):
+    path = tmp_path / 'partial.csv'
+    path.write_text('a,b\n1,2\n3,')
+    rct.build_line_index(path, step=2)
+    with open(path, 'a') as f:
+        f.write('4\n5,6\n7,8')
+    index = rct.readcsvturbo._load_line_index(path)
+    assert index.total_lines == 5
+    np.testing.assert_array_equal(index.offsets, rct.build_line_index(path, step=2).offsets)
+    assert rct.read_csv_line_range(path, n=2, rows_after_n=5)['a'].tolist() == [3, 5, 7]
+
+def test_line_index_ignored_after_rewrite(indexed_csv):
+    rct.build_line_index(indexed_csv, step=10)
+    with open(indexed_csv, 'r+') as f:
+        f.write('x,y')
+    with open(indexed_csv, 'a') as f:
+        f.write('1000,2000\n')
+    assert rct.readcsvturbo._load_line_index(indexed_csv) is None
+
+# --- Metadata Cache ---
+
+def test_metadata_cache_hits(sample_csv, expected_df):
+    rct.read_csv_head(sample_csv, n_rows=2)
+    rct.read_csv_tail(sample_csv, n_rows=2)
+    df_head = rct.read_csv_head(sample_csv, n_rows=2)
+    pd.testing.assert_frame_equal(df_head, expected_df.iloc[:2])
+    info = rct.metadata_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+def test_metadata_cache_warm_reads_skip_header(sample_csv, expected_df, pread_calls):
+    rct.read_csv_tail(sample_csv, n_rows=2)
+    del pread_calls[:]
+    df_tail = rct.read_csv_tail(sample_csv, n_rows=2)
+    pd.testing.assert_frame_equal(df_tail, expected_df.iloc[-2:].reset_index(drop=True))
+    assert len(pread_calls) == 1
+
+def test_metadata_cache_invalidated_by_change(tmp_path):
+    path = tmp_path / 'changing.csv'
+    path.write_text('a,b\n1,2\n')
+    assert rct.readcsvturbo.get_total_lines(path) == 2
+    path.write_text('c,d\n1,2\n3,4\n')
+    assert rct.readcsvturbo.get_total_lines(path) == 3
+    assert rct.read_csv_head(path).columns.tolist() == ['c', 'd']
+
+def test_metadata_cache_eviction(tmp_path):
+    rct.set_metadata_cache_size(2)
+    try:
+        paths = []
+        for i in range(3):
+            path = tmp_path / f'file_{i}.csv'
+            path.write_text('a\n1\n')
+            paths.append(path)
+            rct.read_csv_head(path)
+        assert rct.metadata_cache_info().currsize == 2
+        rct.read_csv_head(paths[0])
+        assert rct.metadata_cache_info().misses == 4
+    finally:
+        rct.set_metadata_cache_size(128)
+
+def test_large_tail_sized_from_profile(tmp_path, pread_calls, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', 64)
+    path = tmp_path / 'padded.csv'
+    path.write_text('a,b\n' + ''.join(f'{i:04d},{i * 2:04d}\n' for i in range(1_000)))
+    rct.read_csv_tail(path, n_rows=600)
+    del pread_calls[:]
+    df_tail = rct.read_csv_tail(path, n_rows=600)
+    assert df_tail['a'].tolist() == list(range(400, 1_000))
+    assert len(pread_calls) == 1
+
+# --- Fixed-width Rows ---
+
+@pytest.fixture
+def fixed_width_csv(tmp_path):
+    path = tmp_path / 'fixed.csv'
+    path.write_text('a,b\n' + ''.join(f'{i:05d},{i * 2:06d}\n' for i in range(10_000)))
+    return path
+
+def test_fixed_width_rows_counted_from_size(fixed_width_csv, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_count_lines', None)
+    assert rct.readcsvturbo.get_total_lines(fixed_width_csv) == 10_001
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+def test_fixed_width_rows_seek_without_scanning(fixed_width_csv, monkeypatch, engine):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', 1024)
+    rct.readcsvturbo.get_total_lines(fixed_width_csv)
+    skipped = []
+    skip_lines = rct.readcsvturbo._skip_lines
+    mmap_skip_lines = rct.readcsvturbo._mmap_skip_lines
+    def record_skip_lines(fd, n_lines, offset=0, quoted=True, sep=','):
+        skipped.append(n_lines)
+        return skip_lines(fd, n_lines, offset, quoted, sep)
+    def record_mmap_skip_lines(m, array, n_lines, offset, end, quoted=True, sep=','):
+        skipped.append(n_lines)
+        return mmap_skip_lines(m, array, n_lines, offset, end, quoted, sep)
+    monkeypatch.setattr(rct.readcsvturbo, '_skip_lines', record_skip_lines)
+    monkeypatch.setattr(rct.readcsvturbo, '_mmap_skip_lines', record_mmap_skip_lines)
+    df_range = rct.read_csv_line_range(fixed_width_csv, n=7_001, rows_after_n=2, engine=engine)
+    assert df_range['a'].tolist() == [7_000, 7_001, 7_002]
+    df_tail = rct.read_csv_tail(fixed_width_csv, n_rows=3, engine=engine)
+    assert df_tail['a'].tolist() == [9_997, 9_998, 9_999]
+    df_past_end = rct.read_csv_line_range(fixed_width_csv, n=9_999, rows_after_n=5, engine=engine)
+    assert df_past_end['a'].tolist() == [9_998, 9_999]
+    assert max(skipped) <= 6
+
+def test_rows_of_different_width_are_scanned(tmp_path, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', 1024)
+    rows = [f'{i:05d},{i * 2:06d}\n' for i in range(10_000)]
+    # Same total size, so only the middle probe can tell.
+    rows[5_000] = '5000,010000\n'
+    rows[5_001] = '05001,0010002\n'
+    path = tmp_path / 'almost_fixed.csv'
+    path.write_text('a,b\n' + ''.join(rows))
+    assert rct.readcsvturbo.get_total_lines(path) == 10_001
+    df_range = rct.read_csv_line_range(path, n=7_001, rows_after_n=0)
+    assert df_range['a'].tolist() == [7_000]
+
+# --- CsvFile ---
+
+def test_csv_file_reads(sample_csv, expected_df):
+    with rct.CsvFile(sample_csv) as csv_file:
+        pd.testing.assert_frame_equal(csv_file.head(n_rows=2), expected_df.iloc[:2])
+        pd.testing.assert_frame_equal(csv_file.tail(n_rows=2), expected_df.iloc[-2:].reset_index(drop=True))
+        pd.testing.assert_frame_equal(csv_file.headtail(n_rows_head=3, n_rows_tail=3), expected_df)
+        pd.testing.assert_frame_equal(
+            csv_file.line_range(n=2, rows_after_n=1), expected_df.iloc[1:3].reset_index(drop=True)
+        )
+        assert csv_file.count() == 6
+    assert csv_file.closed
+
+def test_csv_file_default_kwargs():
+    sample_data = "col1;col2\n1;2\n3;4\n"
+    sample_path = 'sample_session.csv'
+    with open(sample_path, 'w') as f:
+        f.write(sample_data)
+    with rct.CsvFile(sample_path, sep=';') as csv_file:
+        pd.testing.assert_frame_equal(csv_file.head(n_rows=2), pd.read_csv(StringIO(sample_data), sep=';'))
+        assert csv_file.tail(usecols=['col2'])['col2'].tolist() == [4]
+    os.remove(sample_path)
+
+def test_csv_file_caches_header(sample_csv, pread_calls):
+    with rct.CsvFile(sample_csv) as csv_file:
+        csv_file.tail()
+        del pread_calls[:]
+        csv_file.tail()
+        assert len(pread_calls) == 1
+
+def test_csv_file_sees_appended_rows(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text('a,b\n1,2\n')
+    with rct.CsvFile(path) as csv_file:
+        assert csv_file.tail()['a'].tolist() == [1]
+        with open(path, 'a') as f:
+            f.write('3,4\n')
+        assert csv_file.tail()['a'].tolist() == [3]
+        assert csv_file.count() == 3
+
+def test_csv_file_closed(sample_csv):
+    csv_file = rct.CsvFile(sample_csv)
+    csv_file.close()
+    with pytest.raises(ValueError):
+        csv_file.head()
+
+def test_csv_file_nonexistent_file():
+    with pytest.raises(FileNotFoundError):
+        rct.CsvFile('nonexistent.csv')
+
+# --- Engines ---
+
+ENGINES = ['python', 'mmap', 'subprocess']
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engines_read_the_same_rows(sample_csv, expected_df, engine):
+    pd.testing.assert_frame_equal(rct.read_csv_head(sample_csv, n_rows=2, engine=engine), expected_df.iloc[:2])
+    pd.testing.assert_frame_equal(
+        rct.read_csv_tail(sample_csv, n_rows=2, engine=engine), expected_df.iloc[-2:].reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(
+        rct.read_csv_headtail(sample_csv, n_rows_head=4, n_rows_tail=3, engine=engine), expected_df
+    )
+    pd.testing.assert_frame_equal(
+        rct.read_csv_line_range(sample_csv, n=2, rows_after_n=1, engine=engine),
+        expected_df.iloc[1:3].reset_index(drop=True),
+    )
+    with pytest.raises(ValueError):
+        rct.read_csv_line_range(sample_csv, n=6, engine=engine)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engines_skip_rows_without_header(sample_csv, engine):
+    df_tail = rct.read_csv_tail(sample_csv, header=False, skip_n_first_rows=4, n_rows=10, engine=engine)
+    assert df_tail.values.tolist() == [[10, 11, 12], [13, 14, 15]]
+    df_head = rct.read_csv_head(sample_csv, header=True, skip_n_first_rows=2, n_rows=2, engine=engine)
+    pd.testing.assert_frame_equal(df_head, pd.read_csv(StringIO(SAMPLE_CSV_DATA), skiprows=2, nrows=2))
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+def test_engines_with_line_index(indexed_csv, engine):
+    rct.build_line_index(indexed_csv, step=10)
+    df_line = rct.read_csv_line_range(indexed_csv, n=501, rows_after_n=2, engine=engine)
+    assert df_line['a'].tolist() == [500, 501, 502]
+
+def test_read_csv_empty_file_with_mmap_engine():
+    empty_csv_path = 'empty.csv'
+    with open(empty_csv_path, 'w') as f:
+        f.write('')
+    assert rct.read_csv_tail(empty_csv_path, header=False, n_rows=10, engine='mmap').empty
+    os.remove(empty_csv_path)
+
+def test_auto_engine_selection(indexed_csv, monkeypatch):
+    module = rct.readcsvturbo
+    meta = module._file_metadata(indexed_csv)
+    with open(indexed_csv, 'rb') as f:
+        source = module._Source(indexed_csv, f.fileno(), meta)
+        assert module._select_engine('auto', source, 1).name == 'python'
+        assert module._select_engine('auto', source, 1_000).name == 'python'
+        monkeypatch.setattr(module, '_MMAP_MIN_BYTES', 1_024)
+        assert module._select_engine('auto', source, 1).name == 'python'
+        assert module._select_engine('auto', source, 1_000).name == 'mmap'
+
+def test_unknown_engine(sample_csv):
+    with pytest.raises(ValueError):
+        rct.read_csv_head(sample_csv, engine='awk')
+
+# --- mmap Engine ---
+
+def test_mmap_engine_many_lines_across_windows(indexed_csv, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', 100)
+    df_tail = rct.read_csv_tail(indexed_csv, n_rows=300, engine='mmap')
+    assert df_tail['a'].tolist() == list(range(700, 1_000))
+    df_line = rct.read_csv_line_range(indexed_csv, n=201, rows_after_n=199, engine='mmap')
+    assert df_line['a'].tolist() == list(range(200, 400))
+    df_head = rct.read_csv_head(indexed_csv, header=False, skip_n_first_rows=901, n_rows=200, engine='mmap')
+    assert df_head[0].tolist() == list(range(900, 1_000))
+
+def test_mmap_engine_hands_views_to_pandas(indexed_csv):
+    module = rct.readcsvturbo
+    meta = module._file_metadata(indexed_csv)
+    with open(indexed_csv, 'rb') as f:
+        source = module._Source(indexed_csv, f.fileno(), meta)
+        header_line, data = module._tail_content(source, True, 0, 3, engine='mmap')
+    assert header_line == b'a,b'
+    assert all(isinstance(segment, memoryview) for segment in data)
+    df_tail = module.parse_csv_content(header_line, data)
+    assert df_tail['b'].tolist() == [1_994, 1_996, 1_998]
+
+def test_mmap_engine_reuses_map(indexed_csv):
+    rct.read_csv_tail(indexed_csv, engine='mmap')
+    mapping = rct.readcsvturbo._file_metadata(indexed_csv).mapping
+    assert mapping is not None
+    rct.read_csv_line_range(indexed_csv, n=10, engine='mmap')
+    assert rct.readcsvturbo._file_metadata(indexed_csv).mapping is mapping
+
+def test_mmap_engine_releases_map(indexed_csv, tmp_path):
+    rct.read_csv_tail(indexed_csv, engine='mmap')
+    mapping = rct.readcsvturbo._file_metadata(indexed_csv).mapping
+    rct.clear_metadata_cache()
+    assert mapping.closed
+    other = tmp_path / 'other.csv'
+    other.write_text('a\n1\n')
+    rct.set_metadata_cache_size(1)
+    try:
+        rct.read_csv_tail(indexed_csv, engine='mmap')
+        mapping = rct.readcsvturbo._file_metadata(indexed_csv).mapping
+        rct.read_csv_tail(other, engine='mmap')
+        assert mapping.closed
+    finally:
+        rct.set_metadata_cache_size(128)
+    with rct.CsvFile(indexed_csv, engine='mmap') as csv_file:
+        csv_file.tail()
+        mapping = csv_file._meta.mapping
+    assert mapping.closed
+
+def test_mmap_engine_map_in_use_outlives_release(indexed_csv):
+    with open(indexed_csv, 'rb') as f:
+        source = rct.readcsvturbo._Source(indexed_csv, f.fileno(), rct.readcsvturbo._file_metadata(indexed_csv))
+        mapping, array = rct.readcsvturbo._ENGINES['mmap']._map(source)
+    rct.clear_metadata_cache()
+    # Still mapped for the read that holds it.
+    assert not mapping.closed and bytes(mapping[:2]) == bytes(array[:2])
+
+def test_mmap_engine_headtail_segments(sample_csv, expected_df):
+    df_headtail = rct.read_csv_headtail(sample_csv, n_rows_head=1, n_rows_tail=1, engine='mmap')
+    pd.testing.assert_frame_equal(df_headtail, expected_df.iloc[[0, -1]].reset_index(drop=True))
+
+# --- Quoted Newlines ---
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    path = tmp_path / 'quoted.csv'
+    rows = []
+    for i in range(300):
+        note = f'"line {i}\nsays ""hi""\n"' if i % 3 == 0 else f'plain {i}'
+        rows.append(f'{i},{note}\n')
+    path.write_text('id,note\n' + ''.join(rows))
+    return path
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+@pytest.mark.parametrize('block_size', [16, 1 << 16])
+def test_quoted_newlines_are_not_record_ends(quoted_csv, monkeypatch, engine, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', block_size)
+    expected = pd.read_csv(quoted_csv)
+    df_head = rct.read_csv_head(quoted_csv, n_rows=4, engine=engine)
+    pd.testing.assert_frame_equal(df_head, expected.iloc[:4])
+    df_tail = rct.read_csv_tail(quoted_csv, n_rows=5, engine=engine)
+    pd.testing.assert_frame_equal(df_tail, expected.iloc[-5:].reset_index(drop=True))
+    df_range = rct.read_csv_line_range(quoted_csv, n=100, rows_after_n=99, engine=engine)
+    pd.testing.assert_frame_equal(df_range, expected.iloc[99:199].reset_index(drop=True))
+    df_headtail = rct.read_csv_headtail(quoted_csv, n_rows_head=150, n_rows_tail=160, engine=engine)
+    pd.testing.assert_frame_equal(df_headtail, expected)
+
+def test_quoted_newlines_counted_as_one_record(quoted_csv):
+    assert rct.readcsvturbo.get_total_lines(quoted_csv) == 301
+    assert rct.readcsvturbo._file_metadata(quoted_csv).quoted_newlines is True
+
+def test_quotes_without_newlines_keep_raw_newline_scans(tmp_path):
+    path = tmp_path / 'quoted_no_newlines.csv'
+    path.write_text('id,note\n' + ''.join(f'{i},"say ""{i}"""\n' for i in range(100)))
+    assert rct.readcsvturbo.get_total_lines(path) == 101
+    assert rct.readcsvturbo._file_metadata(path).quoted_newlines is False
+    assert rct.read_csv_tail(path, n_rows=1)['note'].tolist() == ['say "99"']
+
+def test_quoted_newlines_counted_across_chunks(quoted_csv, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_CHUNK_SIZE', 7)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', 5)
+    assert rct.readcsvturbo.get_total_lines(quoted_csv) == 301
+
+def test_line_index_of_quoted_newlines(quoted_csv, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', 64)
+    index = rct.build_line_index(quoted_csv, step=10)
+    assert index.total_lines == 301
+    assert index.quoted_newlines
+    expected = pd.read_csv(quoted_csv)
+    df_range = rct.read_csv_line_range(quoted_csv, n=123, rows_after_n=20)
+    pd.testing.assert_frame_equal(df_range, expected.iloc[122:143].reset_index(drop=True))
+
+def test_line_index_extended_inside_quoted_field(quoted_csv):
+    rct.build_line_index(quoted_csv, step=10)
+    with open(quoted_csv, 'a') as f:
+        f.write('300,"cut\n')
+    assert rct.readcsvturbo.get_total_lines(quoted_csv) == 302
+    with open(quoted_csv, 'a') as f:
+        f.write('short"\n301,end\n')
+    rct.clear_metadata_cache()
+    assert rct.readcsvturbo.get_total_lines(quoted_csv) == 303
+    df_tail = rct.read_csv_tail(quoted_csv, n_rows=2)
+    assert df_tail['note'].tolist() == ['cut\nshort', 'end']
+
+@pytest.fixture
+def stray_quote_csv(tmp_path):
+    path = tmp_path / 'stray_quote.csv'
+    rows = [f'{i},item {i}' for i in range(12)]
+    rows[4] = '5,TV 55" screen'
+    path.write_text('id,name\n' + '\n'.join(rows) + '\n')
+    return path
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+@pytest.mark.parametrize('block_size', [3, 16, 1 << 16])
+def test_stray_quote_inside_unquoted_field(stray_quote_csv, monkeypatch, engine, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', block_size)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', block_size)
+    expected = pd.read_csv(stray_quote_csv)
+    assert rct.readcsvturbo.get_total_lines(stray_quote_csv) == 13
+    df_head = rct.read_csv_head(stray_quote_csv, n_rows=8, engine=engine)
+    pd.testing.assert_frame_equal(df_head, expected.iloc[:8])
+    df_range = rct.read_csv_line_range(stray_quote_csv, n=6, rows_after_n=2, engine=engine)
+    pd.testing.assert_frame_equal(df_range, expected.iloc[5:8].reset_index(drop=True))
+    df_tail = rct.read_csv_tail(stray_quote_csv, n_rows=8, engine=engine)
+    pd.testing.assert_frame_equal(df_tail, expected.iloc[-8:].reset_index(drop=True))
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+@pytest.mark.parametrize('block_size', [3, 1 << 16])
+def test_stray_quotes_among_quoted_newlines(tmp_path, monkeypatch, engine, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', block_size)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', block_size)
+    path = tmp_path / 'mixed_quotes.csv'
+    path.write_text(
+        'id,name\n0,"multi\nline ""q"" 0"\n1,TV 1" screen\n2,plain 2\n3,ends 3"\n'
+        '4,"multi\nline ""q"" 4"\n5,TV 5" screen\n6,plain 6\n'
+    )
+    expected = pd.read_csv(path)
+    assert rct.readcsvturbo.get_total_lines(path) == 8
+    # Scanning back, the quotes of the first rows read the same as a stray one: the tail is counted forward.
+    for n_rows in (3, 7):
+        df_tail = rct.read_csv_tail(path, n_rows=n_rows, engine=engine)
+        pd.testing.assert_frame_equal(df_tail, expected.iloc[-n_rows:].reset_index(drop=True))
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('block_size', [3, 16, 1 << 16])
+def test_stray_quote_after_punctuation(tmp_path, monkeypatch, engine, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', block_size)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', block_size)
+    path = tmp_path / 'punctuation_quote.csv'
+    path.write_text('a,b\n1,key:"v\n2,x=""y\n3,(w"\n4,q\n')
+    expected = pd.read_csv(path)
+    assert rct.readcsvturbo.get_total_lines(path) == 5
+    df_range = rct.read_csv_line_range(path, n=3, engine=engine)
+    pd.testing.assert_frame_equal(df_range, expected.iloc[2:3].reset_index(drop=True))
+    df_headtail = rct.read_csv_headtail(path, n_rows_head=1, n_rows_tail=1, engine=engine)
+    pd.testing.assert_frame_equal(df_headtail, expected.iloc[[0, 3]].reset_index(drop=True))
+
+@pytest.mark.parametrize('engine', ['python', 'mmap'])
+@pytest.mark.parametrize('block_size', [3, 16, 1 << 16])
+def test_quoted_newlines_in_space_separated_file(tmp_path, monkeypatch, engine, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_BLOCK_SIZE', block_size)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', block_size)
+    path = tmp_path / 'spaces.csv'
+    path.write_text('id note\n' + ''.join(f'{i} "line {i}\nnext, {i}"\n{i + 100} plain,{i}\n' for i in range(5)))
+    expected = pd.read_csv(path, sep=' ')
+    assert rct.readcsvturbo.get_total_lines(path, sep=' ') == 11
+    df_tail = rct.read_csv_tail(path, n_rows=3, engine=engine, sep=' ')
+    pd.testing.assert_frame_equal(df_tail, expected.iloc[-3:].reset_index(drop=True))
+    df_range = rct.read_csv_line_range(path, n=4, rows_after_n=2, engine=engine, sep=' ')
+    pd.testing.assert_frame_equal(df_range, expected.iloc[3:6].reset_index(drop=True))
+
+def test_line_index_kept_for_its_separator(tmp_path):
+    path = tmp_path / 'spaces.csv'
+    path.write_text('id note\n' + ''.join(f'{i} "a\nb"\n' for i in range(20)))
+    rct.build_line_index(path, step=4, sep=' ')
+    assert rct.readcsvturbo._load_line_index(path, ' ').total_lines == 21
+    assert rct.readcsvturbo._load_line_index(path) is None
+    df_tail = rct.read_csv_tail(path, n_rows=2, sep=' ')
+    assert df_tail['id'].tolist() == [18, 19]
+
+def test_quoted_newlines_counted_in_one_pass(quoted_csv, monkeypatch, pread_calls):
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_CHUNK_SIZE', 64)
+    assert rct.readcsvturbo.get_total_lines(quoted_csv) == 301
+    chunk_reads = [offset for size, offset, _ in pread_calls if 1 < size <= 64]
+    # Every chunk is read once, even though quote state crosses chunks.
+    assert sorted(chunk_reads) == list(range(0, quoted_csv.stat().st_size, 64))
+
+def test_line_index_of_quoted_newlines_built_in_chunks(quoted_csv, monkeypatch):
+    serial = rct.build_line_index(quoted_csv, step=7)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_CHUNK_SIZE', 50)
+    monkeypatch.setattr(rct.readcsvturbo, '_COUNT_BLOCK_SIZE', 16)
+    chunked = rct.build_line_index(quoted_csv, step=7)
+    assert chunked.total_lines == serial.total_lines == 301
+    assert chunked.quoted_newlines
+    np.testing.assert_array_equal(chunked.offsets, serial.offsets)
+
+# --- Bytes Pipeline ---
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engines_hand_bytes_to_pandas(sample_csv, engine):
+    module = rct.readcsvturbo
+    meta = module._file_metadata(sample_csv)
+    with open(sample_csv, 'rb') as f:
+        source = module._Source(sample_csv, f.fileno(), meta)
+        _, data = module._headtail_content(source, True, 0, 1, 1, engine=engine)
+    assert data and all(isinstance(segment, (bytes, memoryview)) for segment in data)
+
+def test_data_decoded_by_pandas(tmp_path):
+    path = tmp_path / 'latin1.csv'
+    path.write_bytes('name,city\nJosé,Zürich\nAnaïs,Genève\n'.encode('latin-1'))
+    df_tail = rct.read_csv_tail(path, n_rows=2, encoding='latin-1')
+    assert df_tail['city'].tolist() == ['Zürich', 'Genève']
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_header_decoded_with_encoding(tmp_path, engine):
+    path = tmp_path / 'latin1_header.csv'
+    path.write_bytes('prénom,ville\nJosé,Zürich\nAnaïs,Genève\nZoé,Besançon\n'.encode('latin-1'))
+    expected = pd.read_csv(path, encoding='latin-1')
+    df_head = rct.read_csv_head(path, n_rows=2, engine=engine, encoding='latin-1')
+    pd.testing.assert_frame_equal(df_head, expected.iloc[:2])
+    df_tail = rct.read_csv_tail(path, n_rows=2, engine=engine, encoding='latin-1')
+    pd.testing.assert_frame_equal(df_tail, expected.iloc[-2:].reset_index(drop=True))
+    columns = rct.read_csv_tail(path, n_rows=1, engine=engine, output='columns', encoding='latin-1')
+    assert columns == {'prénom': ['Zoé'], 'ville': ['Besançon']}
+
+# --- Small-slice Parser ---
+
+SMALL_SLICES = [
+    'a,b,c\n1,x,True\n2,,False\n',
+    'a,b,c\n1.5,NA,true\n-2,"q,""uoted""",\n',
+    'a,b\n007,1e5\n+3,.5\n',
+    'a,b\n1,True\n,2\n',
+    'a,b\n"multi\nline",-0\nx ,5.\n',
+    'a,b\ninf,1_0\n 1,2\n',
+    'a,a\n1,2\n',
+    'a,b\n99999999999999999999,1\n',
+]
+
+@pytest.mark.parametrize('content', SMALL_SLICES)
+@pytest.mark.parametrize('header', [True, False])
+def test_small_slice_parser_matches_pandas(tmp_path, content, header):
+    path = tmp_path / 'small.csv'
+    path.write_text(content)
+    expected = pd.read_csv(path, header=0 if header else None, skiprows=0 if header else 1)
+    df_head = rct.read_csv_head(path, header=header, skip_n_first_rows=0 if header else 1, n_rows=5)
+    pd.testing.assert_frame_equal(df_head, expected, check_column_type=True, check_exact=True)
+
+def test_small_slice_skips_read_csv(sample_csv, expected_df, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("pandas.read_csv should not be called")
+    monkeypatch.setattr(pd, 'read_csv', fail)
+    df_headtail = rct.read_csv_headtail(sample_csv, n_rows_head=1, n_rows_tail=1)
+    pd.testing.assert_frame_equal(df_headtail, expected_df.iloc[[0, -1]].reset_index(drop=True))
+
+def test_small_slice_options_use_read_csv(sample_csv):
+    df_head = rct.read_csv_head(sample_csv, n_rows=2, dtype=str)
+    assert df_head['col1'].tolist() == ['1', '4']
+
+# --- Numeric Parser ---
+
+@pytest.fixture
+def numeric_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(500),
+        'count': rng.integers(-10**12, 10**12, 500),
+        'price': rng.normal(0, 1000, 500).round(4),
+        'ratio': (rng.random(500) * 1e-5).round(12),
+    })
+    df.loc[::7, 'price'] = np.nan
+    path = tmp_path / 'numeric.csv'
+    df.to_csv(path, index=False)
+    return path
+
+def test_numeric_parser_matches_pandas(numeric_csv):
+    expected = pd.read_csv(numeric_csv).iloc[100:400].reset_index(drop=True)
+    df_range = rct.read_csv_line_range(numeric_csv, 101, rows_after_n=299, parser='numeric')
+    pd.testing.assert_frame_equal(df_range, expected, check_exact=True)
+
+def test_numeric_parser_in_blocks(numeric_csv, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_NUMERIC_BLOCK_SIZE', 256)
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail("pandas.read_csv should not be called"))
+    with rct.CsvFile(numeric_csv, parser='numeric') as csv_file:
+        df_tail = csv_file.tail(n_rows=200)
+    assert df_tail['id'].tolist() == list(range(300, 500))
+    assert df_tail['count'].dtype == np.int64 and df_tail['price'].dtype == np.float64
+
+def test_numeric_parser_falls_back_to_pandas(tmp_path):
+    path = tmp_path / 'mixed.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 0.5}\n' for i in range(40)) + '40,n/a\n41,x\n')
+    df_tail = rct.read_csv_tail(path, n_rows=30, parser='numeric')
+    pd.testing.assert_frame_equal(df_tail, pd.read_csv(path).iloc[-30:].reset_index(drop=True))
+
+@pytest.mark.parametrize('block_size', [64, 1 << 20])
+def test_numeric_parser_long_ints_among_decimals(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(rct.readcsvturbo, '_NUMERIC_BLOCK_SIZE', block_size)
+    path = tmp_path / 'long_ints.csv'
+    rows = [f'{i},{10 ** 17 + i}\n' for i in range(10)] + ['10,999999999999999999\n'] + [f'{i},{i}.5\n' for i in range(11, 20)]
+    path.write_text('a,b\n' + ''.join(rows))
+    df = rct.read_csv_tail(path, n_rows=20, parser='numeric')
+    pd.testing.assert_frame_equal(df, pd.read_csv(path), check_exact=True)
+
+def test_unknown_parser(sample_csv):
+    with pytest.raises(ValueError, match="Unknown parser"):
+        rct.read_csv_head(sample_csv, parser='fast')
+
+# --- Schema Cache ---
+
+@pytest.fixture
+def schema_csv(tmp_path):
+    path = tmp_path / 'schema.csv'
+    lines = ['id,when,code,amount']
+    for i in range(40):
+        code = 'A1' if i < 10 else str(i)
+        amount = '' if i == 39 else str(i * 10)
+        lines.append(f'{i},2024-01-{i % 28 + 1:02d} 08:30:00,{code},{amount}')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+@pytest.mark.parametrize('n_rows', [2, 30])
+def test_schema_keeps_head_types(schema_csv, n_rows):
+    df_tail = rct.read_csv_tail(schema_csv, n_rows=n_rows, schema_rows=10)
+    assert df_tail['code'].dtype == pd.read_csv(schema_csv, nrows=10)['code'].dtype
+    assert df_tail['code'].iloc[-1] == '39'
+    assert df_tail['when'].dtype.kind == 'M'
+    assert df_tail['when'].iloc[-1] == pd.Timestamp('2024-01-12 08:30:00')
+    # The last amount is missing, which an int64 column cannot hold: those rows are read without the schema.
+    assert df_tail['amount'].dtype == np.float64
+
+def test_schema_without_sample_infers_each_read(schema_csv):
+    df_tail = rct.read_csv_tail(schema_csv, n_rows=2)
+    assert df_tail['code'].dtype == np.int64 and df_tail['when'].dtype != 'datetime64[us]'
+
+def test_schema_inferred_once(schema_csv, monkeypatch):
+    calls = []
+    infer_schema = rct.readcsvturbo._infer_schema
+    monkeypatch.setattr(rct.readcsvturbo, '_infer_schema', lambda sample: calls.append(1) or infer_schema(sample))
+    with rct.CsvFile(schema_csv, schema_rows=5) as csv_file:
+        df_head = csv_file.head(n_rows=3)
+        df_range = csv_file.line_range(20, rows_after_n=3)
+    rct.read_csv_tail(schema_csv, n_rows=1, schema_rows=5)
+    rct.read_csv_tail(schema_csv, n_rows=1, schema_rows=5)
+    assert len(calls) == 2
+    pd.testing.assert_series_equal(df_head.dtypes, df_range.dtypes)
+
+def test_schema_kept_for_each_set_of_arguments(schema_csv):
+    df_some = rct.read_csv_tail(schema_csv, n_rows=2, schema_rows=10, usecols=['id', 'amount'])
+    assert df_some.columns.tolist() == ['id', 'amount']
+    df_all = rct.read_csv_tail(schema_csv, n_rows=2, schema_rows=10)
+    assert df_all['code'].dtype == pd.read_csv(schema_csv, nrows=10)['code'].dtype
+    assert df_all['when'].dtype.kind == 'M'
+    df_other = rct.read_csv_tail(schema_csv, n_rows=2, schema_rows=10, usecols=['id', 'code'])
+    assert df_other.columns.tolist() == ['id', 'code']
+    assert df_other['code'].dtype == df_all['code'].dtype
+    df_typed = rct.read_csv_tail(schema_csv, n_rows=2, schema_rows=10, dtype={'id': 'float64'})
+    assert df_typed['id'].dtype == np.float64 and df_typed['when'].dtype.kind == 'M'
+
+def test_schema_sample_must_be_positive(schema_csv):
+    with pytest.raises(ValueError, match="positive"):
+        rct.read_csv_tail(schema_csv, schema_rows=0)
+
+# --- Output Backends ---
+
+def test_output_lines(sample_csv, quoted_csv, monkeypatch):
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail("pandas.read_csv should not be called"))
+    assert rct.read_csv_tail(sample_csv, n_rows=2, output='lines') == [b'10,11,12', b'13,14,15']
+    lines = rct.read_csv_tail(quoted_csv, n_rows=3, output='lines')
+    assert lines == [b'297,"line 297\nsays ""hi""\n"', b'298,plain 298', b'299,plain 299']
+
+def test_output_columns(sample_csv):
+    columns = rct.read_csv_head(sample_csv, n_rows=2, output='columns')
+    assert columns == {'col1': ['1', '4'], 'col2': ['2', '5'], 'col3': ['3', '6']}
+    columns = rct.read_csv_tail(sample_csv, header=False, n_rows=1, output='columns', sep=';')
+    assert columns == {0: ['13,14,15']}
+
+def test_output_columns_missing_fields(tmp_path):
+    path = tmp_path / 'ragged.csv'
+    path.write_text('a,b,a\n1,,"x,y"\n2\n')
+    columns = rct.read_csv_head(path, n_rows=2, output='columns')
+    assert columns == {'a': ['1', '2'], 'b': [None, None], 'a.1': ['x,y', None]}
+
+def test_output_numpy(sample_csv, expected_df):
+    records = rct.read_csv_tail(sample_csv, n_rows=2, output='numpy')
+    assert records.dtype.names == ('col1', 'col2', 'col3')
+    np.testing.assert_array_equal(records['col3'], [12, 15])
+
+def test_output_numpy_without_pandas(numeric_csv, monkeypatch):
+    expected = pd.read_csv(numeric_csv).iloc[-100:]
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail("pandas.read_csv should not be called"))
+    records = rct.read_csv_tail(numeric_csv, n_rows=100, output='numpy')
+    assert records.dtype['count'] == np.int64 and records.dtype['price'] == np.float64
+    np.testing.assert_array_equal(records['price'], expected['price'].to_numpy())
+
+def test_output_numpy_text_columns(schema_csv):
+    records = rct.read_csv_head(schema_csv, n_rows=20, output='numpy')
+    assert records['code'][0] == 'A1' and records['id'][-1] == 19
+
+def test_output_arrow(sample_csv):
+    pytest.importorskip('pyarrow')
+    table = rct.read_csv_tail(sample_csv, n_rows=2, output='arrow')
+    assert table.column_names == ['col1', 'col2', 'col3']
+    assert table.column('col1').to_pylist() == [10, 13]
+
+def test_output_arrow_requires_pyarrow(sample_csv):
+    try:
+        import pyarrow  # noqa: F401
+        pytest.skip("pyarrow is installed")
+    except ImportError:
+        pass
+    with pytest.raises(ImportError, match="pyarrow"):
+        rct.read_csv_tail(sample_csv, output='arrow')
+
+def test_output_errors(sample_csv):
+    with pytest.raises(ValueError, match="Unknown output"):
+        rct.read_csv_tail(sample_csv, output='polars')
+    with pytest.raises(TypeError, match="dtype"):
+        rct.read_csv_tail(sample_csv, output='columns', dtype=str)
+
+# --- Compact Results ---
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    path = tmp_path / 'wide.csv'
+    rows = [f'{i},{-i * 300},{i * 0.5},{i * 0.1},{"abc"[i % 3]},name {i}\n' for i in range(60)]
+    path.write_text('small,negative,half,tenth,letter,name\n' + ''.join(rows))
+    return path
+
+@pytest.mark.parametrize('parser', ['pandas', 'numeric'])
+@pytest.mark.parametrize('n_rows', [6, 50])
+def test_compact_dtypes(wide_csv, parser, n_rows):
+    expected = rct.read_csv_tail(wide_csv, n_rows=n_rows, parser=parser)
+    df_tail = rct.read_csv_tail(wide_csv, n_rows=n_rows, parser=parser, compact=True)
+    assert df_tail['small'].dtype == np.uint8
+    assert df_tail['negative'].dtype == np.int16
+    assert df_tail['half'].dtype == np.float32
+    assert df_tail['tenth'].dtype == np.float64
+    assert isinstance(df_tail['letter'].dtype, pd.CategoricalDtype)
+    assert not isinstance(df_tail['name'].dtype, pd.CategoricalDtype)
+    for column in expected.columns:
+        pd.testing.assert_series_equal(df_tail[column].astype(expected[column].dtype), expected[column])
+
+def test_compact_numbers_without_pandas(numeric_csv, monkeypatch):
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail("pandas.read_csv should not be called"))
+    df_tail = rct.read_csv_tail(numeric_csv, n_rows=100, parser='numeric', compact=True)
+    assert df_tail['id'].dtype == np.uint16
+    records = rct.read_csv_tail(numeric_csv, n_rows=100, output='numpy', compact=True)
+    assert records.dtype['id'] == np.uint16 and records.dtype['count'] == np.int64
+
+def test_compact_with_schema(schema_csv):
+    df_tail = rct.read_csv_tail(schema_csv, n_rows=3, schema_rows=10, compact=True)
+    assert df_tail['id'].dtype == np.uint8 and df_tail['when'].dtype.kind == 'M'
+
+def test_compact_pyarrow_strings(wide_csv):
+    pytest.importorskip('pyarrow')
+    df_tail = rct.read_csv_tail(wide_csv, n_rows=50, compact='pyarrow')
+    assert df_tail['name'].dtype == pd.StringDtype('pyarrow')
+
+def test_unknown_compact_mode(sample_csv):
+    with pytest.raises(ValueError, match="Unknown compact mode"):
+        rct.read_csv_tail(sample_csv, compact='small')
+
+# --- Batch Reads ---
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for i in range(6):
+        rows = ''.join(f'{j},{j * 0.5 if i % 2 else j},{"x" if i < 3 else j}\n' for j in range(20))
+        (tmp_path / f'part{i}.csv').write_text('a,b,c\n' + rows)
+    (tmp_path / 'extra.csv').write_text('a,d\n1,first\n2,second\n')
+    return tmp_path
+
+def test_many_dict(csv_dir):
+    paths = [csv_dir / 'part3.csv', csv_dir / 'part0.csv']
+    results = rct.read_csv_tail_many(paths, n_rows=2, max_workers=2)
+    assert list(results) == paths
+    for path in paths:
+        pd.testing.assert_frame_equal(results[path], rct.read_csv_tail(path, n_rows=2))
+
+@pytest.mark.parametrize('read_many, read, args', [
+    (rct.read_csv_head_many, rct.read_csv_head, {'n_rows': 3}),
+    (rct.read_csv_tail_many, rct.read_csv_tail, {'n_rows': 3}),
+    (rct.read_csv_headtail_many, rct.read_csv_headtail, {'n_rows_head': 1, 'n_rows_tail': 2}),
+    (rct.read_csv_line_range_many, rct.read_csv_line_range, {'n': 2, 'rows_after_n': 0}),
+])
+def test_many_concat_matches_pd_concat(csv_dir, read_many, read, args):
+    pattern = str(csv_dir / '*.csv')
+    paths = sorted(glob.glob(pattern))
+    expected = pd.concat(
+        [read(path, **args).assign(source_file=path) for path in paths], ignore_index=True
+    )
+    expected.insert(0, 'source_file', pd.Categorical(expected.pop('source_file'), categories=paths))
+    df = read_many(pattern, concat=True, **args)
+    pd.testing.assert_frame_equal(df, expected)
+
+def test_many_concat_preallocates(csv_dir, monkeypatch):
+    monkeypatch.setattr(pd, 'concat', lambda *args, **kwargs: pytest.fail("pd.concat should not be called"))
+    df = rct.read_csv_tail_many(str(csv_dir / 'part*.csv'), n_rows=20, concat=True, source_column=None)
+    assert len(df) == 120 and list(df.columns) == ['a', 'b', 'c']
+
+def test_many_other_outputs(csv_dir):
+    results = rct.read_csv_tail_many(str(csv_dir / 'part*.csv'), output='lines')
+    assert results == {path: rct.read_csv_tail(path, output='lines') for path in sorted(glob.glob(str(csv_dir / 'part*.csv')))}
+    with pytest.raises(ValueError, match="concat"):
+        rct.read_csv_tail_many(str(csv_dir / 'part*.csv'), output='lines', concat=True)
+
+def test_many_raises_first_error(csv_dir):
+    with pytest.raises(FileNotFoundError):
+        rct.read_csv_tail_many([csv_dir / 'part0.csv', csv_dir / 'missing.csv'])
+
+# --- Process Parsing ---
+
+@pytest.fixture
+def process_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_PROCESS_MIN_BYTES', 1 << 12)
+    path = tmp_path / 'process.csv'
+    rows = ''.join(f'{i},{i * 0.25},"text {i % 7}\nline",{i % 3 == 0}\n' for i in range(5000))
+    path.write_text('id,ratio,note,flag\n' + rows + '4999,,x,True\n')
+    return path
+
+@pytest.mark.parametrize('args', [{}, {'parser': 'numeric'}, {'compact': True}, {'header': False}, {'schema_rows': 50}])
+def test_processes_match_single_process(process_csv, args):
+    expected = rct.read_csv_tail(process_csv, n_rows=4000, **args)
+    df = rct.read_csv_tail(process_csv, n_rows=4000, processes=3, **args)
+    pd.testing.assert_frame_equal(df, expected)
+
+def test_processes_return_columns_in_shared_memory(process_csv, monkeypatch):
+    module = rct.readcsvturbo
+    attached = []
+    piece_blocks = module._piece_blocks
+    monkeypatch.setattr(module, '_piece_blocks', lambda pieces: attached.append(pieces) or piece_blocks(pieces))
+    rct.read_csv_head(process_csv, n_rows=4000, processes=2)
+    assert len(attached) == 1 and len(attached[0]) == 2
+    for _, columns in attached[0]:
+        # Only the text column is pickled.
+        assert [isinstance(column, tuple) for column in columns] == [True, True, False, True]
+
+def test_processes_after_shared_executor_started(tmp_path, monkeypatch):
+    module = rct.readcsvturbo
+    monkeypatch.setattr(module, '_PROCESS_MIN_BYTES', 1 << 14)
+    monkeypatch.setattr(module, '_NUMERIC_BLOCK_SIZE', 1 << 12)
+    path = tmp_path / 'numeric.csv'
+    path.write_text('a,b,c\n' + ''.join(f'{i},{i * 0.25},{i % 3}\n' for i in range(5000)))
+    expected = rct.read_csv_tail(path, n_rows=5000, parser='numeric')
+    assert module._shared_executor._executor is not None
+    # Forked now, the workers split their pieces into several blocks on their own thread pool.
+    df = rct.read_csv_tail(path, n_rows=5000, parser='numeric', processes=4)
+    pd.testing.assert_frame_equal(df, expected)
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="needs SIGKILL")
+def test_processes_restart_broken_pool(process_csv):
+    expected = rct.read_csv_tail(process_csv, n_rows=4000, processes=2)
+    _, executor = rct.readcsvturbo._process_pool
+    for process in list(executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    with pytest.raises(BrokenProcessPool):
+        executor.submit(os.getpid).result(timeout=30)
+    df = rct.read_csv_tail(process_csv, n_rows=4000, processes=2)
+    pd.testing.assert_frame_equal(df, expected)
+    assert rct.readcsvturbo._process_pool[1] is not executor
+
+def test_processes_join_ints_with_floats():
+    join_pieces = rct.readcsvturbo._join_pieces
+    df = join_pieces([(['a'], [np.array([3, 10 ** 15 - 1])]), (['a'], [np.array([0.5])])])
+    assert df['a'].tolist() == [3.0, 10.0 ** 15 - 1, 0.5]
+    # Longer integers are not always read as pandas reads them among decimals.
+    assert join_pieces([(['a'], [np.array([999999999999999999])]), (['a'], [np.array([0.5])])]) is None
+
+def test_processes_fall_back_on_mixed_types(tmp_path, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_PROCESS_MIN_BYTES', 1 << 12)
+    path = tmp_path / 'mixed.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i}\n' for i in range(3000)) + ''.join(f'x{i},{i}\n' for i in range(3000)))
+    df = rct.read_csv_tail(path, n_rows=6000, processes=2)
+    pd.testing.assert_frame_equal(df, rct.read_csv_tail(path, n_rows=6000))
+    assert pd.api.types.is_string_dtype(df['a'])
+
+def test_processes_raise_parse_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(rct.readcsvturbo, '_PROCESS_MIN_BYTES', 1 << 12)
+    path = tmp_path / 'bad.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i}\n' for i in range(6000)) + '1,2,3\n')
+    with pytest.raises(pd.errors.ParserError):
+        rct.read_csv_tail(path, n_rows=6001, processes=2)
+
+# --- Async Reads ---
+
+@pytest.mark.parametrize('aread, read, args', [
+    (rct.aread_csv_head, rct.read_csv_head, {'n_rows': 3}),
+    (rct.aread_csv_tail, rct.read_csv_tail, {'n_rows': 3, 'engine': 'subprocess'}),
+    (rct.aread_csv_headtail, rct.read_csv_headtail, {'n_rows_head': 2, 'n_rows_tail': 2, 'engine': 'subprocess'}),
+    (rct.aread_csv_line_range, rct.read_csv_line_range, {'n': 5, 'rows_after_n': 2}),
+])
+def test_aread_matches_read(csv_dir, aread, read, args):
+    path = csv_dir / 'part1.csv'
+    pd.testing.assert_frame_equal(asyncio.run(aread(path, **args)), read(path, **args))
+
+def test_aread_many(csv_dir):
+    pattern = str(csv_dir / 'part*.csv')
+    results = asyncio.run(rct.aread_csv_many(pattern, read=rct.aread_csv_head, n_rows=2, limit=2))
+    assert list(results) == sorted(glob.glob(pattern))
+    df = asyncio.run(rct.aread_csv_many(pattern, n_rows=2, concat=True))
+    pd.testing.assert_frame_equal(df, rct.read_csv_tail_many(pattern, n_rows=2, concat=True))
+
+def test_aread_concurrency_limit(csv_dir, monkeypatch):
+    running = []
+    peak = []
+    read_csv_tail = rct.read_csv_tail
+
+    def slow_read(*args, **kwargs):
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.01)
+        running.pop()
+        return read_csv_tail(*args, **kwargs)
+
+    monkeypatch.setattr(rct.readcsvturbo, 'read_csv_tail', slow_read)
+    asyncio.run(rct.aread_csv_many([csv_dir / 'part0.csv'] * 20, limit=3))
+    assert max(peak) <= 3
+    monkeypatch.setattr(rct.readcsvturbo, '_ASYNC_CONCURRENCY', 1)
+    peak.clear()
+    asyncio.run(rct.aread_csv_many([csv_dir / 'part0.csv'] * 5))
+    assert max(peak) == 1
+    with pytest.raises(ValueError, match="positive"):
+        rct.set_async_concurrency(0)
+
+def test_aread_cancel_kills_child_processes(csv_dir, monkeypatch):
+    started = []
+
+    def hanging_read(*args, **kwargs):
+        process = rct.readcsvturbo._popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        started.append(process)
+        process.wait()
+        return process.returncode
+
+    async def cancel_read():
+        task = asyncio.ensure_future(rct.aread_csv_tail(csv_dir / 'part0.csv'))
+        while not started:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    monkeypatch.setattr(rct.readcsvturbo, 'read_csv_tail', hanging_read)
+    start = time.perf_counter()
+    asyncio.run(cancel_read())
+    assert started[0].wait(timeout=5) != 0
+    assert time.perf_counter() - start < 5
+
+# --- Shared Executor ---
+
+@pytest.fixture
+def shared_executor():
+    yield rct.readcsvturbo._shared_executor
+    rct.configure_executor()
+
+def test_headtail_runs_on_shared_executor(csv_dir, shared_executor):
+    path = csv_dir / 'part0.csv'
+    rct.read_csv_headtail(path, n_rows_head=300, n_rows_tail=300)
+    threads = threading.active_count()
+    tasks = rct.executor_info().tasks
+    for _ in range(5):
+        rct.read_csv_headtail(path, n_rows_head=300, n_rows_tail=300)
+    info = rct.executor_info()
+    assert info.tasks == tasks + 5 and info.queued == 0 and info.running == 0
+    assert threading.active_count() == threads
+
+@pytest.mark.parametrize('limits', [{'max_concurrent_reads': 2}, {'max_inflight_bytes': 1}])
+def test_read_limits(csv_dir, shared_executor, monkeypatch, limits):
+    rct.configure_executor(**limits)
+    peak = []
+    read_tail = rct.readcsvturbo._PythonEngine.read_tail
+
+    def slow_read_tail(*args, **kwargs):
+        peak.append(rct.executor_info().reads)
+        time.sleep(0.005)
+        return read_tail(*args, **kwargs)
+
+    monkeypatch.setattr(rct.readcsvturbo._PythonEngine, 'read_tail', slow_read_tail)
+    total_reads = rct.executor_info().total_reads
+    rct.read_csv_tail_many([csv_dir / 'part0.csv'] * 12, max_workers=6)
+    info = rct.executor_info()
+    assert max(peak) == limits.get('max_concurrent_reads', 1)
+    assert info.total_reads == total_reads + 12 and info.reads == 0 and info.inflight_bytes == 0
+    assert info.read_wait > 0
+
+def test_single_worker_does_not_wait_on_itself(csv_dir, shared_executor):
+    rct.configure_executor(max_workers=1, max_concurrent_reads=1)
+    results = rct.read_csv_headtail_many(str(csv_dir / 'part*.csv'), n_rows_head=300, n_rows_tail=300)
+    assert len(results) == 6
+    with pytest.raises(ValueError, match="positive"):
+        rct.configure_executor(max_inflight_bytes=0)
+
+@pytest.mark.parametrize('limits', [{}, {'max_workers': 1, 'max_concurrent_reads': 1}])
+def test_concurrent_headtails_do_not_wait_on_each_other(tmp_path, shared_executor, limits):
+    rct.configure_executor(**limits)
+    n_calls = rct.executor_info().max_workers + 4
+    paths = [tmp_path / f'headtail_{i}.csv' for i in range(n_calls)]
+    for path in paths:
+        path.write_text('a,b\n' + ''.join(f'{i},{i}\n' for i in range(20_000)))
+    results = []
+
+    def read_headtails():
+        # Over the profile threshold, so the head is read on the pool while this thread reads the tail.
+        results.append(len(rct.read_csv_headtail(paths[0], n_rows_head=300, n_rows_tail=300)))
+
+    def read_many():
+        results.extend(map(len, rct.read_csv_headtail_many(paths, n_rows_head=300, n_rows_tail=300).values()))
+
+    threads = [threading.Thread(target=read_headtails, daemon=True) for _ in range(n_calls)]
+    threads.append(threading.Thread(target=read_many, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+    assert results == [600] * (2 * n_calls)
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs os.fork")
+def test_forked_child_starts_its_own_pool(shared_executor):
+    assert list(shared_executor.map(abs, [-1, -2])) == [1, 2]
+    pid = os.fork()
+    if pid == 0:
+        # The child would wait forever on threads that did not survive the fork.
+        signal.alarm(30)
+        ok = False
+        try:
+            ok = list(shared_executor.map(abs, [-3, -4])) == [3, 4]
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+# --- Prefetching Iterator ---
+
+def test_iter_csv_tails_in_order(csv_dir):
+    pattern = str(csv_dir / 'part*.csv')
+    for prefetch in [0, 2, 8]:
+        results = list(rct.iter_csv_tails(pattern, n_rows=3, prefetch=prefetch))
+        assert [path for path, _ in results] == sorted(glob.glob(pattern))
+        for path, df in results:
+            pd.testing.assert_frame_equal(df, rct.read_csv_tail(path, n_rows=3))
+
+def test_iter_csv_tails_unordered(csv_dir, monkeypatch):
+    paths = sorted(glob.glob(str(csv_dir / 'part*.csv')))
+    extract_tail = rct.readcsvturbo._extract_tail
+
+    def slow_first(path, *args):
+        if path == paths[0]:
+            time.sleep(0.2)
+        return extract_tail(path, *args)
+
+    monkeypatch.setattr(rct.readcsvturbo, '_extract_tail', slow_first)
+    results = dict(rct.iter_csv_tails(iter(paths), prefetch=3, ordered=False, output='lines'))
+    assert sorted(results) == paths and list(results)[0] != paths[0]
+
+def test_iter_csv_tails_bounded_window(csv_dir, monkeypatch):
+    started = []
+    extract_tail = rct.readcsvturbo._extract_tail
+    monkeypatch.setattr(rct.readcsvturbo, '_extract_tail', lambda path, *args: started.append(path) or extract_tail(path, *args))
+    tails = rct.iter_csv_tails([csv_dir / 'part0.csv'] * 50, prefetch=4)
+    next(tails)
+    time.sleep(0.05)
+    assert len(started) <= 5
+    tails.close()
+    assert rct.executor_info().queued == 0
+
+def test_iter_csv_tails_raises_in_turn(csv_dir):
+    tails = rct.iter_csv_tails([csv_dir / 'part0.csv', csv_dir / 'missing.csv', csv_dir / 'part1.csv'])
+    assert next(tails)[0] == csv_dir / 'part0.csv'
+    with pytest.raises(FileNotFoundError):
+        next(tails)
+    with pytest.raises(ValueError, match="prefetch"):
+        rct.iter_csv_tails([], prefetch=-1)